@@ -0,0 +1,73 @@
+# APP/core/balanca.py
+"""
+Decodificação de etiquetas de balança (EAN-13 com preço ou peso embutido).
+
+As balanças de padaria/frios imprimem códigos que começam com "2" e trazem o
+código do produto (PLU) e o preço total ou o peso. O layout varia conforme a
+configuração da balança, por isso vem do config.json ("balanca"):
+
+    "balanca": {
+        "formato": "2PPPPPXVVVVVD",
+        "tipo_valor": "preco",
+        "casas_decimais": 2
+    }
+
+No formato, P = dígitos do PLU, V = dígitos do valor, D = dígito verificador
+do EAN-13, X = dígito ignorado, e dígitos literais precisam bater (o prefixo).
+tipo_valor é "preco" (valor em reais) ou "peso" (valor em kg).
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+from APP.core.config import config
+
+FORMATO_PADRAO = "2PPPPPXVVVVVD"
+
+
+@dataclass
+class EtiquetaBalanca:
+    codigo: str
+    plu: str
+    valor: float
+    tipo_valor: str  # "preco" ou "peso"
+
+
+def digito_ean13(codigo12: str) -> int:
+    """Dígito verificador EAN-13 dos 12 primeiros dígitos."""
+    soma = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(codigo12))
+    return (10 - soma % 10) % 10
+
+
+def decodificar_etiqueta(codigo: str, formato: str = None, tipo_valor: str = None, casas_decimais: int = None) -> Optional[EtiquetaBalanca]:
+    """
+    Retorna a etiqueta decodificada, ou None se o código não segue o formato
+    da balança (tamanho, prefixo ou dígito verificador).
+    """
+    ajustes = config.get("balanca") or {}
+    formato = formato or ajustes.get("formato", FORMATO_PADRAO)
+    tipo_valor = tipo_valor or ajustes.get("tipo_valor", "preco")
+    if casas_decimais is None:
+        casas_decimais = ajustes.get("casas_decimais", 2 if tipo_valor == "preco" else 3)
+
+    codigo = (codigo or "").strip()
+    if len(codigo) != len(formato) or not codigo.isdigit():
+        return None
+    plu, valor = [], []
+    for digito, mascara in zip(codigo, formato):
+        if mascara.isdigit():
+            if digito != mascara:
+                return None
+        elif mascara == "P":
+            plu.append(digito)
+        elif mascara == "V":
+            valor.append(digito)
+    if "D" in formato and len(codigo) == 13 and digito_ean13(codigo[:12]) != int(codigo[12]):
+        return None
+    if not plu or not valor:
+        return None
+    return EtiquetaBalanca(
+        codigo=codigo,
+        plu="".join(plu),
+        valor=int("".join(valor)) / (10 ** casas_decimais),
+        tipo_valor=tipo_valor,
+    )
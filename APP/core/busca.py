@@ -0,0 +1,200 @@
+# APP/core/busca.py
+"""
+Índices de busca em memória usados pelo catálogo e pela tela de produtos.
+
+TrigramIndex é um índice invertido de trigramas de caracteres para busca
+tolerante a erros de digitação ("refrigerente" -> "Refrigerante Cola 2L").
+Cada palavra é normalizada (sem acentos, minúsculas) e completada com espaços
+("  refri " ...), como no pg_trgm; a similaridade é a fração dos trigramas do
+termo encontrados no nome, com desempate pelo coeficiente de Jaccard.
+
+MultiFieldIndex indexa várias colunas de uma lista de linhas (postings por
+campo: palavra -> posições) e responde consultas com qualificadores, como
+"forn:nestle cat:bebidas leite". Cada palavra casa por prefixo, exceto nos
+campos de trecho (o nome do produto), em que casa em qualquer parte da
+palavra, como a antiga busca `termo in nome` ("gerante" acha "Refrigerante").
+Palavras sem qualificador procuram em todos os campos. As posições seguem a
+ordem da lista indexada, então o resultado sai ordenado sem ordenar as linhas.
+"""
+
+import bisect
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+from APP.core.utils import normalizar_busca
+
+
+def trigramas(texto: str) -> FrozenSet[str]:
+    """Trigramas das palavras do texto normalizado."""
+    resultado = set()
+    for palavra in normalizar_busca(texto).split():
+        palavra = f"  {palavra} "
+        for i in range(len(palavra) - 2):
+            resultado.add(palavra[i:i + 3])
+    return frozenset(resultado)
+
+
+class TrigramIndex:
+    """
+    Índice invertido trigrama -> ids. Atualizado incrementalmente com
+    adicionar/remover; não é thread-safe (o ProductCatalog serializa o acesso).
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._docs: Dict[int, FrozenSet[str]] = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def limpar(self):
+        self._postings = {}
+        self._docs = {}
+
+    def adicionar(self, doc_id: int, texto: str):
+        self.remover(doc_id)
+        grams = trigramas(texto)
+        self._docs[doc_id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(doc_id)
+
+    def remover(self, doc_id: int):
+        grams = self._docs.pop(doc_id, None)
+        if not grams:
+            return
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def buscar(self, termo: str, limit: int = 5, minimo: float = 0.45) -> List[Tuple[int, float]]:
+        """
+        Retorna até `limit` pares (id, similaridade) em ordem decrescente.
+        `minimo` é a fração mínima dos trigramas do termo presentes no nome.
+        """
+        consulta = trigramas(termo)
+        if not consulta:
+            return []
+        total = len(consulta)
+        necessarios = max(1, math.ceil(minimo * total))
+        listas = sorted((self._postings.get(gram, ()) for gram in consulta), key=len)
+        # Um nome com ao menos `necessarios` trigramas do termo aparece em pelo
+        # menos uma das (total - necessarios + 1) listas mais curtas: só elas
+        # geram candidatos; as listas longas (trigramas comuns) só confirmam.
+        corte = total - necessarios + 1
+        contagem = Counter()
+        for ids in listas[:corte]:
+            contagem.update(ids)
+        for ids in listas[corte:]:
+            if ids:
+                contagem.update(ids.intersection(contagem))
+
+        docs = self._docs
+        candidatos = [
+            (comuns, comuns / (total + len(docs[doc_id]) - comuns), doc_id)
+            for doc_id, comuns in contagem.items()
+            if comuns >= necessarios
+        ]
+        melhores = heapq.nlargest(limit, candidatos)
+        return [(doc_id, round(comuns / total, 3)) for comuns, _, doc_id in melhores]
+
+
+# campo:valor, campo:"valor com espaços", "frase" ou palavra solta
+_TERMO_CONSULTA = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+
+class MultiFieldIndex:
+    """
+    Índice invertido por campo sobre uma lista de linhas (tuplas).
+
+    campos: nome do campo -> índice da coluna na linha.
+    apelidos: qualificadores alternativos -> nome do campo (ex.: "forn" -> "fornecedor").
+    trecho: campos em que a palavra casa em qualquer parte, não só no prefixo.
+
+    construir() monta um índice novo e troca a referência numa única
+    atribuição: buscas em outra thread veem o índice antigo ou o novo inteiro.
+    """
+
+    def __init__(self, campos: Dict[str, int], apelidos: Optional[Dict[str, str]] = None, trecho: Sequence[str] = ()):
+        self.campos = dict(campos)
+        self.apelidos = {campo: campo for campo in self.campos}
+        self.apelidos.update(apelidos or {})
+        self.trecho = frozenset(trecho)
+        # (linhas, postings por campo, vocabulário ordenado por campo)
+        self._dados: Tuple[List[Sequence], Dict[str, Dict[str, List[int]]], Dict[str, List[str]]] = (
+            [],
+            {campo: {} for campo in self.campos},
+            {campo: [] for campo in self.campos},
+        )
+
+    def __len__(self):
+        return len(self._dados[0])
+
+    def construir(self, linhas: Sequence[Sequence]):
+        """(Re)indexa as linhas; o resultado das buscas segue esta ordem."""
+        linhas = list(linhas)
+        postings_campos = {campo: {} for campo in self.campos}
+        for posicao, linha in enumerate(linhas):
+            for campo, coluna in self.campos.items():
+                valor = linha[coluna]
+                if valor is None or valor == "":
+                    continue
+                postings = postings_campos[campo]
+                for palavra in set(normalizar_busca(str(valor)).split()):
+                    # posições entram em ordem crescente: listas já ordenadas
+                    postings.setdefault(palavra, []).append(posicao)
+        vocabulario = {campo: sorted(postings) for campo, postings in postings_campos.items()}
+        self._dados = (linhas, postings_campos, vocabulario)
+
+    def interpretar(self, consulta: str) -> List[Tuple[Optional[str], str]]:
+        """Quebra a consulta em pares (campo ou None, palavra normalizada)."""
+        termos = []
+        for qualificador, frase, palavra in _TERMO_CONSULTA.findall(consulta or ""):
+            campo = self.apelidos.get(qualificador.lower()) if qualificador else None
+            texto = frase or palavra
+            if qualificador and campo is None:
+                # Qualificador desconhecido (ex.: "10:30"): vale como texto comum
+                texto = f"{qualificador}:{texto}"
+            for parte in normalizar_busca(texto).split():
+                termos.append((campo, parte))
+        return termos
+
+    def _posicoes(self, dados, campo: str, prefixo: str) -> Set[int]:
+        _, postings_campos, vocabularios = dados
+        vocabulario = vocabularios[campo]
+        postings = postings_campos[campo]
+        resultado: Set[int] = set()
+        if campo in self.trecho:
+            for palavra in vocabulario:
+                if prefixo in palavra:
+                    resultado.update(postings[palavra])
+            return resultado
+        i = bisect.bisect_left(vocabulario, prefixo)
+        while i < len(vocabulario) and vocabulario[i].startswith(prefixo):
+            resultado.update(postings[vocabulario[i]])
+            i += 1
+        return resultado
+
+    def buscar(self, consulta: str) -> List[Sequence]:
+        """Linhas que atendem a todos os termos da consulta, na ordem original."""
+        dados = self._dados  # uma leitura só: construir() pode trocar o índice no meio
+        linhas = dados[0]
+        termos = self.interpretar(consulta)
+        if not termos:
+            return linhas
+        candidatos: Optional[Set[int]] = None
+        for campo, palavra in termos:
+            if campo:
+                posicoes = self._posicoes(dados, campo, palavra)
+            else:
+                posicoes = set()
+                for nome_campo in self.campos:
+                    posicoes |= self._posicoes(dados, nome_campo, palavra)
+            candidatos = posicoes if candidatos is None else candidatos & posicoes
+            if not candidatos:
+                return []
+        return [linhas[i] for i in sorted(candidatos)]
@@ -34,6 +34,11 @@ class Config:
     def log_path(self):
         return os.path.abspath(self.data.get("log_path", "DATA/system.log"))
 
+    @property
+    def relatorios_dir(self):
+        padrao = os.path.join("~", "Downloads", "Relatorios_Sistema")
+        return os.path.abspath(os.path.expanduser(self.data.get("relatorios_dir", padrao)))
+
     @property
     def default_users(self):
         return self.data.get("default_users", [])
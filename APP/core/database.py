@@ -1,6 +1,8 @@
 # APP/core/database.py
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from APP.core.config import config
 from APP.core.logger import logger
@@ -24,20 +26,292 @@ DEFAULT_UNITS = [
 ]
 
 
+# UPDATE ... RETURNING só existe a partir do SQLite 3.35
+SUPORTA_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+# ============================================================
+# POOL DE CONEXÕES
+# ============================================================
+# PRAGMAs aplicados uma única vez, quando a conexão física é aberta.
+PRAGMAS_CONEXAO = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA mmap_size = 268435456",  # 256 MB
+    "PRAGMA cache_size = -16000",  # ~16 MB (valor negativo = KiB)
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+class PooledConnection:
+    """
+    Empréstimo de uma conexão do pool.
+
+    Se comporta como sqlite3.Connection (cursor, execute, commit...), mas
+    close() e a saída do bloco `with` devolvem a conexão ao pool em vez de
+    fechá-la fisicamente.
+
+    Empréstimo aninhado (a thread já tinha a conexão):
+    - sem transação aberta, é dono da transação que iniciar: commit, rollback
+      e a saída do `with` valem de verdade, como num empréstimo externo (uma
+      escrita feita por um helper dentro de um `with conectar()` só de leitura
+      fica gravada);
+    - dentro de uma transação, abre um SAVEPOINT: rollback() ou erro no
+      `with` desfazem só o que foi feito neste empréstimo, e commit() apenas
+      confirma o trecho, que é gravado (ou desfeito) junto com a transação de
+      quem a abriu. close() sem commit descarta o trecho, como fechar uma
+      conexão com alterações pendentes.
+    """
+
+    def __init__(self, pool, conn: sqlite3.Connection, dono: int, aninhada: bool = False):
+        self._pool = pool
+        self._conn = conn
+        self._dono = dono
+        self._liberada = False
+        self.aninhada = aninhada
+        self._savepoint = None
+        self._confirmada = False
+        if aninhada and conn.in_transaction:
+            self._savepoint = f"emprestimo_{id(self):x}"
+            conn.execute(f"SAVEPOINT {self._savepoint}")
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._savepoint is not None:
+                self._encerrar_savepoint(desfazer=exc_type is not None)
+            else:
+                # Mesmo contrato do sqlite3: commit em sucesso, rollback em erro
+                self._conn.__exit__(exc_type, exc, tb)
+        finally:
+            self.close()
+        return False
+
+    def commit(self):
+        if self._savepoint is not None:
+            self._confirmada = True  # quem abriu a transação faz o commit
+            return
+        self._conn.commit()
+
+    def rollback(self):
+        if self._savepoint is not None:
+            self._conn.execute(f"ROLLBACK TO {self._savepoint}")
+            self._confirmada = False
+            return
+        self._conn.rollback()
+
+    def _encerrar_savepoint(self, desfazer: bool):
+        nome, self._savepoint = self._savepoint, None
+        if nome is None:
+            return
+        try:
+            if desfazer:
+                self._conn.execute(f"ROLLBACK TO {nome}")
+            self._conn.execute(f"RELEASE {nome}")
+        except sqlite3.OperationalError as e:
+            # A transação externa já terminou (commit/rollback de quem a abriu)
+            logger.debug(f"Savepoint {nome} já encerrado: {e}")
+
+    def close(self):
+        if not self._liberada:
+            self._liberada = True
+            try:
+                self._encerrar_savepoint(desfazer=not self._confirmada)
+            finally:
+                self._pool.release(self._conn, self._dono)
+
+    def __del__(self):
+        # Garante a devolução mesmo quando o chamador esquece o close()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Pool de conexões SQLite pré-configuradas.
+
+    - Cada conexão física é aberta uma vez, com os PRAGMAS_CONEXAO aplicados.
+    - Uma thread que já possui uma conexão emprestada recebe a mesma conexão
+      (reentrante), evitando bloqueios de escrita entre conexões da mesma thread.
+    - Quando todas as conexões estão em uso, o pedido aguarda até `timeout`.
+    """
+
+    def __init__(self, max_size: int = 5, timeout: float = 10.0):
+        self.max_size = max(1, int(max_size))
+        self.timeout = timeout
+        self._idle = []
+        self._open = 0
+        self._cond = threading.Condition()
+        self._emprestimos = {}  # thread ident -> [conexão, profundidade]
+        self._db_path = None
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+
+    def _nova_conexao(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(config.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Permite acessar colunas por nome
+        for pragma in PRAGMAS_CONEXAO:
+            conn.execute(pragma)
+        logger.debug(f"Nova conexão SQLite aberta ({config.db_path}).")
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """Empresta uma conexão pronta para uso."""
+        dono = threading.get_ident()
+        conn = None
+        with self._cond:
+            emprestimo = self._emprestimos.get(dono)
+            if emprestimo is not None:
+                emprestimo[1] += 1
+                self._hits += 1
+                return PooledConnection(self, emprestimo[0], dono, aninhada=True)
+
+            if self._db_path != config.db_path:
+                # Caminho do banco mudou (ex.: reconfiguração) — descarta ociosas
+                self._fechar_ociosas()
+                self._db_path = config.db_path
+
+            if not self._idle and self._open >= self.max_size:
+                self._waits += 1
+                if not self._cond.wait_for(lambda: self._idle or self._open < self.max_size, self.timeout):
+                    raise sqlite3.OperationalError(
+                        f"Pool de conexões esgotado ({self.max_size} em uso há mais de {self.timeout}s)."
+                    )
+
+            if self._idle:
+                conn = self._idle.pop()
+                self._hits += 1
+            else:
+                self._open += 1
+                self._misses += 1
+
+        if conn is None:
+            try:
+                conn = self._nova_conexao()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+
+        with self._cond:
+            self._emprestimos[dono] = [conn, 1]
+        return PooledConnection(self, conn, dono)
+
+    def release(self, conn: sqlite3.Connection, dono: int):
+        """Devolve a conexão ao pool (chamado por PooledConnection.close)."""
+        with self._cond:
+            emprestimo = self._emprestimos.get(dono)
+            if emprestimo is None or emprestimo[0] is not conn:
+                return
+            emprestimo[1] -= 1
+            if emprestimo[1] > 0:
+                return
+            del self._emprestimos[dono]
+
+        try:
+            if conn.in_transaction:
+                # Mesmo efeito de fechar uma conexão com alterações pendentes
+                conn.rollback()
+        except Exception as e:
+            logger.warning(f"Conexão descartada ao devolver ao pool: {e}")
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        """Retorna estatísticas de uso do pool."""
+        with self._cond:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "waits": self._waits,
+                "abertas": self._open,
+                "ociosas": len(self._idle),
+                "em_uso": len(self._emprestimos),
+                "max_size": self.max_size,
+            }
+
+    def close_all(self):
+        """Fecha as conexões ociosas (ex.: encerramento da aplicação ou troca de banco)."""
+        with self._cond:
+            self._fechar_ociosas()
+
+    def _fechar_ociosas(self):
+        while self._idle:
+            conn = self._idle.pop()
+            self._open -= 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+# Instância global reutilizável
+pool = ConnectionPool(
+    max_size=config.get("database_pool_size", 5),
+    timeout=config.get("database_pool_timeout", 10.0),
+)
+
+
 # ============================================================
 # CONEXÃO AO BANCO
 # ============================================================
 def conectar():
-    """Retorna uma conexão SQLite ativa."""
+    """Retorna uma conexão SQLite ativa (emprestada do pool)."""
     try:
-        conn = sqlite3.connect(config.db_path)
-        conn.row_factory = sqlite3.Row  # Permite acessar colunas por nome
-        return conn
+        return pool.acquire()
     except Exception as e:
         logger.critical(f"Erro ao conectar ao banco de dados: {e}", exc_info=True)
         raise
 
 
+@contextmanager
+def transacao():
+    """
+    Abre uma transação de escrita (BEGIN IMMEDIATE) em uma conexão do pool.
+    O lock de escrita é obtido logo no início, então leituras feitas dentro do
+    bloco não podem ser invalidadas por outro terminal antes do commit.
+    Se a thread já estiver dentro de uma transação, o bloco participa dela
+    num savepoint (ver PooledConnection): um erro desfaz só o bloco e sobe
+    para quem abriu a transação, que decide o commit.
+    """
+    conn = conectar()
+    try:
+        if conn.in_transaction:
+            with conn:
+                yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def estatisticas_pool() -> dict:
+    """Atalho para consultar hits, esperas e conexões abertas do pool."""
+    return pool.stats()
+
+
 # ============================================================
 # INICIALIZAÇÃO DO BANCO
 # ============================================================
@@ -123,7 +397,7 @@ def inicializar_banco():
         CREATE TABLE IF NOT EXISTS vendas (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             produto TEXT NOT NULL,
-            quantidade INTEGER NOT NULL,
+            quantidade REAL NOT NULL,
             total REAL NOT NULL,
             vendedor TEXT,
             cliente TEXT,
@@ -189,8 +463,14 @@ def criar_backup():
         backup_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         backup_path = os.path.join(backup_dir, backup_name)
 
-        with open(config.db_path, "rb") as original, open(backup_path, "wb") as copia:
-            copia.write(original.read())
+        # Usa a API de backup do SQLite: com WAL, copiar o arquivo .db
+        # diretamente perderia o que ainda está no arquivo -wal.
+        with conectar() as conn:
+            destino = sqlite3.connect(backup_path)
+            try:
+                conn.backup(destino)
+            finally:
+                destino.close()
 
         logger.info(f"💾 Backup criado com sucesso: {backup_path}")
         return backup_path
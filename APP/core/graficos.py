@@ -0,0 +1,172 @@
+# APP/core/graficos.py
+"""
+Renderização dos gráficos de relatórios fora da thread da interface.
+
+O matplotlib leva de centenas de milissegundos a segundos por gráfico em
+períodos grandes. ChartRenderer envia cada gráfico para um processo do
+ProcessPoolExecutor (sem disputar o GIL com a interface) e chama
+ao_concluir(png, erro) quando os bytes PNG ficam prontos.
+
+Os PNGs ficam em cache LRU limitado por tamanho total, chaveado por
+(período, tipo do gráfico, versão dos dados): reabrir o mesmo relatório não
+renderiza de novo, e qualquer venda nova no período muda a versão.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Hashable, Optional, Sequence
+from APP.core.logger import logger
+
+TIPOS_GRAFICO = ("barras", "pizza")
+
+
+def renderizar_grafico(tipo: str, rotulos: Sequence[str], valores: Sequence[float], tema: Dict) -> bytes:
+    """Desenha o gráfico e retorna o PNG. Roda no processo worker."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.style.use("dark_background")
+
+    if tipo == "barras":
+        fig, ax = plt.subplots(figsize=(5, 3))
+        fig.patch.set_facecolor(tema["fundo"])
+        ax.set_facecolor(tema["fundo_alt"])
+        ax.bar(rotulos, valores, color=tema["destaque"])
+        ax.set_title("Vendas por Produto", fontsize=12, weight="bold", color=tema["texto"])
+        ax.set_xlabel("Produto", color=tema["texto_secundario"])
+        ax.set_ylabel("Quantidade", color=tema["texto_secundario"])
+        ax.tick_params(colors=tema["texto_secundario"], rotation=25)
+        for tick in ax.get_xticklabels():
+            tick.set_rotation(25)
+            tick.set_ha("right")
+        ax.grid(axis="y", linestyle="--", alpha=0.3, color=tema["texto_secundario"])
+        plt.tight_layout()
+        plt.subplots_adjust(bottom=0.25)
+    elif tipo == "pizza":
+        fig, ax = plt.subplots(figsize=(4, 4))
+        fig.patch.set_facecolor(tema["fundo"])
+        ax.pie(
+            valores,
+            labels=rotulos,
+            autopct="%1.1f%%",
+            colors=tema["cores"],
+            textprops={"color": tema["texto"]},
+        )
+        ax.set_title("Participação nas Vendas", fontsize=12, weight="bold", color=tema["texto"])
+        plt.tight_layout()
+    else:
+        raise ValueError(f"Tipo de gráfico desconhecido: {tipo}")
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+class ChartRenderer:
+    def __init__(self, processos: int = 1, limite_cache_bytes: int = 16 * 1024 * 1024, renderizar: Callable = None):
+        self.processos = processos
+        self.limite_cache_bytes = limite_cache_bytes
+        self._renderizar = renderizar or renderizar_grafico
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._bytes_cache = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ----------------------------------------------------------
+    # Cache
+    # ----------------------------------------------------------
+    def obter(self, chave: Hashable) -> Optional[bytes]:
+        with self._lock:
+            png = self._cache.get(chave)
+            if png is not None:
+                self._cache.move_to_end(chave)
+            return png
+
+    def _guardar(self, chave: Hashable, png: bytes):
+        with self._lock:
+            antigo = self._cache.pop(chave, None)
+            if antigo is not None:
+                self._bytes_cache -= len(antigo)
+            self._cache[chave] = png
+            self._bytes_cache += len(png)
+            while self._bytes_cache > self.limite_cache_bytes and len(self._cache) > 1:
+                _, removido = self._cache.popitem(last=False)
+                self._bytes_cache -= len(removido)
+
+    def limpar_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self._bytes_cache = 0
+
+    # ----------------------------------------------------------
+    # Renderização
+    # ----------------------------------------------------------
+    def renderizar(
+        self,
+        chave: Hashable,
+        tipo: str,
+        rotulos: Sequence[str],
+        valores: Sequence[float],
+        tema: Dict,
+        ao_concluir: Callable[[Optional[bytes], Optional[BaseException]], None],
+    ):
+        """
+        Entrega o PNG do gráfico a ao_concluir(png, erro). Em cache, a chamada é
+        imediata (na própria thread); senão, acontece na thread de callback do
+        pool quando o processo worker terminar.
+        """
+        png = self.obter(chave)
+        if png is not None:
+            with self._lock:
+                self.hits += 1
+            ao_concluir(png, None)
+            return
+
+        with self._lock:
+            self.misses += 1
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.processos)
+            executor = self._executor
+        futuro = executor.submit(self._renderizar, tipo, list(rotulos), list(valores), tema)
+
+        def concluido(f):
+            try:
+                png = f.result()
+            except BaseException as erro:
+                if isinstance(erro, BrokenProcessPool):
+                    # Worker morreu: o próximo gráfico sobe um pool novo
+                    with self._lock:
+                        if self._executor is executor:
+                            self._executor = None
+                logger.error("Erro ao renderizar gráfico '%s': %s", tipo, erro, exc_info=True)
+                ao_concluir(None, erro)
+                return
+            self._guardar(chave, png)
+            ao_concluir(png, None)
+
+        futuro.add_done_callback(concluido)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "itens": len(self._cache),
+                "bytes": self._bytes_cache,
+            }
+
+    def encerrar(self):
+        """Finaliza os processos worker (saída da aplicação)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+renderizador_graficos = ChartRenderer()
@@ -0,0 +1,63 @@
+# APP/core/leitor.py
+"""
+Detecção de leituras de leitor de código de barras (teclado/wedge).
+
+O leitor "digita" o código inteiro em poucos milissegundos e termina com
+Enter; uma pessoa leva de 80 a 300 ms entre teclas. ScannerBurstDetector
+recebe cada valor do campo (on_change) e identifica a rajada pelo intervalo
+entre as teclas, para que a tela suspenda as sugestões durante a leitura e
+resolva o código final direto pelo código de barras.
+"""
+
+import time
+from typing import Optional
+from APP.core.config import config
+
+
+class ScannerBurstDetector:
+    def __init__(self, intervalo_max_ms: float = None, min_caracteres: int = None, teclas_rajada: int = 3):
+        self.intervalo_max = (intervalo_max_ms or config.get("leitor_intervalo_max_ms", 35)) / 1000
+        self.min_caracteres = min_caracteres or config.get("leitor_min_caracteres", 8)
+        self.teclas_rajada = teclas_rajada
+        self.reset()
+
+    def reset(self):
+        self.inicio: Optional[float] = None  # momento da primeira tecla da sequência atual
+        self._anterior = ""
+        self._ultimo = 0.0
+        self._rapidas = 0
+        self._desde_vazio = False
+
+    def registrar(self, valor: str, agora: float = None) -> bool:
+        """Registra o novo valor do campo. Retorna True se há uma rajada em andamento."""
+        agora = time.perf_counter() if agora is None else agora
+        if not valor:
+            self.reset()
+            return False
+        # Eventos agrupados (várias teclas num só on_change) contam como rápidos
+        continua = len(valor) > len(self._anterior) and valor.startswith(self._anterior)
+        if self._anterior and continua and agora - self._ultimo <= self.intervalo_max:
+            self._rapidas += len(valor) - len(self._anterior)
+        else:
+            self._rapidas = 0
+            self.inicio = agora
+            self._desde_vazio = not self._anterior and continua
+            if self._desde_vazio and len(valor) > 1:
+                # O campo já chegou com vários caracteres de uma vez
+                self._rapidas = len(valor) - 1
+        self._anterior = valor
+        self._ultimo = agora
+        return self.em_rajada
+
+    @property
+    def em_rajada(self) -> bool:
+        return self._rapidas + 1 >= self.teclas_rajada
+
+    def leitura_concluida(self, valor: str) -> bool:
+        """True se o valor inteiro foi digitado numa única rajada, desde o campo vazio."""
+        return (
+            self.em_rajada
+            and self._desde_vazio
+            and valor == self._anterior
+            and len(valor) >= self.min_caracteres
+        )
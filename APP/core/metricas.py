@@ -0,0 +1,78 @@
+# APP/core/metricas.py
+"""
+Histogramas de latência em memória para medir fluxos da interface
+(ex.: leitura do código de barras até a linha aparecer no carrinho).
+"""
+
+import bisect
+import threading
+from collections import deque
+from typing import Dict, Sequence
+from APP.core.logger import logger
+
+
+class LatencyHistogram:
+    """
+    Contagens por faixa de latência (ms) e uma janela das últimas amostras
+    para percentis. resumo() devolve contagens, p50/p95/p99 e máximo.
+    """
+
+    LIMITES_MS = (5, 10, 20, 50, 100, 200, 500, 1000)
+
+    def __init__(self, nome: str, limites_ms: Sequence[float] = None, janela: int = 1000, log_a_cada: int = 50):
+        self.nome = nome
+        self.limites = tuple(limites_ms or self.LIMITES_MS)
+        self._contagens = [0] * (len(self.limites) + 1)
+        self._amostras = deque(maxlen=janela)
+        self._lock = threading.Lock()
+        self._log_a_cada = log_a_cada
+        self.total = 0
+        self.maximo = 0.0
+
+    def registrar(self, ms: float):
+        with self._lock:
+            self._contagens[bisect.bisect_left(self.limites, ms)] += 1
+            self._amostras.append(ms)
+            self.total += 1
+            self.maximo = max(self.maximo, ms)
+            registrar_log = self._log_a_cada and self.total % self._log_a_cada == 0
+        if registrar_log:
+            self.log()
+
+    def percentil(self, p: float) -> float:
+        with self._lock:
+            amostras = sorted(self._amostras)
+        if not amostras:
+            return 0.0
+        indice = min(len(amostras) - 1, int(round(p / 100 * (len(amostras) - 1))))
+        return amostras[indice]
+
+    def resumo(self) -> Dict:
+        with self._lock:
+            faixas = {}
+            for i, contagem in enumerate(self._contagens):
+                rotulo = f"<={self.limites[i]}ms" if i < len(self.limites) else f">{self.limites[-1]}ms"
+                faixas[rotulo] = contagem
+            total, maximo = self.total, self.maximo
+        return {
+            "nome": self.nome,
+            "total": total,
+            "p50": round(self.percentil(50), 2),
+            "p95": round(self.percentil(95), 2),
+            "p99": round(self.percentil(99), 2),
+            "max": round(maximo, 2),
+            "faixas": faixas,
+        }
+
+    def log(self):
+        r = self.resumo()
+        if not r["total"]:
+            return
+        logger.info(
+            "Latência %s: n=%d p50=%.1fms p95=%.1fms p99=%.1fms max=%.1fms faixas=%s",
+            r["nome"], r["total"], r["p50"], r["p95"], r["p99"], r["max"], r["faixas"],
+        )
+
+
+# Leitura do código de barras (primeira tecla) até a linha no carrinho
+latencia_leitura = LatencyHistogram("leitura->carrinho")
@@ -16,6 +16,7 @@ Exemplo de uso:
 from typing import Callable, List
 from APP.core.database import conectar, DEFAULT_CATEGORIES, DEFAULT_UNITS
 from APP.core.logger import logger
+from APP.core.utils import normalizar_busca
 import sqlite3
 
 # Cada migração é uma função conn -> None
@@ -160,6 +161,431 @@ def _migration_007_add_pedido_id_to_vendas(conn: sqlite3.Connection):
         logger.debug("Migração 007: coluna 'pedido_id' já existe - pulando.")
 
 
+def _migration_008_create_hot_query_indexes(conn: sqlite3.Connection):
+    """
+    Migração 8:
+    Cria índices secundários para as consultas mais frequentes
+    (período de vendas, agrupamento por pedido, leitura de código de barras e logs).
+    A verificação de que as consultas continuam usando esses índices fica em
+    APP.core.planos_consulta.
+    """
+    cur = conn.cursor()
+    indices = [
+        ("idx_vendas_data_hora", "vendas(data_hora)"),
+        ("idx_vendas_pedido_id", "vendas(pedido_id)"),
+        ("idx_vendas_vendedor_data_hora", "vendas(vendedor, data_hora)"),
+        ("idx_produtos_codigo_barras", "produtos(codigo_barras)"),
+        ("idx_logs_data_hora_usuario", "logs(data_hora, usuario)"),
+    ]
+    for nome, alvo in indices:
+        logger.info(f"Migração 008: garantindo índice '{nome}' em {alvo}.")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {alvo}")
+    conn.commit()
+    # Atualiza as estatísticas do planejador para os novos índices
+    cur.execute("PRAGMA optimize")
+
+
+TAMANHO_LOTE_BACKFILL = 5000
+
+
+def _criar_view_vendas(cur):
+    """View vendas (mesmas colunas da antiga tabela) e o trigger que grava inserts nela como cabeçalho + item."""
+    cur.execute("""
+        CREATE VIEW IF NOT EXISTS vendas AS
+        SELECT
+            i.id AS id,
+            i.produto AS produto,
+            i.quantidade AS quantidade,
+            i.total AS total,
+            p.vendedor AS vendedor,
+            p.cliente AS cliente,
+            p.forma_pagamento AS forma_pagamento,
+            p.pedido_id AS pedido_id,
+            p.data_hora AS data_hora
+        FROM pedido_itens i
+        JOIN pedidos p ON p.id = i.pedido_fk
+    """)
+    # Inserts antigos em 'vendas' passam a gravar cabeçalho + item
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS vendas_instead_of_insert
+        INSTEAD OF INSERT ON vendas
+        BEGIN
+            INSERT INTO pedidos (pedido_id, vendedor, cliente, forma_pagamento, data_hora, total)
+            VALUES (
+                COALESCE(NEW.pedido_id, 'AVULSO-' || lower(hex(randomblob(6)))),
+                NEW.vendedor,
+                NEW.cliente,
+                NEW.forma_pagamento,
+                COALESCE(NEW.data_hora, datetime('now', 'localtime')),
+                NEW.total
+            )
+            ON CONFLICT(pedido_id) DO UPDATE SET total = total + excluded.total;
+            INSERT INTO pedido_itens (pedido_fk, produto_id, produto, quantidade, preco_unitario, total)
+            VALUES (
+                COALESCE((SELECT id FROM pedidos WHERE pedido_id = NEW.pedido_id), last_insert_rowid()),
+                (SELECT id FROM produtos WHERE nome = NEW.produto),
+                NEW.produto,
+                NEW.quantidade,
+                CASE WHEN NEW.quantidade THEN round(NEW.total / NEW.quantidade, 2) ELSE NEW.total END,
+                NEW.total
+            );
+        END
+    """)
+
+
+def _criar_triggers_vendas_diarias(cur):
+    """Triggers em pedido_itens que mantêm vendas_diarias em dia."""
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS pedido_itens_vendas_diarias_insert
+        AFTER INSERT ON pedido_itens
+        BEGIN
+            INSERT INTO vendas_diarias (data, produto, forma_pagamento, quantidade, total, pedidos)
+            SELECT
+                substr(p.data_hora, 1, 10),
+                NEW.produto,
+                COALESCE(p.forma_pagamento, 'N/D'),
+                NEW.quantidade,
+                NEW.total,
+                CASE WHEN EXISTS (
+                    SELECT 1 FROM pedido_itens
+                    WHERE pedido_fk = NEW.pedido_fk AND produto = NEW.produto AND id <> NEW.id
+                ) THEN 0 ELSE 1 END
+            FROM pedidos p
+            WHERE p.id = NEW.pedido_fk
+            ON CONFLICT(data, produto, forma_pagamento) DO UPDATE SET
+                quantidade = quantidade + excluded.quantidade,
+                total = total + excluded.total,
+                pedidos = pedidos + excluded.pedidos;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS pedido_itens_vendas_diarias_delete
+        AFTER DELETE ON pedido_itens
+        BEGIN
+            UPDATE vendas_diarias SET
+                quantidade = quantidade - OLD.quantidade,
+                total = total - OLD.total,
+                pedidos = pedidos - CASE WHEN EXISTS (
+                    SELECT 1 FROM pedido_itens
+                    WHERE pedido_fk = OLD.pedido_fk AND produto = OLD.produto
+                ) THEN 0 ELSE 1 END
+            WHERE (data, produto, forma_pagamento) = (
+                SELECT substr(p.data_hora, 1, 10), OLD.produto, COALESCE(p.forma_pagamento, 'N/D')
+                FROM pedidos p
+                WHERE p.id = OLD.pedido_fk
+            );
+        END
+    """)
+
+
+def _migration_009_normalize_vendas(conn: sqlite3.Connection):
+    """
+    Migração 9:
+    Normaliza as vendas em cabeçalho (pedidos) + itens (pedido_itens, com FK
+    inteira para produtos). A tabela antiga é renomeada para vendas_legado,
+    copiada em lotes e substituída por uma view 'vendas' com as mesmas colunas,
+    para que leituras e inserts existentes continuem funcionando.
+    Pode ser reexecutada: o backfill continua do último item copiado.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS pedidos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pedido_id TEXT NOT NULL,
+            vendedor TEXT,
+            cliente TEXT,
+            forma_pagamento TEXT,
+            data_hora TIMESTAMP NOT NULL,
+            total REAL NOT NULL DEFAULT 0
+        )
+    """)
+    # A coluna produto (TEXT) é redundante com produto_id de propósito: guarda o
+    # nome no momento da venda. produto_id pode ficar NULL (vendas legadas sem
+    # produto correspondente) ou apontar para um produto excluído ou renomeado
+    # depois, e relatórios e a view vendas precisam do nome histórico.
+    # quantidade é REAL: itens vendidos por peso (KG) têm quantidade fracionada.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS pedido_itens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pedido_fk INTEGER NOT NULL REFERENCES pedidos(id),
+            produto_id INTEGER REFERENCES produtos(id),
+            produto TEXT NOT NULL,
+            quantidade REAL NOT NULL,
+            preco_unitario REAL NOT NULL,
+            total REAL NOT NULL
+        )
+    """)
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_pedidos_pedido_id ON pedidos(pedido_id)")
+
+    cur.execute("SELECT type FROM sqlite_master WHERE name = 'vendas'")
+    row = cur.fetchone()
+    if row is not None and row[0] == "table":
+        logger.info("Migração 009: renomeando tabela 'vendas' para 'vendas_legado'.")
+        cur.execute("ALTER TABLE vendas RENAME TO vendas_legado")
+    conn.commit()
+
+    cur.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'vendas_legado'")
+    if cur.fetchone():
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM pedido_itens")
+        ultimo_id = cur.fetchone()[0]
+        copiados = 0
+        while True:
+            cur.execute(
+                """
+                SELECT id, produto, quantidade, total, vendedor, cliente, forma_pagamento, pedido_id, data_hora
+                FROM vendas_legado
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+                """,
+                (ultimo_id, TAMANHO_LOTE_BACKFILL),
+            )
+            lote = cur.fetchall()
+            if not lote:
+                break
+
+            cabecalhos = []
+            itens = []
+            for venda_id, produto, quantidade, total, vendedor, cliente, pagamento, pedido_id, data_hora in lote:
+                chave = pedido_id or f"LEGACY-{venda_id}"
+                total = total or 0.0
+                cabecalhos.append((chave, vendedor, cliente, pagamento, data_hora, total))
+                preco_unitario = round(total / quantidade, 2) if quantidade else total
+                itens.append((venda_id, chave, produto, produto, quantidade, preco_unitario, total))
+
+            cur.executemany(
+                """
+                INSERT INTO pedidos (pedido_id, vendedor, cliente, forma_pagamento, data_hora, total)
+                VALUES (?, ?, ?, ?, COALESCE(?, datetime('now', 'localtime')), ?)
+                ON CONFLICT(pedido_id) DO UPDATE SET
+                    total = total + excluded.total,
+                    data_hora = MIN(data_hora, excluded.data_hora)
+                """,
+                cabecalhos,
+            )
+            cur.executemany(
+                """
+                INSERT INTO pedido_itens (id, pedido_fk, produto_id, produto, quantidade, preco_unitario, total)
+                VALUES (
+                    ?,
+                    (SELECT id FROM pedidos WHERE pedido_id = ?),
+                    (SELECT id FROM produtos WHERE nome = ?),
+                    ?, ?, ?, ?
+                )
+                """,
+                itens,
+            )
+            conn.commit()
+            ultimo_id = lote[-1][0]
+            copiados += len(lote)
+            logger.info(f"Migração 009: {copiados} itens de venda copiados (último id={ultimo_id}).")
+
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_pedidos_data_hora ON pedidos(data_hora)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_pedidos_vendedor_data_hora ON pedidos(vendedor, data_hora)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_pedido_itens_pedido_fk ON pedido_itens(pedido_fk)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_pedido_itens_produto_id ON pedido_itens(produto_id)")
+
+    _criar_view_vendas(cur)
+    conn.commit()
+    cur.execute("PRAGMA optimize")
+
+
+def _migration_010_create_vendas_diarias(conn: sqlite3.Connection):
+    """
+    Migração 10:
+    Cria o resumo diário de vendas (vendas_diarias), mantido por triggers em
+    pedido_itens, e preenche com o histórico existente.
+    'pedidos' conta pedidos distintos que venderam o produto no dia.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS vendas_diarias (
+            data TEXT NOT NULL,
+            produto TEXT NOT NULL,
+            forma_pagamento TEXT NOT NULL,
+            quantidade REAL NOT NULL DEFAULT 0,
+            total REAL NOT NULL DEFAULT 0,
+            pedidos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (data, produto, forma_pagamento)
+        ) WITHOUT ROWID
+    """)
+    _criar_triggers_vendas_diarias(cur)
+
+    logger.info("Migração 010: consolidando histórico em vendas_diarias.")
+    cur.execute("DELETE FROM vendas_diarias")
+    cur.execute("""
+        INSERT INTO vendas_diarias (data, produto, forma_pagamento, quantidade, total, pedidos)
+        SELECT
+            substr(p.data_hora, 1, 10),
+            i.produto,
+            COALESCE(p.forma_pagamento, 'N/D'),
+            SUM(i.quantidade),
+            SUM(i.total),
+            COUNT(DISTINCT i.pedido_fk)
+        FROM pedido_itens i
+        JOIN pedidos p ON p.id = i.pedido_fk
+        GROUP BY 1, 2, 3
+    """)
+    conn.commit()
+
+
+def _criar_produtos_fts(conn: sqlite3.Connection, coluna_nome: str) -> bool:
+    """
+    Cria produtos_fts (FTS5, conteúdo externo em produtos) sobre coluna_nome e
+    codigo_barras, com triggers de sincronização, e indexa os produtos atuais.
+    Usa o tokenizer trigram (busca por trecho, como LIKE '%termo%') quando
+    disponível; senão unicode61 com índices de prefixo.
+    Retorna False se o FTS5 não estiver compilado no SQLite.
+    """
+    cur = conn.cursor()
+    opcoes = [
+        "tokenize='trigram'",
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'",
+    ]
+    criado = False
+    for opcao in opcoes:
+        try:
+            cur.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS produtos_fts USING fts5(
+                    {coluna_nome},
+                    codigo_barras,
+                    content='produtos',
+                    content_rowid='id',
+                    {opcao}
+                )
+            """)
+            logger.info(f"produtos_fts criada sobre '{coluna_nome}' com {opcao}.")
+            criado = True
+            break
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 com {opcao} indisponível ({e}).")
+    if not criado:
+        logger.warning("FTS5 não disponível — buscas de produtos seguirão com LIKE.")
+        return False
+
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS produtos_fts_insert AFTER INSERT ON produtos
+        BEGIN
+            INSERT INTO produtos_fts (rowid, {coluna_nome}, codigo_barras)
+            VALUES (NEW.id, NEW.{coluna_nome}, NEW.codigo_barras);
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS produtos_fts_delete AFTER DELETE ON produtos
+        BEGIN
+            INSERT INTO produtos_fts (produtos_fts, rowid, {coluna_nome}, codigo_barras)
+            VALUES ('delete', OLD.id, OLD.{coluna_nome}, OLD.codigo_barras);
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS produtos_fts_update AFTER UPDATE OF {coluna_nome}, codigo_barras ON produtos
+        BEGIN
+            INSERT INTO produtos_fts (produtos_fts, rowid, {coluna_nome}, codigo_barras)
+            VALUES ('delete', OLD.id, OLD.{coluna_nome}, OLD.codigo_barras);
+            INSERT INTO produtos_fts (rowid, {coluna_nome}, codigo_barras)
+            VALUES (NEW.id, NEW.{coluna_nome}, NEW.codigo_barras);
+        END
+    """)
+    cur.execute("INSERT INTO produtos_fts (produtos_fts) VALUES ('rebuild')")
+    conn.commit()
+    return True
+
+
+def _migration_011_create_produtos_fts(conn: sqlite3.Connection):
+    """
+    Migração 11:
+    Cria o índice de texto completo produtos_fts sobre o nome dos produtos.
+    Sem FTS5 compilado, a migração apenas registra o aviso e as buscas
+    continuam usando LIKE.
+    """
+    _criar_produtos_fts(conn, "nome")
+
+
+def _migration_012_add_nome_busca(conn: sqlite3.Connection):
+    """
+    Migração 12:
+    Adiciona produtos.nome_busca (nome sem acentos e em minúsculas), preenche
+    os produtos existentes e indexa a coluna para buscas por prefixo.
+    O produtos_fts passa a indexar nome_busca, tornando também a busca por
+    trecho insensível a acentos.
+    """
+    cur = conn.cursor()
+    cur.execute("PRAGMA table_info(produtos)")
+    cols = {row[1] for row in cur.fetchall()}
+    if "nome_busca" not in cols:
+        logger.info("Migração 012: adicionando coluna 'nome_busca' na tabela produtos.")
+        cur.execute("ALTER TABLE produtos ADD COLUMN nome_busca TEXT")
+
+    cur.execute("SELECT id, nome FROM produtos")
+    cur.executemany(
+        "UPDATE produtos SET nome_busca = ? WHERE id = ?",
+        [(normalizar_busca(nome), produto_id) for produto_id, nome in cur.fetchall()],
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_produtos_nome_busca ON produtos(nome_busca)")
+    conn.commit()
+
+    cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'produtos_fts'")
+    if cur.fetchone():
+        logger.info("Migração 012: recriando produtos_fts sobre nome_busca.")
+        for trigger in ("produtos_fts_insert", "produtos_fts_delete", "produtos_fts_update"):
+            cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cur.execute("DROP TABLE produtos_fts")
+        conn.commit()
+        _criar_produtos_fts(conn, "nome_busca")
+
+
+def _migration_013_pedido_itens_quantidade_real(conn: sqlite3.Connection):
+    """
+    Migração 13:
+    Declara pedido_itens.quantidade como REAL: itens vendidos por peso (KG)
+    têm quantidade fracionada. O SQLite não altera o tipo de uma coluna, então
+    a tabela é recriada e copiada numa única transação, junto com os índices,
+    a view vendas e os triggers de vendas_diarias. Não faz nada se a coluna já
+    é REAL (bancos criados com a migração 009 atual).
+    """
+    cur = conn.cursor()
+    cur.execute("PRAGMA table_info(pedido_itens)")
+    tipos = {row[1]: (row[2] or "").upper() for row in cur.fetchall()}
+    if tipos.get("quantidade") == "REAL":
+        return
+
+    logger.info("Migração 013: recriando pedido_itens com quantidade REAL.")
+    if conn.in_transaction:
+        conn.commit()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        # A view e os triggers citam pedido_itens: saem antes e voltam depois da troca
+        cur.execute("DROP VIEW IF EXISTS vendas")
+        cur.execute("DROP TRIGGER IF EXISTS pedido_itens_vendas_diarias_insert")
+        cur.execute("DROP TRIGGER IF EXISTS pedido_itens_vendas_diarias_delete")
+        cur.execute("""
+            CREATE TABLE pedido_itens_nova (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                pedido_fk INTEGER NOT NULL REFERENCES pedidos(id),
+                produto_id INTEGER REFERENCES produtos(id),
+                produto TEXT NOT NULL,
+                quantidade REAL NOT NULL,
+                preco_unitario REAL NOT NULL,
+                total REAL NOT NULL
+            )
+        """)
+        cur.execute("""
+            INSERT INTO pedido_itens_nova (id, pedido_fk, produto_id, produto, quantidade, preco_unitario, total)
+            SELECT id, pedido_fk, produto_id, produto, quantidade, preco_unitario, total
+            FROM pedido_itens
+        """)
+        cur.execute("DROP TABLE pedido_itens")
+        cur.execute("ALTER TABLE pedido_itens_nova RENAME TO pedido_itens")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_pedido_itens_pedido_fk ON pedido_itens(pedido_fk)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_pedido_itens_produto_id ON pedido_itens(produto_id)")
+        _criar_view_vendas(cur)
+        _criar_triggers_vendas_diarias(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
 # Lista ordenada de migrações (adicionar novas funções ao final)
 MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
     _migration_001_create_missing_role_column,
@@ -169,6 +595,12 @@ MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
     _migration_005_extend_produtos_schema,
     _migration_006_expand_vendas_table,
     _migration_007_add_pedido_id_to_vendas,
+    _migration_008_create_hot_query_indexes,
+    _migration_009_normalize_vendas,
+    _migration_010_create_vendas_diarias,
+    _migration_011_create_produtos_fts,
+    _migration_012_add_nome_busca,
+    _migration_013_pedido_itens_quantidade_real,
 ]
 
 
@@ -0,0 +1,125 @@
+# APP/core/planos_consulta.py
+"""
+Verificação dos planos de execução das consultas críticas.
+
+Cada entrada de CONSULTAS_CRITICAS descreve uma consulta quente do sistema e o
+índice que ela deve usar. verificar_planos() roda EXPLAIN QUERY PLAN em cada uma
+e retorna a lista de consultas que deixaram de usar o índice esperado
+(ex.: alguém reescreveu o WHERE com uma função sobre a coluna).
+
+Uso na linha de comando (retorna código 1 se alguma consulta regrediu):
+    python -m APP.core.planos_consulta
+"""
+
+import sys
+from typing import Dict, List
+from APP.core.database import conectar
+from APP.core.logger import logger
+
+CONSULTAS_CRITICAS: List[Dict] = [
+    {
+        "nome": "pedidos por período",
+        "sql": "SELECT * FROM pedidos WHERE data_hora >= ? AND data_hora < ? ORDER BY data_hora",
+        "params": ("2025-01-01", "2025-01-02"),
+        "indice": "idx_pedidos_data_hora",
+    },
+    {
+        "nome": "página de pedidos do período (cursor data_hora, id)",
+        "sql": (
+            "SELECT * FROM pedidos WHERE data_hora >= ? AND data_hora < ? AND (data_hora, id) > (?, ?) "
+            "ORDER BY data_hora, id LIMIT 30"
+        ),
+        "params": ("2025-01-01", "2025-02-01", "2025-01-10 10:00:00", 5),
+        "indice": "idx_pedidos_data_hora",
+    },
+    {
+        "nome": "vendas por período (view de compatibilidade)",
+        "sql": "SELECT * FROM vendas WHERE data_hora >= ? AND data_hora < ?",
+        "params": ("2025-01-01", "2025-01-02"),
+        "indice": "idx_pedidos_data_hora",
+    },
+    {
+        "nome": "pedido pelo código",
+        "sql": "SELECT id FROM pedidos WHERE pedido_id = ?",
+        "params": ("X",),
+        "indice": "idx_pedidos_pedido_id",
+    },
+    {
+        "nome": "itens de um pedido",
+        "sql": "SELECT * FROM pedido_itens WHERE pedido_fk = ?",
+        "params": (1,),
+        "indice": "idx_pedido_itens_pedido_fk",
+    },
+    {
+        "nome": "pedidos por vendedor no período",
+        "sql": "SELECT * FROM pedidos WHERE vendedor = ? AND data_hora >= ? AND data_hora < ?",
+        "params": ("vendedor1", "2025-01-01", "2025-01-02"),
+        "indice": "idx_pedidos_vendedor_data_hora",
+    },
+    {
+        "nome": "resumo diário por produto no período",
+        "sql": "SELECT produto, SUM(quantidade), SUM(total) FROM vendas_diarias WHERE data BETWEEN ? AND ? GROUP BY produto",
+        "params": ("2025-01-01", "2025-01-31"),
+        "indice": "PRIMARY KEY",
+    },
+    {
+        "nome": "produto por código de barras",
+        "sql": "SELECT id, nome, preco, estoque, codigo_barras FROM produtos WHERE codigo_barras = ?",
+        "params": ("7890000000000",),
+        "indice": "idx_produtos_codigo_barras",
+    },
+    {
+        "nome": "produtos por prefixo do nome",
+        "sql": "SELECT id, nome FROM produtos WHERE nome_busca >= ? AND nome_busca < ? ORDER BY nome_busca LIMIT 5",
+        "params": ("pao", "pap"),
+        "indice": "idx_produtos_nome_busca",
+    },
+    {
+        "nome": "logs por período",
+        "sql": "SELECT usuario, acao, data_hora FROM logs WHERE data_hora >= ? ORDER BY data_hora",
+        "params": ("2025-01-01",),
+        "indice": "idx_logs_data_hora_usuario",
+    },
+]
+
+
+def plano(conn, sql: str, params=()) -> List[str]:
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN de uma consulta."""
+    cur = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    return [row[3] for row in cur.fetchall()]
+
+
+def verificar_planos(consultas: List[Dict] = None) -> List[Dict]:
+    """
+    Executa EXPLAIN QUERY PLAN nas consultas críticas.
+    Retorna uma lista de falhas: {"nome", "indice", "plano"}. Lista vazia = tudo certo.
+    """
+    falhas = []
+    with conectar() as conn:
+        for consulta in consultas or CONSULTAS_CRITICAS:
+            detalhes = plano(conn, consulta["sql"], consulta.get("params", ()))
+            if not any(consulta["indice"] in linha for linha in detalhes):
+                falhas.append({"nome": consulta["nome"], "indice": consulta["indice"], "plano": detalhes})
+                logger.error(
+                    "Consulta '%s' não usa o índice %s. Plano: %s",
+                    consulta["nome"],
+                    consulta["indice"],
+                    " | ".join(detalhes),
+                )
+            else:
+                logger.debug("Consulta '%s' usa %s.", consulta["nome"], consulta["indice"])
+    return falhas
+
+
+if __name__ == "__main__":
+    from APP.core.database import inicializar_banco
+    from APP.core.migrations import run_migrations
+
+    inicializar_banco()
+    run_migrations()
+    falhas = verificar_planos()
+    for falha in falhas:
+        print(f"❌ {falha['nome']}: esperado {falha['indice']} — plano: {' | '.join(falha['plano'])}")
+    if not falhas:
+        print(f"✅ {len(CONSULTAS_CRITICAS)} consultas críticas usando seus índices.")
+    sys.exit(1 if falhas else 0)
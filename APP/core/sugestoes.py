@@ -0,0 +1,127 @@
+# APP/core/sugestoes.py
+"""
+Pipeline de sugestões (autocomplete) fora da thread da interface.
+
+Fluxo:
+- solicitar(termo) reinicia um timer de debounce; só o último termo digitado
+  dentro da janela segue adiante;
+- cada solicitação recebe uma geração; resultados de gerações antigas são
+  descartados (o usuário já digitou outra coisa);
+- a busca roda em um único worker, para não disputar o banco com a própria fila;
+- termo -> resultados fica em cache LRU, chaveado também por uma versão dos
+  dados (ex.: catalogo.versao), que invalida as entradas quando produtos mudam;
+- aplicar(termo, resultados) é chamado apenas para a solicitação mais recente.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+from APP.core.logger import logger
+from APP.core.utils import normalizar_busca
+
+
+class SuggestionPipeline:
+    def __init__(
+        self,
+        buscar: Callable[[str], List],
+        aplicar: Callable[[str, List], None],
+        atraso: float = 0.15,
+        tamanho_cache: int = 128,
+        versao: Optional[Callable[[], int]] = None,
+    ):
+        self._buscar = buscar
+        self._aplicar = aplicar
+        self.atraso = atraso
+        self._versao = versao or (lambda: 0)
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self._timer: Optional[threading.Timer] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sugestoes")
+        self._cache: "OrderedDict[tuple, List]" = OrderedDict()
+        self._tamanho_cache = tamanho_cache
+        self.hits = 0
+        self.misses = 0
+        self.descartadas = 0
+
+    # ----------------------------------------------------------
+    # API
+    # ----------------------------------------------------------
+    def solicitar(self, termo: str):
+        """Agenda a busca do termo após o debounce, cancelando a anterior."""
+        with self._lock:
+            self._geracao += 1
+            geracao = self._geracao
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.atraso, self._disparar, args=(geracao, termo))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancelar(self):
+        """Descarta a solicitação pendente (timer e resultado em andamento)."""
+        with self._lock:
+            self._geracao += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def encerrar(self):
+        self.cancelar()
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "descartadas": self.descartadas,
+                "cache": len(self._cache),
+            }
+
+    # ----------------------------------------------------------
+    # Internos
+    # ----------------------------------------------------------
+    def _atual(self, geracao: int) -> bool:
+        with self._lock:
+            if geracao == self._geracao:
+                return True
+            self.descartadas += 1
+            return False
+
+    def _disparar(self, geracao: int, termo: str):
+        if not self._atual(geracao):
+            return
+        try:
+            self._executor.submit(self._executar, geracao, termo)
+        except RuntimeError:
+            # Executor encerrado (tela fechada) entre o timer e o submit
+            pass
+
+    def _executar(self, geracao: int, termo: str):
+        if not self._atual(geracao):
+            return
+        chave = (normalizar_busca(termo), self._versao())
+        with self._lock:
+            resultados = self._cache.get(chave)
+            if resultados is not None:
+                self._cache.move_to_end(chave)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if resultados is None:
+            try:
+                resultados = self._buscar(termo)
+            except Exception as e:
+                logger.error("Erro ao buscar sugestões para '%s': %s", termo, e)
+                return
+            with self._lock:
+                self._cache[chave] = resultados
+                if len(self._cache) > self._tamanho_cache:
+                    self._cache.popitem(last=False)
+        if not self._atual(geracao):
+            return
+        try:
+            self._aplicar(termo, resultados)
+        except Exception as e:
+            logger.error("Erro ao exibir sugestões: %s", e)
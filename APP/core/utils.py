@@ -1,5 +1,7 @@
 import hashlib
+import math
 import os
+import unicodedata
 
 
 def hash_password(password: str) -> str:
@@ -23,3 +25,28 @@ def gerar_chave_unica() -> str:
     Gera uma chave única (UUID-like) para uso em tokens, códigos de redefinição, etc.
     """
     return hashlib.sha256(os.urandom(32)).hexdigest()
+
+
+def normalizar_busca(texto: str) -> str:
+    """
+    Normaliza um texto para busca: remove acentos, converte para minúsculas e
+    compacta espaços. Ex.: "Pão  Francês" -> "pao frances".
+    """
+    texto = texto or ""
+    if texto.isascii():
+        return " ".join(texto.lower().split())
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+
+def converter_quantidade(texto):
+    """
+    Converte uma quantidade ou estoque digitado ("3", "2,75", "0.5"). Valores
+    inteiros voltam como int; frações (produtos vendidos por peso) como float
+    com até 3 casas. Levanta ValueError se não for um número.
+    """
+    numero = float(str(texto).strip().replace(",", "."))
+    if not math.isfinite(numero):
+        raise ValueError(f"quantidade inválida: {texto!r}")
+    return int(numero) if numero.is_integer() else round(numero, 3)
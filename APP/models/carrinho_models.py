@@ -0,0 +1,176 @@
+from typing import Dict, Iterator, List, Optional
+from APP.core.logger import logger
+from APP.models.produtos_models import catalogo
+
+
+class Cart:
+    """
+    Carrinho do PDV, independente da interface.
+
+    As linhas ficam num dict por id do produto (na ordem de inclusão), então
+    adicionar, alterar e remover não percorrem o carrinho. Total bruto e
+    quantidade de itens são mantidos a cada operação; desconto e total
+    líquido derivam deles. Cada linha é um dict com id, nome, valor_unitario,
+    quantidade e codigo — o mesmo formato que Venda.registrar_pedido recebe.
+    """
+
+    def __init__(self, verificar_estoque: bool = True):
+        self.verificar_estoque = verificar_estoque
+        self._linhas: Dict[int, Dict] = {}
+        self._total_bruto = 0.0
+        self._total_itens = 0
+        self._desconto_percent = 0.0
+
+    # ----------------------------------------------------------
+    # Consulta
+    # ----------------------------------------------------------
+    def __len__(self):
+        return len(self._linhas)
+
+    def __bool__(self):
+        return bool(self._linhas)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._linhas.values())
+
+    def __contains__(self, produto_id):
+        return produto_id in self._linhas
+
+    def linha(self, produto_id) -> Optional[Dict]:
+        return self._linhas.get(produto_id)
+
+    def ultima(self) -> Optional[Dict]:
+        if not self._linhas:
+            return None
+        return self._linhas[next(reversed(self._linhas))]
+
+    @property
+    def total_itens(self):
+        return round(self._total_itens, 3)
+
+    @property
+    def total_bruto(self) -> float:
+        return round(self._total_bruto, 2)
+
+    @property
+    def desconto_percent(self) -> float:
+        return self._desconto_percent
+
+    @desconto_percent.setter
+    def desconto_percent(self, valor: float):
+        valor = float(valor)
+        if valor < 0 or valor > 100:
+            raise Exception("Desconto deve estar entre 0 e 100%.")
+        self._desconto_percent = valor
+
+    @property
+    def desconto_valor(self) -> float:
+        return round(self._total_bruto * self._desconto_percent / 100, 2)
+
+    @property
+    def total_liquido(self) -> float:
+        return round(self.total_bruto - self.desconto_valor, 2)
+
+    def snapshot(self) -> List[Dict]:
+        """Cópia das linhas para registrar a venda ou montar o resumo."""
+        return [dict(linha) for linha in self._linhas.values()]
+
+    # ----------------------------------------------------------
+    # Alteração
+    # ----------------------------------------------------------
+    def _checar_estoque(self, produto_id, nome, quantidade):
+        if not self.verificar_estoque:
+            return
+        row = catalogo.por_id(produto_id)
+        if row is None:
+            return  # produto fora do catálogo: a baixa no banco valida na finalização
+        disponivel = row[3] or 0
+        if quantidade > disponivel:
+            raise Exception(
+                f"Estoque insuficiente para '{nome}'. Disponível: {disponivel:g}, no carrinho: {quantidade:g}."
+            )
+
+    def _definir(self, linha: Dict, quantidade=None, valor_unitario=None):
+        """Troca quantidade/valor de uma linha ajustando os totais pela diferença."""
+        antigo = linha["quantidade"] * linha["valor_unitario"]
+        if quantidade is not None:
+            self._total_itens += quantidade - linha["quantidade"]
+            linha["quantidade"] = quantidade
+        if valor_unitario is not None:
+            linha["valor_unitario"] = valor_unitario
+        self._total_bruto += linha["quantidade"] * linha["valor_unitario"] - antigo
+
+    def adicionar(self, produto_info: Dict, quantidade=1) -> Dict:
+        """
+        Adiciona o produto (dict com id, nome, preco e codigo) ou soma a
+        quantidade na linha existente. Retorna a linha.
+        """
+        if quantidade <= 0:
+            quantidade = 1
+        produto_id = produto_info["id"]
+        linha = self._linhas.get(produto_id)
+        nova_quantidade = quantidade + (linha["quantidade"] if linha else 0)
+        self._checar_estoque(produto_id, produto_info["nome"], nova_quantidade)
+        if linha:
+            self._definir(linha, quantidade=nova_quantidade)
+            return linha
+        linha = {
+            "id": produto_id,
+            "nome": produto_info["nome"],
+            "valor_unitario": float(produto_info["preco"]),
+            "quantidade": quantidade,
+            "codigo": produto_info.get("codigo"),
+        }
+        self._linhas[produto_id] = linha
+        self._total_itens += quantidade
+        self._total_bruto += quantidade * linha["valor_unitario"]
+        return linha
+
+    def alterar_quantidade(self, produto_id, delta) -> Optional[Dict]:
+        """
+        Soma delta à quantidade da linha. Itens por unidade ficam no mínimo 1;
+        itens pesados (quantidade fracionada) mantêm a quantidade quando o
+        resultado ficaria abaixo de 1 — o "−" nunca aumenta a linha.
+        """
+        linha = self._linhas.get(produto_id)
+        if linha is None:
+            return None
+        atual = linha["quantidade"]
+        nova = round(atual + delta, 3)
+        if nova < 1:
+            nova = 1 if float(atual).is_integer() else atual
+        if nova > linha["quantidade"]:
+            self._checar_estoque(produto_id, linha["nome"], nova)
+        self._definir(linha, quantidade=nova)
+        return linha
+
+    def alterar_valor(self, produto_id, valor_unitario: float) -> Optional[Dict]:
+        linha = self._linhas.get(produto_id)
+        if linha is None:
+            return None
+        if valor_unitario < 0:
+            raise Exception("Valor unitário não pode ser negativo.")
+        self._definir(linha, valor_unitario=float(valor_unitario))
+        return linha
+
+    def remover(self, produto_id) -> Optional[Dict]:
+        linha = self._linhas.pop(produto_id, None)
+        if linha is not None:
+            self._total_itens -= linha["quantidade"]
+            self._total_bruto -= linha["quantidade"] * linha["valor_unitario"]
+            if not self._linhas:
+                # Zera o acumulado de ponto flutuante quando o carrinho esvazia
+                self._total_itens = 0
+                self._total_bruto = 0.0
+        return linha
+
+    def remover_ultima(self) -> Optional[Dict]:
+        ultima = self.ultima()
+        return self.remover(ultima["id"]) if ultima else None
+
+    def limpar(self):
+        self._linhas.clear()
+        self._total_bruto = 0.0
+        self._total_itens = 0
+        self._desconto_percent = 0.0
+        logger.debug("Carrinho limpo.")
@@ -0,0 +1,313 @@
+import csv
+import io
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from APP.core.database import conectar, transacao
+from APP.core.logger import logger
+from APP.core.utils import normalizar_busca
+from APP.models.produtos_models import catalogo
+
+# Cabeçalhos aceitos (normalizados) -> coluna do produto
+CABECALHOS_CSV = {
+    "nome": "nome",
+    "produto": "nome",
+    "preco": "preco",
+    "valor": "preco",
+    "estoque": "estoque",
+    "quantidade": "estoque",
+    "fornecedor": "fornecedor",
+    "validade": "validade",
+    "categoria": "categoria",
+    "unidade": "unidade",
+    "codigo_barras": "codigo_barras",
+    "codigo_de_barras": "codigo_barras",
+    "codigo": "codigo_barras",
+    "ean": "codigo_barras",
+    "estoque_minimo": "estoque_minimo",
+    "localizacao": "localizacao",
+    "local": "localizacao",
+}
+
+COLUNAS_INSERT = (
+    "nome", "nome_busca", "preco", "estoque", "fornecedor", "validade",
+    "categoria_id", "unidade_id", "codigo_barras", "estoque_minimo", "localizacao",
+)
+
+# Coluna do CSV -> coluna de produtos atualizada quando o produto já existe
+COLUNAS_ATUALIZAVEIS = {
+    "preco": "preco",
+    "estoque": "estoque",
+    "fornecedor": "fornecedor",
+    "validade": "validade",
+    "categoria": "categoria_id",
+    "unidade": "unidade_id",
+    "codigo_barras": "codigo_barras",
+    "estoque_minimo": "estoque_minimo",
+    "localizacao": "localizacao",
+}
+
+
+def sql_upsert(colunas_csv) -> str:
+    """
+    Upsert pelo nome. Produtos novos recebem todas as colunas (padrões para as
+    ausentes do CSV); produtos existentes só têm atualizadas as colunas que o
+    CSV traz — uma lista de preços (nome;preco) não zera estoque nem apaga
+    código de barras, fornecedor ou categoria.
+    """
+    atualizar = [COLUNAS_ATUALIZAVEIS[c] for c in COLUNAS_ATUALIZAVEIS if c in colunas_csv]
+    return f"""
+    INSERT INTO produtos ({", ".join(COLUNAS_INSERT)})
+    VALUES ({", ".join("?" * len(COLUNAS_INSERT))})
+    ON CONFLICT(nome) DO UPDATE SET
+        {", ".join(f"{coluna} = excluded.{coluna}" for coluna in atualizar)}
+"""
+
+
+@dataclass
+class ResultadoImportacao:
+    lidas: int = 0
+    importadas: int = 0
+    categorias_criadas: int = 0
+    erros: List[Tuple[int, str]] = field(default_factory=list)  # (linha do arquivo, mensagem)
+    segundos: float = 0.0
+    linha_gravada: int = 0  # última linha do arquivo já confirmada no banco
+    falha: Optional[str] = None  # erro que interrompeu a gravação de um lote
+
+    def resumo(self) -> str:
+        texto = (
+            f"{self.importadas} de {self.lidas} produto(s) importado(s) em {self.segundos:.1f}s"
+            f" • {len(self.erros)} linha(s) com erro"
+        )
+        if self.falha:
+            texto += (
+                f" • interrompida: {self.falha} (linhas até {self.linha_gravada} já gravadas;"
+                f" reimporte a partir da linha {self.linha_gravada + 1})"
+            )
+        return texto
+
+
+def _numero(valor: str) -> float:
+    """Aceita 1234.56, 1234,56 e 1.234,56."""
+    valor = valor.strip().replace("R$", "").strip()
+    if "," in valor:
+        valor = valor.replace(".", "").replace(",", ".")
+    return float(valor)
+
+
+def _inteiro(valor: str, padrao: int = 0) -> int:
+    if not valor.strip():
+        return padrao
+    numero = _numero(valor)
+    if numero != int(numero):
+        raise ValueError(f"'{valor}' não é inteiro")
+    return int(numero)
+
+
+def _data(valor: str) -> Optional[str]:
+    valor = valor.strip()
+    if not valor:
+        return None
+    for formato in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(valor, formato).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"validade '{valor}' inválida (use AAAA-MM-DD ou DD/MM/AAAA)")
+
+
+class ImportadorProdutos:
+    """
+    Importação em massa de produtos a partir de CSV.
+
+    O arquivo é lido em streaming (linha a linha); categorias e unidades são
+    resolvidas por nome contra tabelas carregadas uma única vez (categorias
+    novas são criadas, unidades desconhecidas são erro da linha). Cada lote de
+    `tamanho_lote` linhas é validado e gravado com executemany (upsert pelo
+    nome) numa transação própria: o lock de escrita fica preso só durante um
+    lote (~0,25s para 5000 linhas), e os outros terminais continuam vendendo
+    durante a carga em vez de estourar o busy_timeout.
+
+    Erros de validação não interrompem a importação: ficam em
+    ResultadoImportacao.erros com o número da linha. Se a gravação de um lote
+    falhar (ex.: banco travado além do busy_timeout), os lotes anteriores já
+    estão confirmados; a importação para com ResultadoImportacao.falha e
+    linha_gravada, e pode ser retomada com `a_partir_da_linha` (o upsert pelo
+    nome também torna seguro reimportar o arquivo inteiro).
+    """
+
+    def __init__(self, tamanho_lote: int = 5000, criar_categorias: bool = True):
+        self.tamanho_lote = tamanho_lote
+        self.criar_categorias = criar_categorias
+
+    def importar_arquivo(
+        self, caminho: str, progresso: Callable[[int], None] = None, a_partir_da_linha: int = 0
+    ) -> ResultadoImportacao:
+        with open(caminho, "r", encoding="utf-8-sig", newline="") as arquivo:
+            return self.importar(arquivo, progresso, a_partir_da_linha)
+
+    def importar(
+        self, arquivo: io.TextIOBase, progresso: Callable[[int], None] = None, a_partir_da_linha: int = 0
+    ) -> ResultadoImportacao:
+        """
+        Importa o CSV aberto em `arquivo`. Linhas do arquivo anteriores a
+        `a_partir_da_linha` (numeração com o cabeçalho na linha 1) são puladas.
+        """
+        inicio = time.perf_counter()
+        resultado = ResultadoImportacao()
+        amostra = arquivo.read(4096)
+        arquivo.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=";,\t")
+        except csv.Error:
+            dialeto = csv.excel
+        leitor = csv.reader(arquivo, dialeto)
+        cabecalho = next(leitor, None)
+        if not cabecalho:
+            raise Exception("Arquivo CSV vazio.")
+        colunas = [CABECALHOS_CSV.get(normalizar_busca(c).replace(" ", "_")) for c in cabecalho]
+        if "nome" not in colunas or "preco" not in colunas:
+            raise Exception("O CSV precisa das colunas 'nome' e 'preco'.")
+
+        with conectar() as conn:
+            cur = conn.cursor()
+            categorias = self._mapa(cur, "SELECT id, nome FROM categorias")
+            unidades = self._mapa(cur, "SELECT id, sigla FROM unidades_medida")
+            unidades.update(self._mapa(cur, "SELECT id, descricao FROM unidades_medida WHERE descricao IS NOT NULL"))
+        # Estado desta importação: SQL do upsert, mapas por nome e valores crus
+        # já resolvidos (categorias, unidades e datas se repetem muito)
+        estado = {
+            "sql": sql_upsert(set(colunas)),
+            "colunas": colunas,
+            "categorias": categorias,
+            "unidades": unidades,
+            "resolvidos": {"categoria": {}, "unidade": {}, "validade": {}},
+        }
+        resultado.linha_gravada = max(a_partir_da_linha - 1, 1)
+
+        pendentes = []  # (linha do arquivo, valores) do lote atual
+        for numero_linha, valores in enumerate(leitor, start=2):
+            if numero_linha < a_partir_da_linha or not any(v.strip() for v in valores):
+                continue
+            resultado.lidas += 1
+            pendentes.append((numero_linha, valores))
+            if len(pendentes) >= self.tamanho_lote:
+                if not self._gravar_lote(pendentes, estado, resultado):
+                    break
+                pendentes = []
+                if progresso:
+                    progresso(resultado.lidas)
+        else:
+            if pendentes:
+                self._gravar_lote(pendentes, estado, resultado)
+            if progresso:
+                progresso(resultado.lidas)
+
+        if resultado.importadas or resultado.categorias_criadas:
+            catalogo.invalidar()
+        resultado.segundos = time.perf_counter() - inicio
+        if resultado.falha:
+            logger.error("Importação de produtos interrompida: %s", resultado.resumo())
+        else:
+            logger.info("Importação de produtos: %s", resultado.resumo())
+        return resultado
+
+    def _gravar_lote(self, pendentes, estado, resultado) -> bool:
+        """
+        Valida e grava um lote numa transação. Retorna False (com
+        resultado.falha preenchido) se o lote não pôde ser confirmado; nada
+        do lote fica gravado nesse caso.
+        """
+        erros = len(resultado.erros)
+        categorias_criadas = resultado.categorias_criadas
+        try:
+            with transacao() as conn:
+                cur = conn.cursor()
+                lote = []
+                for numero_linha, valores in pendentes:
+                    try:
+                        lote.append(self._validar(valores, cur, estado, resultado))
+                    except (ValueError, KeyError) as e:
+                        resultado.erros.append((numero_linha, str(e)))
+                cur.executemany(estado["sql"], lote)
+        except Exception as e:
+            # Erros de validação e categorias do lote desfeito não valem mais
+            del resultado.erros[erros:]
+            resultado.categorias_criadas = categorias_criadas
+            resultado.falha = str(e)
+            return False
+        resultado.importadas += len(lote)
+        resultado.linha_gravada = pendentes[-1][0]
+        logger.debug("Importação: lote de %d produto(s) gravado (até a linha %d).", len(lote), resultado.linha_gravada)
+        return True
+
+    @staticmethod
+    def _mapa(cur, sql) -> Dict[str, int]:
+        cur.execute(sql)
+        return {normalizar_busca(nome): id_ for id_, nome in cur.fetchall()}
+
+    def _validar(self, valores, cur, estado, resultado):
+        dados = {}
+        for coluna, valor in zip(estado["colunas"], valores):
+            if coluna:
+                dados[coluna] = (valor or "").strip()
+
+        nome = dados.get("nome", "")
+        if not nome:
+            raise ValueError("nome vazio")
+        try:
+            preco = _numero(dados.get("preco", ""))
+        except ValueError:
+            raise ValueError(f"preço '{dados.get('preco', '')}' inválido")
+        if preco < 0:
+            raise ValueError("preço negativo")
+        try:
+            estoque = _inteiro(dados.get("estoque", ""))
+            estoque_minimo = _inteiro(dados.get("estoque_minimo", ""))
+        except ValueError as e:
+            raise ValueError(f"estoque inválido: {e}")
+        validades = estado["resolvidos"]["validade"]
+        bruto = dados.get("validade", "")
+        validade = validades[bruto] if bruto in validades else validades.setdefault(bruto, _data(bruto))
+
+        categoria_id = None
+        categoria = dados.get("categoria", "")
+        if categoria:
+            resolvidas = estado["resolvidos"]["categoria"]
+            categoria_id = resolvidas.get(categoria)
+            if categoria_id is None:
+                chave = normalizar_busca(categoria)
+                categoria_id = estado["categorias"].get(chave)
+                if categoria_id is None:
+                    if not self.criar_categorias:
+                        raise ValueError(f"categoria '{categoria}' não cadastrada")
+                    cur.execute("INSERT INTO categorias (nome, segmento) VALUES (?, 'geral')", (categoria,))
+                    categoria_id = estado["categorias"][chave] = cur.lastrowid
+                    resultado.categorias_criadas += 1
+                resolvidas[categoria] = categoria_id
+
+        unidade_id = None
+        unidade = dados.get("unidade", "")
+        if unidade:
+            resolvidas = estado["resolvidos"]["unidade"]
+            unidade_id = resolvidas.get(unidade)
+            if unidade_id is None:
+                unidade_id = estado["unidades"].get(normalizar_busca(unidade))
+                if unidade_id is None:
+                    raise ValueError(f"unidade '{unidade}' não cadastrada")
+                resolvidas[unidade] = unidade_id
+
+        return (
+            nome,
+            normalizar_busca(nome),
+            preco,
+            estoque,
+            dados.get("fornecedor") or None,
+            validade,
+            categoria_id,
+            unidade_id,
+            dados.get("codigo_barras") or None,
+            estoque_minimo,
+            dados.get("localizacao") or None,
+        )
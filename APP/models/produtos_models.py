@@ -1,5 +1,282 @@
-from APP.core.database import conectar
+import bisect
+import sqlite3
+import threading
+from APP.core.balanca import decodificar_etiqueta
+from APP.core.busca import TrigramIndex
+from APP.core.database import conectar, transacao
 from APP.core.logger import logger
+from APP.core.utils import converter_quantidade, normalizar_busca
+
+# Modo do índice produtos_fts ("trigram" ou "unicode61"), descoberto no primeiro uso
+_modo_fts_cache = None
+
+
+def _modo_fts():
+    """Retorna o tokenizer da tabela produtos_fts, ou "" se o FTS5 não estiver disponível."""
+    global _modo_fts_cache
+    if _modo_fts_cache:
+        return _modo_fts_cache
+    with conectar() as conn:
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'produtos_fts'").fetchone()
+    if row is None:
+        return ""
+    _modo_fts_cache = "trigram" if "trigram" in row[0] else "unicode61"
+    return _modo_fts_cache
+
+
+def _expressao_fts(termo, modo, coluna=None):
+    """
+    Monta a expressão MATCH com cada palavra do termo entre aspas (sem operadores
+    vindos do usuário). Retorna None quando o índice não atende o termo — o
+    trigram só encontra trechos com 3 ou mais caracteres.
+    """
+    palavras = normalizar_busca(termo).split()
+    if not palavras:
+        return None
+    partes = []
+    for palavra in palavras:
+        if modo == "trigram" and len(palavra) < 3:
+            return None
+        escapada = palavra.replace('"', '""')
+        partes.append(f'"{escapada}"' if modo == "trigram" else f'"{escapada}"*')
+    expressao = " AND ".join(partes)
+    return f"{coluna} : ({expressao})" if coluna else expressao
+
+
+def _converter_valor_lote(chave, valor, referencia=""):
+    """Converte um valor de Produto.atualizar_em_lote; levanta Exception com a chave se for inválido."""
+    try:
+        if chave == "estoque":
+            return converter_quantidade(valor)
+        return float(valor)
+    except (TypeError, ValueError):
+        raise Exception(f"Valor inválido para '{chave}'{referencia}: {valor!r}.")
+
+
+def _preco_reajustado(preco, percentual, valor):
+    if percentual is not None:
+        preco = preco * (1 + percentual / 100)
+    if valor is not None:
+        preco = preco + valor
+    return round(preco, 2)
+
+
+class ProductCatalog:
+    """
+    Cache em memória dos produtos para o caixa.
+
+    Carrega produtos uma vez e mantém índices por código de barras, por id,
+    por nome (lista ordenada para busca por prefixo) e por trigramas do nome
+    (busca tolerante a erros de digitação). As linhas têm o mesmo
+    formato das consultas do PDV: (id, nome, preco, estoque, codigo_barras).
+    Produto.adicionar/atualizar/excluir e o registro de vendas mantêm o cache
+    atualizado; produtos criados por outro terminal entram no primeiro miss.
+    """
+
+    COLUNAS = "id, nome, preco, estoque, codigo_barras"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._carregado = False
+        self._por_id = {}
+        self._por_codigo = {}
+        self._por_nome = {}
+        self._nomes = []  # [(nome normalizado, id)] ordenada
+        self._trigramas = TrigramIndex()
+        self.hits = 0
+        self.misses = 0
+        self.versao = 0  # incrementa a cada alteração do cache
+
+    # ----------------------------------------------------------
+    # Carga e manutenção
+    # ----------------------------------------------------------
+    def carregar(self):
+        """(Re)carrega todos os produtos do banco."""
+        with conectar() as conn:
+            rows = conn.execute(f"SELECT {self.COLUNAS} FROM produtos").fetchall()
+        with self._lock:
+            self._por_id = {}
+            self._por_codigo = {}
+            self._por_nome = {}
+            self._nomes = []
+            self._trigramas.limpar()
+            for row in rows:
+                self._indexar(tuple(row))
+            self._nomes.sort()
+            self._carregado = True
+            self.versao += 1
+        logger.info("Catálogo de produtos carregado em memória: %d itens.", len(rows))
+
+    def _garantir_carregado(self):
+        if not self._carregado:
+            self.carregar()
+
+    def _indexar(self, row, ordenado=False):
+        produto_id, nome, _, _, codigo = row
+        self._por_id[produto_id] = row
+        self._por_nome[nome] = produto_id
+        if codigo:
+            self._por_codigo[codigo] = row
+        chave = (normalizar_busca(nome), produto_id)
+        self._trigramas.adicionar(produto_id, nome)
+        if ordenado:
+            bisect.insort(self._nomes, chave)
+        else:
+            self._nomes.append(chave)
+
+    def _remover(self, produto_id):
+        row = self._por_id.pop(produto_id, None)
+        if row is None:
+            return
+        _, nome, _, _, codigo = row
+        self._por_nome.pop(nome, None)
+        if codigo and self._por_codigo.get(codigo) is row:
+            del self._por_codigo[codigo]
+        self._trigramas.remover(produto_id)
+        chave = (normalizar_busca(nome), produto_id)
+        pos = bisect.bisect_left(self._nomes, chave)
+        if pos < len(self._nomes) and self._nomes[pos] == chave:
+            del self._nomes[pos]
+
+    def _guardar(self, row):
+        with self._lock:
+            self._remover(row[0])
+            self._indexar(row, ordenado=True)
+            self.versao += 1
+
+    def refresh(self, nome=None, produto_id=None):
+        """Relê um produto do banco (por nome ou id) e atualiza/remove sua entrada."""
+        if not self._carregado:
+            return
+        with self._lock:
+            if produto_id is None:
+                produto_id = self._por_nome.get(nome)
+        with conectar() as conn:
+            if nome is not None:
+                row = conn.execute(f"SELECT {self.COLUNAS} FROM produtos WHERE nome = ?", (nome,)).fetchone()
+            else:
+                row = conn.execute(f"SELECT {self.COLUNAS} FROM produtos WHERE id = ?", (produto_id,)).fetchone()
+        with self._lock:
+            if produto_id is not None:
+                self._remover(produto_id)
+            if row is not None:
+                self._indexar(tuple(row), ordenado=True)
+            self.versao += 1
+
+    def invalidar(self):
+        """Descarta todo o cache; a próxima consulta recarrega do banco."""
+        with self._lock:
+            self._carregado = False
+            self.versao += 1
+
+    def atualizar_estoque(self, produto_id, estoque):
+        """Atualiza o estoque em memória após uma venda (sem reindexar nome e trigramas)."""
+        with self._lock:
+            row = self._por_id.get(produto_id)
+            if row is None:
+                return
+            novo = (row[0], row[1], row[2], estoque, row[4])
+            self._por_id[produto_id] = novo
+            if row[4] and self._por_codigo.get(row[4]) is row:
+                self._por_codigo[row[4]] = novo
+            self.versao += 1
+
+    # ----------------------------------------------------------
+    # Consultas
+    # ----------------------------------------------------------
+    def por_codigo(self, codigo):
+        """Produto pelo código de barras exato. Em caso de miss, consulta o banco uma vez."""
+        self._garantir_carregado()
+        with self._lock:
+            row = self._por_codigo.get(codigo)
+            if row is not None:
+                self.hits += 1
+                return row
+            self.misses += 1
+        with conectar() as conn:
+            row = conn.execute(
+                f"SELECT {self.COLUNAS} FROM produtos WHERE codigo_barras = ? LIMIT 1",
+                (codigo,),
+            ).fetchone()
+        if row is None:
+            return None
+        row = tuple(row)
+        self._guardar(row)
+        return row
+
+    def por_id(self, produto_id):
+        self._garantir_carregado()
+        with self._lock:
+            row = self._por_id.get(produto_id)
+            if row is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return row
+
+    def buscar_prefixo(self, prefixo, limit=5):
+        """Produtos cujo nome começa com o prefixo (sem diferenciar maiúsculas nem acentos), em ordem alfabética."""
+        self._garantir_carregado()
+        prefixo = normalizar_busca(prefixo)
+        if not prefixo:
+            return []
+        resultado = []
+        with self._lock:
+            pos = bisect.bisect_left(self._nomes, (prefixo,))
+            while pos < len(self._nomes) and len(resultado) < limit:
+                nome, produto_id = self._nomes[pos]
+                if not nome.startswith(prefixo):
+                    break
+                resultado.append(self._por_id[produto_id])
+                pos += 1
+        return resultado
+
+    def buscar_fuzzy(self, termo, limit=5, minimo=0.45):
+        """
+        Produtos com nome parecido com o termo (erros de digitação), do mais
+        para o menos similar: [(row, similaridade)].
+        """
+        self._garantir_carregado()
+        with self._lock:
+            return [
+                (self._por_id[produto_id], score)
+                for produto_id, score in self._trigramas.buscar(termo, limit, minimo)
+            ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "produtos": len(self._por_id),
+                "codigos": len(self._por_codigo),
+                "versao": self.versao,
+            }
+
+
+# Instância global (cache único dentro do processo)
+catalogo = ProductCatalog()
+
+# Campos pesquisáveis da tela de produtos (colunas das linhas de Produto.listar)
+CAMPOS_BUSCA_PRODUTOS = {
+    "nome": 1,
+    "codigo": 8,
+    "fornecedor": 4,
+    "categoria": 6,
+    "local": 10,
+}
+APELIDOS_BUSCA_PRODUTOS = {
+    "cod": "codigo",
+    "forn": "fornecedor",
+    "cat": "categoria",
+    "loc": "local",
+    "localizacao": "local",
+}
+# Campos em que a palavra casa em qualquer trecho ("gerante" -> "Refrigerante")
+TRECHO_BUSCA_PRODUTOS = ("nome",)
+
+# Unidades de produtos vendidos por peso: estoque e quantidade podem ser fracionados
+UNIDADES_FRACIONADAS = ("KG", "G")
 
 
 class Produto:
@@ -24,6 +301,7 @@ class Produto:
                 """
                 INSERT INTO produtos (
                     nome,
+                    nome_busca,
                     preco,
                     estoque,
                     fornecedor,
@@ -34,10 +312,11 @@ class Produto:
                     estoque_minimo,
                     localizacao
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     nome,
+                    normalizar_busca(nome),
                     preco,
                     estoque,
                     fornecedor,
@@ -49,6 +328,7 @@ class Produto:
                     localizacao,
                 ),
             )
+        catalogo.refresh(nome=nome)
         logger.info(
             "Produto adicionado: %s - R$%.2f (estoque=%s, categoria=%s, unidade=%s)",
             nome,
@@ -125,8 +405,180 @@ class Produto:
             )
             if cur.rowcount == 0:
                 raise Exception(f"Produto '{nome}' não encontrado para atualização.")
+        catalogo.refresh(nome=nome)
         logger.info("Produto '%s' atualizado.", nome)
 
+    @staticmethod
+    def atualizar_em_lote(
+        alteracoes=(),
+        ajuste_percentual=None,
+        ajuste_valor=None,
+        categoria_id=None,
+        fornecedor=None,
+    ):
+        """
+        Atualiza preço e estoque de vários produtos numa única transação.
+
+        alteracoes: iterável de dicts identificados por "id" ou "codigo_barras",
+        com "preco" e/ou "estoque" (valores absolutos) ou "ajuste_percentual" /
+        "ajuste_valor" (reajuste sobre o preço atual). Ex.:
+            {"codigo_barras": "789...", "ajuste_percentual": 8.5}
+        Estoque fracionado só vale para produtos vendidos por peso
+        (UNIDADES_FRACIONADAS).
+
+        Sem alteracoes, ajuste_percentual/ajuste_valor reajusta todos os
+        produtos do filtro (categoria_id e/ou fornecedor, obrigatório). Com
+        alteracoes, o filtro restringe os itens da lista e o ajuste global vale
+        para os itens que não trazem preço nem ajuste próprios.
+
+        Retorna {"alterados": [{"id", "nome", "preco": (antes, depois),
+        "estoque": (antes, depois)}], "nao_encontrados": [chaves sem produto],
+        "ignorados": [chaves de produtos fora do filtro]}; campos sem mudança
+        ficam fora do dict de cada produto.
+        """
+        alteracoes = Produto._converter_alteracoes(alteracoes)
+        if ajuste_percentual is not None:
+            ajuste_percentual = _converter_valor_lote("ajuste_percentual", ajuste_percentual)
+        if ajuste_valor is not None:
+            ajuste_valor = _converter_valor_lote("ajuste_valor", ajuste_valor)
+        if not alteracoes and ajuste_percentual is None and ajuste_valor is None:
+            raise Exception("Nenhuma alteração informada.")
+        if not alteracoes and categoria_id is None and not fornecedor:
+            raise Exception("Informe categoria ou fornecedor para reajustar preços em lote.")
+
+        def no_filtro(row):
+            return (categoria_id is None or row["categoria_id"] == categoria_id) and (
+                not fornecedor or row["fornecedor"] == fornecedor
+            )
+
+        nao_encontrados, ignorados = [], []
+        novos = {}  # id -> (row, preco_depois, estoque_depois)
+        with transacao() as conn:
+            cur = conn.cursor()
+            if alteracoes:
+                for alteracao, (chave, rows) in zip(alteracoes, Produto._resolver_alteracoes(cur, alteracoes)):
+                    if not rows:
+                        nao_encontrados.append(chave)
+                        continue
+                    rows = [row for row in rows if no_filtro(row)]
+                    if not rows:
+                        ignorados.append(chave)
+                        continue
+                    proprio = any(k in alteracao for k in ("preco", "ajuste_percentual", "ajuste_valor"))
+                    for row in rows:
+                        # Produto repetido na lista: a alteração parte do valor já ajustado
+                        _, preco_atual, estoque_atual = novos.get(row["id"], (row, row["preco"], row["estoque"]))
+                        if "preco" in alteracao:
+                            preco_depois = round(alteracao["preco"], 2)
+                        elif proprio:
+                            preco_depois = _preco_reajustado(
+                                preco_atual, alteracao.get("ajuste_percentual"), alteracao.get("ajuste_valor")
+                            )
+                        else:
+                            preco_depois = _preco_reajustado(preco_atual, ajuste_percentual, ajuste_valor)
+                        novos[row["id"]] = (row, preco_depois, alteracao.get("estoque", estoque_atual))
+            else:
+                filtros, parametros = [], []
+                if categoria_id is not None:
+                    filtros.append("categoria_id = ?")
+                    parametros.append(categoria_id)
+                if fornecedor:
+                    filtros.append("fornecedor = ?")
+                    parametros.append(fornecedor)
+                cur.execute(f"SELECT {Produto._COLUNAS_LOTE} FROM produtos WHERE {' AND '.join(filtros)}", parametros)
+                for row in cur.fetchall():
+                    novos[row["id"]] = (row, _preco_reajustado(row["preco"], ajuste_percentual, ajuste_valor), row["estoque"])
+
+            alterados, parametros_update = [], []
+            for produto_id, (row, preco_depois, estoque_depois) in novos.items():
+                nome, preco, estoque = row["nome"], row["preco"], row["estoque"]
+                if preco_depois < 0:
+                    raise Exception(f"Preço de '{nome}' ficaria negativo ({preco_depois:.2f}).")
+                if estoque_depois is not None and estoque_depois < 0:
+                    raise Exception(f"Estoque de '{nome}' não pode ser negativo.")
+                if (
+                    estoque_depois is not None
+                    and not float(estoque_depois).is_integer()
+                    and (row["unidade"] or "").upper() not in UNIDADES_FRACIONADAS
+                ):
+                    raise Exception(f"Estoque de '{nome}' precisa ser inteiro: o produto não é vendido por peso.")
+                diff = {"id": produto_id, "nome": nome}
+                if preco_depois != preco:
+                    diff["preco"] = (preco, preco_depois)
+                if estoque_depois != estoque:
+                    diff["estoque"] = (estoque, estoque_depois)
+                if len(diff) > 2:
+                    alterados.append(diff)
+                    parametros_update.append((preco_depois, estoque_depois, produto_id))
+            cur.executemany("UPDATE produtos SET preco = ?, estoque = ? WHERE id = ?", parametros_update)
+
+        if alterados:
+            catalogo.invalidar()
+        logger.info(
+            "Atualização em lote: %d produto(s) alterado(s), %d chave(s) não encontrada(s), %d fora do filtro.",
+            len(alterados),
+            len(nao_encontrados),
+            len(ignorados),
+        )
+        return {"alterados": alterados, "nao_encontrados": nao_encontrados, "ignorados": ignorados}
+
+    # Colunas lidas por atualizar_em_lote (unidade = sigla da unidade de medida)
+    _COLUNAS_LOTE = (
+        "id, nome, codigo_barras, preco, estoque, categoria_id, fornecedor, "
+        "(SELECT sigla FROM unidades_medida u WHERE u.id = produtos.unidade_id) AS unidade"
+    )
+
+    @staticmethod
+    def _converter_alteracoes(alteracoes):
+        """
+        Cópias das alterações com "estoque" convertido por converter_quantidade
+        e "preco"/"ajuste_*" por float(), antes de abrir a transação. Valores
+        ausentes (None) ou não numéricos levantam Exception com a chave.
+        """
+        convertidas = []
+        for alteracao in alteracoes or ():
+            referencia = f" no item {alteracao.get('id', alteracao.get('codigo_barras'))!r}"
+            convertida = dict(alteracao)
+            for chave in ("preco", "estoque", "ajuste_percentual", "ajuste_valor"):
+                if chave in alteracao:
+                    convertida[chave] = _converter_valor_lote(chave, alteracao[chave], referencia)
+            convertidas.append(convertida)
+        return convertidas
+
+    @staticmethod
+    def _resolver_alteracoes(cur, alteracoes):
+        """
+        Busca os produtos das alterações por id ou código de barras (em blocos
+        de 500 chaves, abaixo do limite de parâmetros do SQLite). Retorna
+        [(chave, [rows])] na ordem das alterações; um código de barras pode
+        estar em mais de um produto, e lista vazia indica chave sem produto.
+        """
+        por_id = [a["id"] for a in alteracoes if a.get("id") is not None]
+        por_codigo = [str(a["codigo_barras"]) for a in alteracoes if a.get("id") is None and a.get("codigo_barras")]
+        atuais_id, atuais_codigo = {}, {}
+        for coluna, chaves in (("id", por_id), ("codigo_barras", por_codigo)):
+            for i in range(0, len(chaves), 500):
+                bloco = chaves[i:i + 500]
+                cur.execute(
+                    f"SELECT {Produto._COLUNAS_LOTE} FROM produtos WHERE {coluna} IN ({','.join('?' * len(bloco))})",
+                    bloco,
+                )
+                for row in cur.fetchall():
+                    if coluna == "id":
+                        atuais_id[row["id"]] = [row]
+                    else:
+                        atuais_codigo.setdefault(row["codigo_barras"], []).append(row)
+
+        resolvidas = []
+        for alteracao in alteracoes:
+            if alteracao.get("id") is not None:
+                chave = alteracao["id"]
+                resolvidas.append((chave, atuais_id.get(chave, [])))
+            else:
+                chave = str(alteracao.get("codigo_barras") or "")
+                resolvidas.append((chave, atuais_codigo.get(chave, [])))
+        return resolvidas
+
     @staticmethod
     def excluir(nome):
         with conectar() as conn:
@@ -134,6 +586,7 @@ class Produto:
             cur.execute("DELETE FROM produtos WHERE nome = ?", (nome,))
             if cur.rowcount == 0:
                 raise Exception(f"Produto '{nome}' não encontrado para exclusão.")
+        catalogo.refresh(nome=nome)
         logger.info("Produto '%s' excluído.", nome)
 
     @staticmethod
@@ -152,43 +605,197 @@ class Produto:
         valor = (valor or "").strip()
         if not valor:
             return None
+        # Código de barras exato primeiro: resolvido em memória pelo catálogo
+        row = catalogo.por_codigo(valor)
+        if row is not None:
+            return row
+        etiqueta = decodificar_etiqueta(valor)
+        if etiqueta is not None:
+            # Etiqueta de balança: resolve pelo PLU, sem cair na busca por nome
+            return Produto._produto_por_plu(etiqueta.plu)
         with conectar() as conn:
             cur = conn.cursor()
+            rows = Produto._buscar_prefixo(cur, valor, 1)
+            if rows:
+                return rows[0]
+            row = Produto._buscar_nome_fts(cur, valor)
+            if row is None:
+                cur.execute(
+                    """
+                    SELECT id, nome, preco, estoque, codigo_barras
+                    FROM produtos
+                    WHERE nome_busca LIKE ?
+                    ORDER BY nome_busca
+                    LIMIT 1
+                    """,
+                    (f"%{normalizar_busca(valor)}%",),
+                )
+                row = cur.fetchone()
+        return row
+
+    @staticmethod
+    def _produto_por_plu(plu: str):
+        """Produto vendido na balança: o PLU fica em codigo_barras, com ou sem zeros à esquerda."""
+        row = catalogo.por_codigo(plu)
+        if row is None and plu.lstrip("0") != plu:
+            row = catalogo.por_codigo(plu.lstrip("0"))
+        return row
+
+    @staticmethod
+    def buscar_etiqueta_balanca(codigo: str):
+        """
+        Decodifica uma etiqueta de balança (ver APP/core/balanca.py) e retorna
+        (produto, quantidade), ou None se o código não é etiqueta ou o PLU não
+        está cadastrado. Com preço embutido a quantidade é preço / preço
+        unitário; com peso embutido é o peso em kg (ou em gramas se a unidade
+        do produto for G). Código de barras cadastrado não é tratado como
+        etiqueta, mesmo que comece com "2" e tenha dígito verificador válido.
+        """
+        etiqueta = decodificar_etiqueta(codigo)
+        if etiqueta is None or catalogo.por_codigo(etiqueta.codigo) is not None:
+            return None
+        row = Produto._produto_por_plu(etiqueta.plu)
+        if row is None:
+            logger.warning("Etiqueta de balança %s: PLU %s sem produto cadastrado.", codigo, etiqueta.plu)
+            return None
+        if etiqueta.tipo_valor == "peso":
+            quantidade = etiqueta.valor
+            with conectar() as conn:
+                unidade = conn.execute(
+                    """
+                    SELECT u.sigla
+                    FROM produtos p
+                    LEFT JOIN unidades_medida u ON u.id = p.unidade_id
+                    WHERE p.id = ?
+                    """,
+                    (row[0],),
+                ).fetchone()
+            if unidade and (unidade[0] or "").upper() == "G":
+                quantidade = etiqueta.valor * 1000
+        else:
+            preco = float(row[2])
+            if preco <= 0:
+                logger.warning("Etiqueta de balança %s: produto '%s' sem preço.", codigo, row[1])
+                return None
+            quantidade = etiqueta.valor / preco
+        return row, round(quantidade, 3)
+
+    @staticmethod
+    def _buscar_prefixo(cur, valor, limit):
+        """
+        Produtos cujo nome começa com o termo, sem diferenciar acentos e
+        maiúsculas. A faixa nome_busca >= 'pao' AND nome_busca < 'pap' é
+        resolvida pelo índice idx_produtos_nome_busca.
+        """
+        inicio = normalizar_busca(valor)
+        if not inicio:
+            return []
+        fim = inicio[:-1] + chr(ord(inicio[-1]) + 1)
+        cur.execute(
+            """
+            SELECT id, nome, preco, estoque, codigo_barras
+            FROM produtos
+            WHERE nome_busca >= ? AND nome_busca < ?
+            ORDER BY nome_busca
+            LIMIT ?
+            """,
+            (inicio, fim, limit),
+        )
+        return [tuple(row) for row in cur.fetchall()]
+
+    @staticmethod
+    def buscar_prefixo(valor: str, limit: int = 5):
+        """Produtos cujo nome começa com o termo (consulta direta ao banco, sem o catálogo)."""
+        with conectar() as conn:
+            return Produto._buscar_prefixo(conn.cursor(), valor, limit)
+
+    @staticmethod
+    def _buscar_nome_fts(cur, valor):
+        """Melhor produto (bm25) cujo nome contém o termo, via produtos_fts."""
+        modo = _modo_fts()
+        expressao = _expressao_fts(valor, modo, coluna="nome_busca") if modo else None
+        if not expressao:
+            return None
+        try:
             cur.execute(
                 """
-                SELECT
-                    p.id,
-                    p.nome,
-                    p.preco,
-                    p.estoque,
-                    p.codigo_barras
-                FROM produtos p
-                WHERE LOWER(p.nome) LIKE ?
-                   OR (p.codigo_barras IS NOT NULL AND p.codigo_barras = ?)
-                ORDER BY CASE WHEN p.codigo_barras = ? THEN 0 ELSE 1 END, p.nome
+                SELECT p.id, p.nome, p.preco, p.estoque, p.codigo_barras
+                FROM produtos_fts f
+                JOIN produtos p ON p.id = f.rowid
+                WHERE produtos_fts MATCH ?
+                ORDER BY bm25(produtos_fts), p.nome
                 LIMIT 1
                 """,
-                (f"%{valor.lower()}%", valor, valor),
+                (expressao,),
             )
-            row = cur.fetchone()
-        return row
+        except sqlite3.OperationalError as e:
+            logger.warning("Busca FTS por nome falhou (%s); usando LIKE.", e)
+            return None
+        return cur.fetchone()
 
     @staticmethod
     def buscar_sugestoes(valor: str, limit: int = 5):
-        termo = (valor or "").strip().lower()
+        """
+        Sugestões para o PDV: primeiro os nomes que começam com o termo (catálogo
+        em memória), depois produtos_fts ordenado por relevância (bm25, nome
+        pesando mais que código de barras). Recorre ao LIKE quando o FTS5 não
+        está disponível ou o termo é curto demais para o índice.
+        """
+        termo = normalizar_busca(valor)
         if not termo:
             return []
+        # Nomes que começam com o termo vêm primeiro, direto do catálogo em memória
+        resultado = catalogo.buscar_prefixo(termo, limit)
+        if len(resultado) >= limit:
+            return resultado
+        vistos = {row[0] for row in resultado}
+
+        def completar(rows):
+            for row in rows:
+                if row[0] not in vistos and len(resultado) < limit:
+                    resultado.append(tuple(row))
+            return resultado
+
+        modo = _modo_fts()
+        expressao = _expressao_fts(termo, modo) if modo else None
         with conectar() as conn:
             cur = conn.cursor()
+            if expressao:
+                try:
+                    cur.execute(
+                        """
+                        SELECT p.id, p.nome, p.preco, p.estoque, p.codigo_barras
+                        FROM produtos_fts f
+                        JOIN produtos p ON p.id = f.rowid
+                        WHERE produtos_fts MATCH ?
+                        ORDER BY bm25(produtos_fts, 10.0, 1.0), p.nome
+                        LIMIT ?
+                        """,
+                        (expressao, limit),
+                    )
+                    return completar(cur.fetchall())
+                except sqlite3.OperationalError as e:
+                    logger.warning("Busca FTS falhou (%s); usando LIKE.", e)
             cur.execute(
                 """
                 SELECT id, nome, preco, estoque, codigo_barras
                 FROM produtos
-                WHERE LOWER(nome) LIKE ?
+                WHERE nome_busca LIKE ?
                    OR (codigo_barras IS NOT NULL AND codigo_barras LIKE ?)
-                ORDER BY nome ASC
+                ORDER BY nome_busca ASC
                 LIMIT ?
                 """,
                 (f"%{termo}%", f"%{termo}%", limit),
             )
-            return cur.fetchall()
+            return completar(cur.fetchall())
+
+    @staticmethod
+    def buscar_fuzzy(valor: str, limit: int = 5):
+        """
+        Busca tolerante a erros de digitação ("refrigerente", "cocacola"),
+        pelo índice de trigramas do catálogo em memória. Retorna as linhas no
+        formato das demais buscas, da mais para a menos parecida.
+        """
+        if not (valor or "").strip():
+            return []
+        return [row for row, _ in catalogo.buscar_fuzzy(valor, limit)]
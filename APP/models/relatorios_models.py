@@ -0,0 +1,125 @@
+import heapq
+from APP.core.config import config
+from APP.core.database import conectar
+from APP.core.logger import logger
+from APP.models.vendas_models import intervalo_periodo
+
+
+class Relatorio:
+    """
+    Consultas agregadas para a tela de relatórios.
+
+    Tudo é somado no SQLite (GROUP BY) e volta em poucas linhas compactas, sem
+    montar a lista de pedidos. Períodos de dias inteiros usam o resumo
+    vendas_diarias; com recorte de horas, as somas vêm de pedidos/pedido_itens
+    pelo intervalo de data_hora (índice idx_pedidos_data_hora).
+    """
+
+    @staticmethod
+    def resumo(data_inicio, data_fim, hora_inicio=None, hora_fim=None):
+        """
+        Retorna {"pedidos", "total", "ticket_medio", "versao"} do período.
+        versao muda quando pedidos do período são incluídos, excluídos ou
+        alterados no total (chave de cache dos gráficos).
+        """
+        inicio, fim = intervalo_periodo(data_inicio, data_fim, hora_inicio, hora_fim)
+        with conectar() as conn:
+            pedidos, total, ultimo_id = conn.execute(
+                """
+                SELECT COUNT(*), COALESCE(SUM(total), 0), COALESCE(MAX(id), 0)
+                FROM pedidos
+                WHERE data_hora >= ? AND data_hora < ?
+                """,
+                (inicio, fim),
+            ).fetchone()
+        return {
+            "pedidos": pedidos,
+            "total": round(total, 2),
+            "ticket_medio": round(total / pedidos, 2) if pedidos else 0.0,
+            "versao": (pedidos, round(total, 2), ultimo_id),
+        }
+
+    @staticmethod
+    def por_produto(data_inicio, data_fim, hora_inicio=None, hora_fim=None, ordenar=True):
+        """
+        Retorna [(produto, quantidade, total)] do período, da maior quantidade
+        para a menor (ordenar=False devolve sem ordem, para quem só quer o top-N).
+        """
+        ordem_diaria = "ORDER BY qtd DESC, produto" if ordenar else ""
+        ordem_itens = "ORDER BY qtd DESC, i.produto" if ordenar else ""
+        with conectar() as conn:
+            if hora_inicio is None and hora_fim is None:
+                rows = conn.execute(
+                    f"""
+                    SELECT produto, SUM(quantidade) AS qtd, SUM(total)
+                    FROM vendas_diarias
+                    WHERE data BETWEEN ? AND ?
+                    GROUP BY produto
+                    HAVING qtd > 0
+                    {ordem_diaria}
+                    """,
+                    (data_inicio, data_fim),
+                ).fetchall()
+            else:
+                inicio, fim = intervalo_periodo(data_inicio, data_fim, hora_inicio, hora_fim)
+                rows = conn.execute(
+                    f"""
+                    SELECT i.produto, SUM(i.quantidade) AS qtd, SUM(i.total)
+                    FROM pedidos p
+                    JOIN pedido_itens i ON i.pedido_fk = p.id
+                    WHERE p.data_hora >= ? AND p.data_hora < ?
+                    GROUP BY i.produto
+                    {ordem_itens}
+                    """,
+                    (inicio, fim),
+                ).fetchall()
+        rows = [tuple(row) for row in rows]
+        logger.debug("Relatório por produto %s → %s: %d produtos.", data_inicio, data_fim, len(rows))
+        return rows
+
+    @staticmethod
+    def top_produtos(data_inicio, data_fim, hora_inicio=None, hora_fim=None, n=None, criterio="quantidade"):
+        """
+        Retorna os n produtos com maior quantidade (ou total, criterio="total")
+        no período como [(produto, valor)], mais ("Outros", soma do restante)
+        quando sobram produtos. n vem de "relatorios_top_produtos" no
+        config.json. Seleção parcial com heapq.nlargest: O(P log n) e gráficos
+        com no máximo n + 1 barras/fatias, seja qual for o tamanho do catálogo.
+        """
+        if criterio not in ("quantidade", "total"):
+            raise Exception(f"Critério inválido: {criterio}")
+        n = n or config.get("relatorios_top_produtos", 10)
+        coluna = 1 if criterio == "quantidade" else 2
+        rows = Relatorio.por_produto(data_inicio, data_fim, hora_inicio, hora_fim, ordenar=False)
+        top = heapq.nlargest(n, rows, key=lambda row: row[coluna])
+        resultado = [(row[0], row[coluna]) for row in top]
+        if len(rows) > n:
+            outros = sum(row[coluna] for row in rows) - sum(valor for _, valor in resultado)
+            resultado.append(("Outros", round(outros, 3)))
+        return resultado
+
+    @staticmethod
+    def por_forma_pagamento(data_inicio, data_fim, hora_inicio=None, hora_fim=None):
+        """Retorna [(forma_pagamento, pedidos, total)] do período, do maior total para o menor."""
+        return Relatorio._agrupar_pedidos("COALESCE(forma_pagamento, 'N/D')", data_inicio, data_fim, hora_inicio, hora_fim)
+
+    @staticmethod
+    def por_vendedor(data_inicio, data_fim, hora_inicio=None, hora_fim=None):
+        """Retorna [(vendedor, pedidos, total)] do período, do maior total para o menor."""
+        return Relatorio._agrupar_pedidos("COALESCE(vendedor, 'N/D')", data_inicio, data_fim, hora_inicio, hora_fim)
+
+    @staticmethod
+    def _agrupar_pedidos(expressao, data_inicio, data_fim, hora_inicio, hora_fim):
+        inicio, fim = intervalo_periodo(data_inicio, data_fim, hora_inicio, hora_fim)
+        with conectar() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {expressao} AS grupo, COUNT(*), SUM(total) AS soma
+                FROM pedidos
+                WHERE data_hora >= ? AND data_hora < ?
+                GROUP BY grupo
+                ORDER BY soma DESC, grupo
+                """,
+                (inicio, fim),
+            ).fetchall()
+        return [tuple(row) for row in rows]
@@ -1,5 +1,114 @@
-from APP.core.database import conectar
+import uuid
+from datetime import datetime, timedelta
+from APP.core.database import conectar, transacao, SUPORTA_RETURNING
 from APP.core.logger import logger
+from APP.models.produtos_models import catalogo
+
+FORMATO_DATA_HORA = "%Y-%m-%d %H:%M:%S"
+
+
+def intervalo_periodo(data_inicio, data_fim, hora_inicio=None, hora_fim=None):
+    """
+    Converte um período (datas YYYY-MM-DD inclusivas e, opcionalmente, horas 0-23
+    inclusivas) em um intervalo semiaberto [inicio, fim) de timestamps.
+
+    O intervalo é comparado diretamente com data_hora, sem funções sobre a
+    coluna, para que o índice de data_hora seja usado.
+    """
+    inicio = datetime.strptime(data_inicio, "%Y-%m-%d")
+    fim = datetime.strptime(data_fim, "%Y-%m-%d")
+    if hora_inicio is not None:
+        inicio = inicio.replace(hour=int(hora_inicio))
+    if hora_fim is not None:
+        fim = fim.replace(hour=int(hora_fim)) + timedelta(hours=1)
+    else:
+        fim = fim + timedelta(days=1)
+    return inicio.strftime(FORMATO_DATA_HORA), fim.strftime(FORMATO_DATA_HORA)
+
+
+def _baixar_estoque(cur, produto, quantidade):
+    """
+    Baixa o estoque de um produto em um único UPDATE condicional. O resultado
+    é arredondado a 3 casas (gramas) para quantidades fracionadas não
+    acumularem erro de ponto flutuante; estoques inteiros continuam inteiros.
+    Retorna (estoque_restante, preco, id) ou None se o produto não existir ou não
+    tiver estoque suficiente — nunca deixa o estoque ficar negativo, mesmo com
+    vários terminais vendendo o mesmo produto ao mesmo tempo.
+    """
+    if SUPORTA_RETURNING:
+        cur.execute(
+            "UPDATE produtos SET estoque = round(estoque - ?, 3) WHERE nome = ? AND estoque >= ? RETURNING estoque, preco, id",
+            (quantidade, produto, quantidade),
+        )
+        rows = cur.fetchall()  # consome o cursor para finalizar o statement
+        return rows[0] if rows else None
+
+    # SQLite antigo: o UPDATE condicional continua atômico; a leitura seguinte
+    # acontece na mesma transação, que já detém o lock de escrita.
+    cur.execute(
+        "UPDATE produtos SET estoque = round(estoque - ?, 3) WHERE nome = ? AND estoque >= ?",
+        (quantidade, produto, quantidade),
+    )
+    if cur.rowcount == 0:
+        return None
+    cur.execute("SELECT estoque, preco, id FROM produtos WHERE nome = ?", (produto,))
+    return cur.fetchone()
+
+
+def _gravar_pedido(cur, pedido_id, linhas, vendedor, cliente, forma_pagamento, data_hora):
+    """
+    Grava o cabeçalho do pedido (ou soma ao já existente) e insere os itens.
+    linhas: dicts com produto_id, produto, quantidade, preco_unitario e total.
+    """
+    cur.execute(
+        """
+        INSERT INTO pedidos (pedido_id, vendedor, cliente, forma_pagamento, data_hora, total)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(pedido_id) DO UPDATE SET total = total + excluded.total
+        """,
+        (pedido_id, vendedor, cliente, forma_pagamento, data_hora, round(sum(l["total"] for l in linhas), 2)),
+    )
+    cur.execute("SELECT id FROM pedidos WHERE pedido_id = ?", (pedido_id,))
+    pedido_fk = cur.fetchone()[0]
+    cur.executemany(
+        """
+        INSERT INTO pedido_itens (pedido_fk, produto_id, produto, quantidade, preco_unitario, total)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (pedido_fk, l["produto_id"], l["produto"], l["quantidade"], l["preco_unitario"], l["total"])
+            for l in linhas
+        ],
+    )
+    return pedido_fk
+
+
+def _montar_pedidos(cabecalhos, itens):
+    """Monta os dicts de pedido (com a lista de itens) a partir das linhas de pedidos/pedido_itens."""
+    pedidos_map = {}
+    pedidos = []
+    for row in cabecalhos:
+        pedido = {
+            "pedido_id": row[1],
+            "data_hora": row[2],
+            "vendedor": row[3] or "N/D",
+            "cliente": row[4] or "Consumidor Final",
+            "forma_pagamento": row[5] or "N/D",
+            "total": row[6],
+            "itens": [],
+        }
+        pedidos_map[row[0]] = pedido
+        pedidos.append(pedido)
+    for row in itens:
+        pedidos_map[row[0]]["itens"].append(
+            {
+                "id": row[1],
+                "produto": row[2],
+                "quantidade": row[3],
+                "total": row[4],
+            }
+        )
+    return pedidos
 
 
 class Venda:
@@ -7,32 +116,24 @@ class Venda:
 
     @staticmethod
     def registrar(produto, quantidade, total, vendedor=None, cliente=None, forma_pagamento=None, pedido_id=None):
+        if quantidade <= 0:
+            raise Exception("Quantidade inválida para venda.")
+
         with conectar() as conn:
             cur = conn.cursor()
 
-            # Garante que o produto exista e que haja estoque suficiente
-            cur.execute("SELECT estoque, preco FROM produtos WHERE nome = ?", (produto,))
-            row = cur.fetchone()
-
+            # Baixa o estoque só se houver quantidade suficiente (sem ler-e-escrever)
+            row = _baixar_estoque(cur, produto, quantidade)
             if row is None:
-                raise Exception(f"Produto '{produto}' não encontrado para registrar a venda.")
-
-            estoque_atual, preco_unitario = int(row[0]), float(row[1])
-
-            if quantidade <= 0:
-                raise Exception("Quantidade inválida para venda.")
-
-            if estoque_atual < quantidade:
+                cur.execute("SELECT estoque FROM produtos WHERE nome = ?", (produto,))
+                atual = cur.fetchone()
+                if atual is None:
+                    raise Exception(f"Produto '{produto}' não encontrado para registrar a venda.")
                 raise Exception(
-                    f"Estoque insuficiente para '{produto}'. Disponível: {estoque_atual}, solicitado: {quantidade}."
+                    f"Estoque insuficiente para '{produto}'. Disponível: {atual[0]}, solicitado: {quantidade}."
                 )
 
-            # Atualiza estoque do produto
-            novo_estoque = estoque_atual - quantidade
-            cur.execute(
-                "UPDATE produtos SET estoque = ? WHERE nome = ?",
-                (novo_estoque, produto),
-            )
+            novo_estoque, preco_unitario, produto_id = row[0], float(row[1]), row[2]
 
             # Registra a venda
             total_calculado = round(preco_unitario * quantidade, 2)
@@ -43,16 +144,28 @@ class Venda:
                     total_calculado,
                     produto,
                 )
-            cur.execute(
-                """
-                INSERT INTO vendas (produto, quantidade, total, vendedor, cliente, forma_pagamento, pedido_id, data_hora)
-                VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now', 'localtime'))
-                """,
-                (produto, quantidade, total_calculado, vendedor, cliente, forma_pagamento, pedido_id),
+            pedido_id = pedido_id or f"AVULSO-{uuid.uuid4().hex[:12]}"
+            _gravar_pedido(
+                cur,
+                pedido_id,
+                [
+                    {
+                        "produto_id": produto_id,
+                        "produto": produto,
+                        "quantidade": quantidade,
+                        "preco_unitario": preco_unitario,
+                        "total": total_calculado,
+                    }
+                ],
+                vendedor,
+                cliente,
+                forma_pagamento,
+                datetime.now().strftime(FORMATO_DATA_HORA),
             )
 
+        catalogo.atualizar_estoque(produto_id, novo_estoque)
         logger.info(
-            "Venda registrada: pedido=%s | %s x%d = R$ %.2f por %s (estoque restante: %d) | cliente=%s | pagamento=%s",
+            "Venda registrada: pedido=%s | %s x%s = R$ %.2f por %s (estoque restante: %s) | cliente=%s | pagamento=%s",
             pedido_id or "N/D",
             produto,
             quantidade,
@@ -63,6 +176,148 @@ class Venda:
             forma_pagamento or "N/D",
         )
 
+    @staticmethod
+    def registrar_pedido(pedido_id, itens, vendedor=None, cliente=None, forma_pagamento=None):
+        """
+        Registra todos os itens de um pedido em uma única transação.
+
+        itens: iterável de dicts com "id" (ou "nome") do produto e "quantidade";
+        "valor_unitario" ou "total" são opcionais e só servem para conferência.
+        Valida produtos e estoque de todos os itens antes de gravar; qualquer
+        falha desfaz o pedido inteiro. Retorna a lista de itens gravados com
+        o total de cada um.
+        """
+        itens = list(itens)
+        if not itens:
+            raise Exception("Pedido sem itens para registrar.")
+        pedido_id = pedido_id or f"AVULSO-{uuid.uuid4().hex[:12]}"
+
+        with transacao() as conn:
+            cur = conn.cursor()
+
+            ids = sorted({item["id"] for item in itens if item.get("id") is not None})
+            nomes = sorted({item["nome"] for item in itens if item.get("id") is None and item.get("nome")})
+            produtos_por_id = {}
+            produtos_por_nome = {}
+            if ids:
+                marcadores = ", ".join("?" for _ in ids)
+                cur.execute(f"SELECT id, nome, estoque, preco FROM produtos WHERE id IN ({marcadores})", ids)
+                for row in cur.fetchall():
+                    produtos_por_id[row[0]] = row
+            if nomes:
+                marcadores = ", ".join("?" for _ in nomes)
+                cur.execute(f"SELECT id, nome, estoque, preco FROM produtos WHERE nome IN ({marcadores})", nomes)
+                for row in cur.fetchall():
+                    produtos_por_nome[row[1]] = row
+
+            # Valida tudo antes de qualquer escrita
+            linhas = []
+            solicitado = {}
+            disponivel = {}
+            for item in itens:
+                row = produtos_por_id.get(item.get("id")) if item.get("id") is not None else produtos_por_nome.get(item.get("nome"))
+                if row is None:
+                    raise Exception(f"Produto '{item.get('nome') or item.get('id')}' não encontrado para registrar a venda.")
+                quantidade = item["quantidade"]
+                if quantidade <= 0:
+                    raise Exception(f"Quantidade inválida para '{row[1]}'.")
+                solicitado[row[0]] = solicitado.get(row[0], 0) + quantidade
+                disponivel[row[0]] = row[2]
+                if row[2] < solicitado[row[0]]:
+                    raise Exception(
+                        f"Estoque insuficiente para '{row[1]}'. Disponível: {row[2]}, solicitado: {solicitado[row[0]]}."
+                    )
+
+                preco_unitario = float(row[3])
+                total_calculado = round(preco_unitario * quantidade, 2)
+                total_informado = item.get("total")
+                if total_informado is None and item.get("valor_unitario") is not None:
+                    total_informado = item["valor_unitario"] * quantidade
+                if total_informado is not None and abs(total_informado - total_calculado) > 0.01:
+                    logger.warning(
+                        "Total informado (R$ %.2f) difere do calculado (R$ %.2f) para '%s'.",
+                        total_informado,
+                        total_calculado,
+                        row[1],
+                    )
+                linhas.append(
+                    {
+                        "produto_id": row[0],
+                        "produto": row[1],
+                        "quantidade": quantidade,
+                        "preco_unitario": preco_unitario,
+                        "total": total_calculado,
+                    }
+                )
+
+            cur.executemany(
+                "UPDATE produtos SET estoque = round(estoque - ?, 3) WHERE id = ? AND estoque >= ?",
+                [(qtd, produto_id, qtd) for produto_id, qtd in solicitado.items()],
+            )
+            if cur.rowcount != len(solicitado):
+                # Só acontece se o estoque mudou entre a validação e a baixa
+                raise Exception("Estoque alterado durante o registro do pedido. Tente novamente.")
+            data_hora = datetime.now().strftime(FORMATO_DATA_HORA)
+            _gravar_pedido(cur, pedido_id, linhas, vendedor, cliente, forma_pagamento, data_hora)
+            estoques = {produto_id: round(disponivel[produto_id] - qtd, 3) for produto_id, qtd in solicitado.items()}
+
+        for produto_id, estoque in estoques.items():
+            catalogo.atualizar_estoque(produto_id, estoque)
+        logger.info(
+            "Pedido registrado: pedido=%s | %d itens = R$ %.2f por %s | cliente=%s | pagamento=%s",
+            pedido_id or "N/D",
+            len(linhas),
+            sum(linha["total"] for linha in linhas),
+            vendedor if vendedor else "desconhecido",
+            cliente or "Consumidor Final",
+            forma_pagamento or "N/D",
+        )
+        return linhas
+
+    @staticmethod
+    def reconstruir_resumo_diario(data_inicio=None, data_fim=None):
+        """
+        Recalcula vendas_diarias a partir de pedidos/pedido_itens.
+        Sem datas, reconstrói todo o histórico; com datas (YYYY-MM-DD,
+        inclusivas), apenas os dias do período. Retorna o número de linhas geradas.
+        """
+        filtro_resumo, params_resumo = "", ()
+        filtro_pedidos, params_pedidos = "", ()
+        if data_inicio and data_fim:
+            filtro_resumo, params_resumo = "WHERE data BETWEEN ? AND ?", (data_inicio, data_fim)
+            filtro_pedidos = "WHERE p.data_hora >= ? AND p.data_hora < ?"
+            params_pedidos = intervalo_periodo(data_inicio, data_fim)
+
+        with transacao() as conn:
+            cur = conn.cursor()
+            cur.execute(f"DELETE FROM vendas_diarias {filtro_resumo}", params_resumo)
+            cur.execute(
+                f"""
+                INSERT INTO vendas_diarias (data, produto, forma_pagamento, quantidade, total, pedidos)
+                SELECT
+                    substr(p.data_hora, 1, 10),
+                    i.produto,
+                    COALESCE(p.forma_pagamento, 'N/D'),
+                    SUM(i.quantidade),
+                    SUM(i.total),
+                    COUNT(DISTINCT i.pedido_fk)
+                FROM pedidos p
+                JOIN pedido_itens i ON i.pedido_fk = p.id
+                {filtro_pedidos}
+                GROUP BY 1, 2, 3
+                """,
+                params_pedidos,
+            )
+            linhas = cur.rowcount
+
+        logger.info(
+            "Resumo diário reconstruído (%s → %s): %d linhas.",
+            data_inicio or "início",
+            data_fim or "hoje",
+            linhas,
+        )
+        return linhas
+
     @staticmethod
     def listar():
         with conectar() as conn:
@@ -74,52 +329,91 @@ class Venda:
         return rows
 
     @staticmethod
-    def listar_periodo(data_inicio, data_fim):
-        """Retorna todas as vendas entre as datas informadas (inclusive)."""
+    def listar_periodo(data_inicio, data_fim, hora_inicio=None, hora_fim=None):
+        """
+        Retorna todas as vendas entre as datas informadas (inclusive).
+        hora_inicio/hora_fim (0-23, inclusivas) restringem o período por hora.
+        """
         try:
+            inicio, fim = intervalo_periodo(data_inicio, data_fim, hora_inicio, hora_fim)
             with conectar() as conn:
                 cur = conn.cursor()
                 cur.execute(
                     """
-                    SELECT id, produto, quantidade, total, vendedor, data_hora, cliente, forma_pagamento, pedido_id
-                    FROM vendas
-                    WHERE substr(data_hora, 1, 10) BETWEEN ? AND ?
-                    ORDER BY data_hora ASC
+                    SELECT id, pedido_id, data_hora, vendedor, cliente, forma_pagamento, total
+                    FROM pedidos
+                    WHERE data_hora >= ? AND data_hora < ?
+                    ORDER BY data_hora ASC, id ASC
                     """,
-                    (data_inicio, data_fim),
+                    (inicio, fim),
                 )
-                rows = cur.fetchall()
-
-            pedidos_map = {}
-            pedidos = []
-            for row in rows:
-                pedido_id = row[8] or f"LEGACY-{row[0]}"
-                if pedido_id not in pedidos_map:
-                    pedido = {
-                        "pedido_id": pedido_id,
-                        "data_hora": row[5],
-                        "vendedor": row[4] or "N/D",
-                        "cliente": row[6] or "Consumidor Final",
-                        "forma_pagamento": row[7] or "N/D",
-                        "total": 0.0,
-                        "itens": [],
-                    }
-                    pedidos_map[pedido_id] = pedido
-                    pedidos.append(pedido)
-                pedido = pedidos_map[pedido_id]
-                pedido["itens"].append(
-                    {
-                        "id": row[0],
-                        "produto": row[1],
-                        "quantidade": row[2],
-                        "total": row[3],
-                    }
+                cabecalhos = cur.fetchall()
+                cur.execute(
+                    """
+                    SELECT i.pedido_fk, i.id, i.produto, i.quantidade, i.total
+                    FROM pedidos p
+                    JOIN pedido_itens i ON i.pedido_fk = p.id
+                    WHERE p.data_hora >= ? AND p.data_hora < ?
+                    ORDER BY i.pedido_fk, i.id
+                    """,
+                    (inicio, fim),
                 )
-                pedido["total"] += row[3]
+                itens = cur.fetchall()
 
-            logger.info(f"{len(pedidos)} pedidos encontrados no período {data_inicio} → {data_fim}")
+            pedidos = _montar_pedidos(cabecalhos, itens)
+            logger.info(f"{len(pedidos)} pedidos encontrados no período {inicio} → {fim}")
             return pedidos
 
         except Exception as e:
             logger.error(f"Erro ao buscar vendas no período: {e}", exc_info=True)
             return []
+
+    @staticmethod
+    def listar_periodo_pagina(data_inicio, data_fim, hora_inicio=None, hora_fim=None, apos=None, limite=30):
+        """
+        Uma página das vendas do período, em ordem de (data_hora, id).
+
+        Paginação por chave: apos é o cursor (data_hora, id) devolvido pela
+        página anterior (None = início do período), então cada página custa o
+        mesmo, seja a primeira ou a milésima. Retorna (pedidos, cursor); cursor
+        é None quando não há mais páginas (ou em caso de erro, com pedidos vazio).
+        """
+        try:
+            inicio, fim = intervalo_periodo(data_inicio, data_fim, hora_inicio, hora_fim)
+            filtro, params = "", [inicio, fim]
+            if apos is not None:
+                filtro = "AND (data_hora, id) > (?, ?)"
+                params.extend(apos)
+            with conectar() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    f"""
+                    SELECT id, pedido_id, data_hora, vendedor, cliente, forma_pagamento, total
+                    FROM pedidos
+                    WHERE data_hora >= ? AND data_hora < ? {filtro}
+                    ORDER BY data_hora ASC, id ASC
+                    LIMIT ?
+                    """,
+                    params + [limite],
+                )
+                cabecalhos = cur.fetchall()
+                itens = []
+                if cabecalhos:
+                    ids = [row[0] for row in cabecalhos]
+                    cur.execute(
+                        f"""
+                        SELECT pedido_fk, id, produto, quantidade, total
+                        FROM pedido_itens
+                        WHERE pedido_fk IN ({','.join('?' * len(ids))})
+                        ORDER BY pedido_fk, id
+                        """,
+                        ids,
+                    )
+                    itens = cur.fetchall()
+
+            cursor = (cabecalhos[-1][2], cabecalhos[-1][0]) if len(cabecalhos) == limite else None
+            return _montar_pedidos(cabecalhos, itens), cursor
+
+        except Exception as e:
+            logger.error(f"Erro ao buscar página de vendas do período: {e}", exc_info=True)
+            return [], None
@@ -0,0 +1,125 @@
+# APP/ui/atualizacoes.py
+"""
+Agrupamento de atualizações da interface.
+
+Cada page.update() serializa e envia a árvore da página ao cliente Flet. Um
+único evento (ex.: ler um produto no PDV) costumava chamar page.update() três
+ou quatro vezes. Com o UpdateBatcher as telas marcam os controles alterados
+com atualizar(ctrl, ...) e, dentro de acao("nome"), o envio acontece uma vez
+só no fim da ação, atualizando apenas os controles marcados
+(page.update(*controles)). atualizar() sem controles marca a página inteira.
+Fora de uma ação o envio é imediato, como antes. apos_envio(callback) agenda
+código para depois do envio da ação (ex.: medir a latência vista na tela).
+O agrupamento é por thread: o que um worker marca não entra na ação aberta
+pela thread da interface, e vice-versa.
+"""
+
+import functools
+import threading
+from contextlib import contextmanager
+from APP.core.logger import logger
+
+
+class _EstadoThread(threading.local):
+    """Ação em andamento na thread atual (cada thread agrupa só o que ela marca)."""
+
+    def __init__(self):
+        self.sujos = {}  # id(controle) -> controle, na ordem de marcação
+        self.pagina = False
+        self.profundidade = 0
+        self.flushes_acao = 0
+        self.apos_envio = []
+
+
+class UpdateBatcher:
+    def __init__(self, page, nome: str = "ui"):
+        self.page = page
+        self.nome = nome
+        self._lock = threading.Lock()
+        # Workers (sugestões, filtros, gráficos, importação, exportação) marcam
+        # controles enquanto a thread da interface está dentro de uma ação: o
+        # estado é por thread, para um não adiar nem enviar o lote do outro.
+        self._estado = _EstadoThread()
+        self.flushes = 0
+
+    def atualizar(self, *controles, imediato: bool = False):
+        """Marca controles (ou a página, sem argumentos) para o próximo envio."""
+        estado = self._estado
+        if controles:
+            for controle in controles:
+                if controle is not None:
+                    estado.sujos[id(controle)] = controle
+        else:
+            estado.pagina = True
+        if estado.profundidade == 0 or imediato:
+            self.flush()
+
+    def apos_envio(self, callback):
+        """
+        Chama callback() depois do envio da ação em andamento nesta thread (o
+        da ação mais externa); fora de uma ação, chama na hora.
+        """
+        estado = self._estado
+        if estado.profundidade > 0:
+            estado.apos_envio.append(callback)
+            return
+        callback()
+
+    @contextmanager
+    def acao(self, nome: str):
+        """Agrupa as atualizações feitas dentro do bloco (nesta thread) em um único envio."""
+        estado = self._estado
+        estado.profundidade += 1
+        if estado.profundidade == 1:
+            estado.flushes_acao = 0
+        try:
+            yield self
+        finally:
+            estado.profundidade -= 1
+            if estado.profundidade == 0:
+                callbacks, estado.apos_envio = estado.apos_envio, []
+                self.flush()
+                logger.debug("[%s] ação '%s': %d envio(s) à página", self.nome, nome, estado.flushes_acao)
+                for callback in callbacks:
+                    try:
+                        callback()
+                    except Exception as e:
+                        logger.error("[%s] erro após o envio da ação '%s': %s", self.nome, nome, e, exc_info=True)
+
+    def flush(self):
+        """Envia os controles marcados pela thread atual."""
+        estado = self._estado
+        controles = list(estado.sujos.values())
+        pagina = estado.pagina
+        estado.sujos = {}
+        estado.pagina = False
+        if not controles and not pagina:
+            return
+        if self.page is None:
+            return
+        if pagina:
+            self.page.update()
+        else:
+            try:
+                self.page.update(*controles)
+            except Exception as e:
+                # Controle ainda não montado na página: envia a página inteira
+                logger.debug("[%s] update parcial falhou (%s); atualizando a página.", self.nome, e)
+                self.page.update()
+        estado.flushes_acao += 1
+        with self._lock:
+            self.flushes += 1
+
+
+def em_acao(nome: str = None):
+    """
+    Decorador para handlers de telas que têm um UpdateBatcher em self.ui:
+    todas as atualizações feitas pelo handler saem num único envio.
+    """
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def wrapper(self, *args, **kwargs):
+            with self.ui.acao(nome or metodo.__name__):
+                return metodo(self, *args, **kwargs)
+        return wrapper
+    return decorador
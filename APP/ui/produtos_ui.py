@@ -1,20 +1,45 @@
+import threading
 import flet as ft
-from APP.models.produtos_models import Produto
+from APP.models.importacao_models import ImportadorProdutos
+from APP.models.produtos_models import Produto, CAMPOS_BUSCA_PRODUTOS, APELIDOS_BUSCA_PRODUTOS, TRECHO_BUSCA_PRODUTOS
 from APP.models.categorias_models import Categoria
 from APP.models.unidades_models import UnidadeMedida
+from APP.core.busca import MultiFieldIndex
 from APP.core.logger import logger
+from APP.core.sugestoes import SuggestionPipeline
+from APP.core.utils import converter_quantidade, normalizar_busca
 from APP.ui import style
+from APP.ui.atualizacoes import UpdateBatcher, em_acao
 
 
 class ProdutosUI:
     """Tela moderna e minimalista de gerenciamento de produtos (com busca dinâmica)."""
 
+    # Linhas exibidas por página da tabela (apenas elas existem como controles)
+    TAMANHO_PAGINA = 50
+
     def __init__(self, page: ft.Page, voltar_callback=None):
         self.page = page
+        self.ui = UpdateBatcher(page, "produtos")
         self.voltar_callback = voltar_callback
         self.produtos_cache = []
         self.categorias_cache = []
         self.unidades_cache = []
+        self.produtos_filtrados = []
+        self.pagina = 0
+        self.indice_busca = MultiFieldIndex(CAMPOS_BUSCA_PRODUTOS, APELIDOS_BUSCA_PRODUTOS, TRECHO_BUSCA_PRODUTOS)
+        self._versao_cache = 0
+        self._linhas = []  # DataRows reaproveitadas entre páginas e filtros
+        self._exibidos = []  # valores das células exibidas em cada linha
+        # O filtro é aplicado pela thread do pipeline e a paginação/edição pela
+        # da interface: produtos_filtrados, pagina e as linhas só mudam com o lock
+        self._lock_tabela = threading.Lock()
+        self.filtro_pipeline = SuggestionPipeline(
+            buscar=self._filtrar,
+            aplicar=self._aplicar_filtro,
+            atraso=0.2,
+            versao=lambda: self._versao_cache,
+        )
         self.build_ui()
         logger.info("Tela de produtos carregada.")
 
@@ -108,6 +133,19 @@ class ProdutosUI:
             )
         )
 
+        self.campos_formulario = [
+            self.nome_field,
+            self.preco_field,
+            self.estoque_field,
+            self.fornecedor_field,
+            self.validade_field,
+            self.categoria_dropdown,
+            self.unidade_dropdown,
+            self.codigo_barras_field,
+            self.estoque_minimo_field,
+            self.localizacao_field,
+        ]
+
         self._atualizar_dropdown_categorias()
         self._atualizar_dropdown_unidades()
 
@@ -116,7 +154,7 @@ class ProdutosUI:
                 label="🔎 Pesquisar produto...",
                 width=320,
                 on_change=self.filtrar_produtos,
-                hint_text="Digite parte do nome",
+                hint_text="Nome, código ou forn:, cat:, loc:",
             )
         )
 
@@ -136,8 +174,16 @@ class ProdutosUI:
         btn_voltar = style.ghost_button(
             "Voltar",
             icon=ft.Icons.ARROW_BACK_ROUNDED,
-            on_click=lambda e: self.voltar_callback() if callable(self.voltar_callback) else None,
+            on_click=self._voltar,
         )
+        btn_importar = style.ghost_button(
+            "Importar CSV",
+            icon=ft.Icons.UPLOAD_FILE_ROUNDED,
+            on_click=self._escolher_csv,
+        )
+        # O FilePicker fica no overlay da página, que page.clean() não limpa
+        self.file_picker = ft.FilePicker(on_result=self._importar_csv)
+        self.page.overlay.append(self.file_picker)
         btn_new_categoria = ft.IconButton(
             icon=ft.Icons.ADD,
             tooltip="Nova categoria",
@@ -170,6 +216,22 @@ class ProdutosUI:
                 width=1000,
             )
         )
+        self.btn_pagina_anterior = ft.IconButton(
+            icon=ft.Icons.CHEVRON_LEFT,
+            tooltip="Página anterior",
+            on_click=lambda e: self._mudar_pagina(-1),
+        )
+        self.btn_pagina_proxima = ft.IconButton(
+            icon=ft.Icons.CHEVRON_RIGHT,
+            tooltip="Próxima página",
+            on_click=lambda e: self._mudar_pagina(1),
+        )
+        self.pagina_text = ft.Text("", color=style.TEXT_MUTED)
+        paginacao = ft.Row(
+            [self.btn_pagina_anterior, self.pagina_text, self.btn_pagina_proxima],
+            alignment=ft.MainAxisAlignment.CENTER,
+            spacing=8,
+        )
 
         layout = ft.Column(
             [
@@ -210,7 +272,7 @@ class ProdutosUI:
                     wrap=True,
                 ),
                 ft.Row(
-                    [btn_add, btn_update, btn_delete, btn_voltar],
+                    [btn_add, btn_update, btn_delete, btn_importar, btn_voltar],
                     alignment=ft.MainAxisAlignment.CENTER,
                     spacing=12,
                     wrap=True,
@@ -225,6 +287,7 @@ class ProdutosUI:
                     color=style.TEXT_DARK,
                 ),
                 self.tabela,
+                paginacao,
             ],
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
             spacing=18,
@@ -250,59 +313,135 @@ class ProdutosUI:
         try:
             produtos = Produto.listar()
             self.produtos_cache = produtos
-            self._render_tabela(produtos)
+            self.indice_busca.construir(produtos)
+            self._versao_cache += 1
+            # Resultado de filtro ainda em andamento veio do cache antigo: descarta
+            self.filtro_pipeline.cancelar()
+            self._render_tabela(self._filtrar(self.busca_field.value or ""), manter_pagina=True)
         except Exception as err:
             self.message.value = f"Erro ao carregar produtos: {err}"
             self.message.color = style.ERROR
             logger.error(f"Erro ao listar produtos: {err}")
-        self.page.update()
-
-    def _render_tabela(self, produtos):
-        """Renderiza a tabela a partir de uma lista de produtos."""
-        self.tabela.rows = []
-        for p in produtos:
-            categoria = p[6] or "-"
-            unidade = p[7] or "-"
-            codigo = p[8] or "-"
-            estoque_min = p[9] if p[9] is not None else "-"
-            localizacao = p[10] or "-"
-            self.tabela.rows.append(
-                ft.DataRow(
-                    cells=[
-                        ft.DataCell(ft.Text(str(p[0]), color=style.TEXT_MUTED)),
-                        ft.DataCell(
-                            ft.Text(
-                                p[1],
-                                color=style.TEXT_DARK,
-                                overflow=ft.TextOverflow.ELLIPSIS,
-                                max_lines=1,
-                            )
-                        ),
-                        ft.DataCell(ft.Text(categoria, color=style.TEXT_MUTED, overflow=ft.TextOverflow.ELLIPSIS)),
-                        ft.DataCell(ft.Text(unidade, color=style.TEXT_MUTED)),
-                        ft.DataCell(ft.Text(codigo, color=style.TEXT_MUTED, overflow=ft.TextOverflow.ELLIPSIS)),
-                        ft.DataCell(ft.Text(f"R$ {p[2]:.2f}", color=style.TEXT_MUTED)),
-                        ft.DataCell(ft.Text(str(p[3]), color=style.TEXT_MUTED)),
-                        ft.DataCell(ft.Text(str(estoque_min), color=style.TEXT_MUTED)),
-                        ft.DataCell(ft.Text(p[4] if p[4] else "-", color=style.TEXT_MUTED)),
-                        ft.DataCell(ft.Text(p[5] if p[5] else "-", color=style.TEXT_MUTED)),
-                        ft.DataCell(ft.Text(localizacao, color=style.TEXT_MUTED, overflow=ft.TextOverflow.ELLIPSIS)),
-                    ],
-                    on_select_changed=lambda e, produto=tuple(p): self._preencher_formulario(produto),
-                )
-            )
-        self.page.update()
+        self.ui.atualizar(self.tabela, self.message)
+
+    def _render_tabela(self, produtos, manter_pagina=False):
+        """Define a lista exibida (já filtrada) e renderiza a página atual."""
+        with self._lock_tabela:
+            self.produtos_filtrados = produtos
+            if not manter_pagina:
+                self.pagina = 0
+            self._render_pagina()
+
+    def _valores_linha(self, p):
+        return (
+            str(p[0]),
+            p[1],
+            p[6] or "-",
+            p[7] or "-",
+            p[8] or "-",
+            f"R$ {p[2]:.2f}",
+            str(p[3]),
+            str(p[9]) if p[9] is not None else "-",
+            p[4] if p[4] else "-",
+            p[5] if p[5] else "-",
+            p[10] or "-",
+        )
+
+    def _criar_linha(self, indice):
+        """Cria uma DataRow com 11 células vazias; a linha é reaproveitada em todas as páginas."""
+        def texto(**kwargs):
+            return ft.Text("", color=style.TEXT_MUTED, **kwargs)
+
+        celulas = [
+            texto(),
+            ft.Text("", color=style.TEXT_DARK, overflow=ft.TextOverflow.ELLIPSIS, max_lines=1),
+            texto(overflow=ft.TextOverflow.ELLIPSIS),
+            texto(),
+            texto(overflow=ft.TextOverflow.ELLIPSIS),
+            texto(),
+            texto(),
+            texto(),
+            texto(),
+            texto(),
+            texto(overflow=ft.TextOverflow.ELLIPSIS),
+        ]
+        return ft.DataRow(
+            cells=[ft.DataCell(c) for c in celulas],
+            on_select_changed=lambda e, i=indice: self._selecionar_linha(i),
+        )
+
+    def _render_pagina(self):
+        """
+        Renderiza só a janela visível (TAMANHO_PAGINA linhas). As DataRows são
+        reaproveitadas e apenas as células cujo texto mudou são enviadas.
+        Chamar com _lock_tabela.
+        """
+        total = len(self.produtos_filtrados)
+        paginas = max(1, -(-total // self.TAMANHO_PAGINA))
+        self.pagina = min(max(self.pagina, 0), paginas - 1)
+        inicio = self.pagina * self.TAMANHO_PAGINA
+        janela = self.produtos_filtrados[inicio:inicio + self.TAMANHO_PAGINA]
+
+        while len(self._linhas) < len(janela):
+            self._linhas.append(self._criar_linha(len(self._linhas)))
+            self._exibidos.append(None)
+
+        alterados = []
+        for i, produto in enumerate(janela):
+            valores = self._valores_linha(produto)
+            anteriores = self._exibidos[i]
+            if valores == anteriores:
+                continue
+            for j, valor in enumerate(valores):
+                if anteriores is None or anteriores[j] != valor:
+                    texto = self._linhas[i].cells[j].content
+                    texto.value = valor
+                    alterados.append(texto)
+            self._exibidos[i] = valores
+
+        linhas_visiveis = self._linhas[:len(janela)]
+        if len(self.tabela.rows) != len(linhas_visiveis):
+            self.tabela.rows = linhas_visiveis
+            alterados = [self.tabela]
+
+        self.pagina_text.value = f"Página {self.pagina + 1} de {paginas} • {total} produto(s)"
+        self.btn_pagina_anterior.disabled = self.pagina == 0
+        self.btn_pagina_proxima.disabled = self.pagina >= paginas - 1
+        self.ui.atualizar(*alterados, self.pagina_text, self.btn_pagina_anterior, self.btn_pagina_proxima)
+
+    @em_acao()
+    def _mudar_pagina(self, delta):
+        with self._lock_tabela:
+            self.pagina += delta
+            self._render_pagina()
+
+    def _selecionar_linha(self, indice):
+        with self._lock_tabela:
+            posicao = self.pagina * self.TAMANHO_PAGINA + indice
+            produto = self.produtos_filtrados[posicao] if posicao < len(self.produtos_filtrados) else None
+        if produto is not None:
+            self._preencher_formulario(tuple(produto))
+
+    def _filtrar(self, termo):
+        """
+        Produtos que atendem à consulta, em ordem de nome. Palavras soltas
+        procuram em nome, código, fornecedor, categoria e localização; com
+        qualificador ficam restritas ao campo: "forn:nestle cat:bebidas".
+        """
+        return self.indice_busca.buscar(termo)
 
     def filtrar_produtos(self, e):
-        """Filtra produtos em tempo real conforme o texto digitado."""
-        termo = self.busca_field.value.strip().lower()
-        if not termo:
-            self._render_tabela(self.produtos_cache)
-            return
+        """Filtra produtos conforme o texto digitado (com debounce, fora da thread da interface)."""
+        self.filtro_pipeline.solicitar(self.busca_field.value or "")
 
-        filtrados = [p for p in self.produtos_cache if termo in p[1].lower()]
-        self._render_tabela(filtrados)
+    @em_acao()
+    def _aplicar_filtro(self, termo, produtos):
+        """Roda na thread do pipeline: _filtrar já calculou a lista; aqui só troca a tabela (com o lock)."""
+        if normalizar_busca(termo) != normalizar_busca(self.busca_field.value or ""):
+            return
+        self._render_tabela(produtos)
 
+    @em_acao()
     def _preencher_formulario(self, produto):
         """Preenche os campos ao clicar em um item da tabela."""
         try:
@@ -316,10 +455,11 @@ class ProdutosUI:
             self.codigo_barras_field.value = produto[8] or ""
             self.estoque_minimo_field.value = "" if produto[9] is None else str(produto[9])
             self.localizacao_field.value = produto[10] or ""
-            self.page.update()
+            self.ui.atualizar(*self.campos_formulario)
         except Exception as err:
             logger.error(f"Erro ao preencher formulário: {err}")
 
+    @em_acao()
     def adicionar_produto(self, e):
         """Adiciona um novo produto ao banco."""
         nome = self.nome_field.value.strip()
@@ -333,17 +473,17 @@ class ProdutosUI:
 
         if not nome or not preco_raw or not estoque_raw:
             self.message.value = "Informe nome, preço e estoque!"
-            self.page.update()
+            self.ui.atualizar(self.message)
             return
 
         try:
             preco = float(preco_raw)
-            estoque = int(estoque_raw)
+            estoque = converter_quantidade(estoque_raw)
             estoque_minimo = int(estoque_minimo_raw) if estoque_minimo_raw else 0
         except ValueError:
             self.message.value = "Valores numéricos inválidos."
             self.message.color = style.ERROR
-            self.page.update()
+            self.ui.atualizar(self.message)
             return
 
         try:
@@ -368,14 +508,15 @@ class ProdutosUI:
             self.message.value = f"Erro: {err}"
             self.message.color = style.ERROR
             logger.error(f"Erro ao adicionar produto: {err}")
-        self.page.update()
+        self.ui.atualizar(self.message)
 
+    @em_acao()
     def atualizar_produto(self, e):
         """Atualiza um produto existente."""
         nome = self.nome_field.value.strip()
         if not nome:
             self.message.value = "Digite o nome do produto a atualizar!"
-            self.page.update()
+            self.ui.atualizar(self.message)
             return
 
         preco_raw = self.preco_field.value.strip()
@@ -400,11 +541,11 @@ class ProdutosUI:
             if preco_raw:
                 payload["preco"] = float(preco_raw)
             if estoque_raw:
-                payload["estoque"] = int(estoque_raw)
+                payload["estoque"] = converter_quantidade(estoque_raw)
         except ValueError:
             self.message.value = "Valores numéricos inválidos."
             self.message.color = style.ERROR
-            self.page.update()
+            self.ui.atualizar(self.message)
             return
 
         try:
@@ -418,15 +559,16 @@ class ProdutosUI:
             self.message.value = f"Erro: {err}"
             self.message.color = style.ERROR
             logger.error(f"Erro ao atualizar produto: {err}")
-        self.page.update()
+        self.ui.atualizar(self.message)
 
+    @em_acao()
     def excluir_produto(self, e):
         """Exclui um produto pelo nome."""
         nome = self.nome_field.value.strip()
 
         if not nome:
             self.message.value = "Digite o nome do produto a excluir!"
-            self.page.update()
+            self.ui.atualizar(self.message)
             return
 
         try:
@@ -440,7 +582,7 @@ class ProdutosUI:
             self.message.value = f"Erro: {err}"
             self.message.color = style.ERROR
             logger.error(f"Erro ao excluir produto: {err}")
-        self.page.update()
+        self.ui.atualizar(self.message)
 
     def _limpar_campos(self):
         """Limpa os campos do formulário."""
@@ -454,7 +596,7 @@ class ProdutosUI:
         self.codigo_barras_field.value = ""
         self.estoque_minimo_field.value = ""
         self.localizacao_field.value = ""
-        self.page.update()
+        self.ui.atualizar(*self.campos_formulario)
 
     # ======================================================
     # === AUXILIARES ======================================
@@ -479,7 +621,7 @@ class ProdutosUI:
             self.categoria_dropdown.value = str(select_id)
         elif self.categoria_dropdown.value is None:
             self.categoria_dropdown.value = ""
-        self.page.update()
+        self.ui.atualizar(self.categoria_dropdown)
 
     def _atualizar_dropdown_unidades(self, select_id=None):
         try:
@@ -498,7 +640,7 @@ class ProdutosUI:
             self.unidade_dropdown.value = str(select_id)
         elif self.unidade_dropdown.value is None:
             self.unidade_dropdown.value = ""
-        self.page.update()
+        self.ui.atualizar(self.unidade_dropdown)
 
     def _abrir_dialogo_categoria(self, e):
         nome_field = style.apply_textfield_style(ft.TextField(label="Nome da categoria", width=300))
@@ -531,7 +673,7 @@ class ProdutosUI:
         )
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        self.ui.atualizar(imediato=True)
 
     def _abrir_dialogo_unidade(self, e):
         sigla_field = style.apply_textfield_style(
@@ -566,12 +708,12 @@ class ProdutosUI:
         )
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        self.ui.atualizar(imediato=True)
 
     def _fechar_dialogo(self, e=None):
         if self.page.dialog:
             self.page.dialog.open = False
-            self.page.update()
+            self.ui.atualizar(imediato=True)
 
     def _mostrar_snackbar(self, texto, erro=False):
         self.page.snack_bar = ft.SnackBar(
@@ -579,4 +721,69 @@ class ProdutosUI:
             bgcolor=style.ERROR if erro else style.SURFACE_ALT,
         )
         self.page.snack_bar.open = True
-        self.page.update()
+        self.ui.atualizar()
+
+    # ======================================================
+    # === IMPORTAÇÃO CSV ==================================
+    # ======================================================
+    def _escolher_csv(self, e):
+        self.file_picker.pick_files(
+            dialog_title="Importar produtos (CSV)",
+            allowed_extensions=["csv", "txt"],
+            allow_multiple=False,
+        )
+
+    def _importar_csv(self, e: ft.FilePickerResultEvent):
+        if not e.files:
+            return
+        caminho = e.files[0].path
+        self.message.value = "⏳ Importando produtos..."
+        self.message.color = style.TEXT_MUTED
+        self.ui.atualizar(self.message)
+        # Fora da thread de eventos: a tela continua respondendo durante a carga
+        threading.Thread(target=self._executar_importacao, args=(caminho,), daemon=True).start()
+
+    def _executar_importacao(self, caminho):
+        def progresso(lidas):
+            self.message.value = f"⏳ Importando produtos... {lidas} linha(s) lidas"
+            self.ui.atualizar(self.message)
+
+        try:
+            resultado = ImportadorProdutos().importar_arquivo(caminho, progresso=progresso)
+        except Exception as err:
+            logger.error(f"Erro ao importar CSV {caminho}: {err}")
+            self.message.value = f"Erro ao importar: {err}"
+            self.message.color = style.ERROR
+            self.ui.atualizar(self.message)
+            return
+        with self.ui.acao("importar_csv"):
+            # Importação interrompida: os lotes já gravados ficam, o resumo diz de onde retomar
+            problema = resultado.erros or resultado.falha
+            self.message.value = f"{'⚠️' if problema else '✅'} {resultado.resumo()}"
+            self.message.color = style.ERROR if problema else style.SUCCESS
+            self._atualizar_dropdown_categorias()
+            self.atualizar_tabela()
+            if resultado.erros:
+                self._mostrar_erros_importacao(resultado)
+
+    def _mostrar_erros_importacao(self, resultado, limite=100):
+        linhas = [ft.Text(f"Linha {linha}: {mensagem}", size=13) for linha, mensagem in resultado.erros[:limite]]
+        if len(resultado.erros) > limite:
+            linhas.append(ft.Text(f"... e mais {len(resultado.erros) - limite} erro(s).", italic=True))
+        dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text(f"{len(resultado.erros)} linha(s) não importada(s)"),
+            content=ft.Column(linhas, tight=True, spacing=4, scroll=ft.ScrollMode.AUTO, height=360, width=520),
+            actions=[ft.TextButton("Fechar", on_click=self._fechar_dialogo)],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+        self.page.dialog = dialog
+        dialog.open = True
+        self.ui.atualizar()
+
+    def _voltar(self, e=None):
+        self.filtro_pipeline.encerrar()
+        if self.file_picker in self.page.overlay:
+            self.page.overlay.remove(self.file_picker)
+        if callable(self.voltar_callback):
+            self.voltar_callback()
@@ -0,0 +1,115 @@
+# APP/ui/relatorio_pdf.py
+"""
+Exportação do relatório de vendas em PDF (roda fora da thread da interface).
+
+- os gráficos entram direto dos bytes PNG em memória, sem arquivos
+  temporários no diretório de trabalho;
+- os pedidos são lidos em lotes pelo cursor de Venda.listar_periodo_pagina e
+  escritos conforme chegam, então a lista completa do período nunca fica em
+  memória;
+- o PDF é gravado como arquivo temporário na pasta de relatórios
+  (config "relatorios_dir") e só então renomeado com os.replace: nunca existe
+  um relatório pela metade com o nome final.
+"""
+
+import io
+import os
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, Sequence
+from fpdf import FPDF
+from APP.core.config import config
+from APP.core.logger import logger
+from APP.models.vendas_models import Venda
+
+PEDIDOS_POR_LOTE = 200
+
+
+def pasta_relatorios() -> str:
+    """Pasta onde os relatórios são gravados (criada se não existir)."""
+    pasta = config.relatorios_dir
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def _formatar_data(data_raw) -> str:
+    if isinstance(data_raw, str) and data_raw.strip():
+        try:
+            return datetime.strptime(data_raw, "%Y-%m-%d %H:%M:%S").strftime("%d/%m/%Y %H:%M")
+        except ValueError:
+            return data_raw
+    return "-"
+
+
+def _escrever_pedido(pdf: FPDF, pedido: Dict):
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, f"Pedido #{pedido['pedido_id']} - {_formatar_data(pedido['data_hora'])}", ln=True)
+    pdf.set_font("Arial", "", 11)
+    pdf.cell(
+        0,
+        7,
+        f"Cliente: {pedido['cliente']} | Pagamento: {pedido['forma_pagamento']} | Vendedor: {pedido['vendedor']}",
+        ln=True,
+    )
+    pdf.cell(0, 7, f"Total: R$ {pedido['total']:.2f}", ln=True)
+    for item in pedido["itens"]:
+        pdf.cell(0, 6, f"- {item['produto']} x{item['quantidade']} = R$ {item['total']:.2f}", ln=True)
+    pdf.ln(4)
+
+
+def exportar_relatorio_pdf(
+    periodo: Sequence,
+    rotulo_periodo: str,
+    resumo: Dict,
+    graficos: Sequence[bytes] = (),
+    progresso: Callable[[int, int], None] = None,
+    pasta: str = None,
+) -> str:
+    """
+    Gera o PDF do período (data_inicio, data_fim, hora_inicio, hora_fim) e
+    retorna o caminho do arquivo. progresso(escritos, total) é chamado a cada
+    lote de pedidos.
+    """
+    pasta = pasta or pasta_relatorios()
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "Relatório de Vendas", ln=True, align="C")
+
+    pdf.set_font("Arial", "", 12)
+    pdf.cell(0, 10, f"Período: {rotulo_periodo}", ln=True)
+    pdf.ln(5)
+    pdf.cell(0, 10, f"Total de pedidos: {resumo['pedidos']}", ln=True)
+    pdf.cell(0, 10, f"Valor total: R$ {resumo['total']:.2f}", ln=True)
+    pdf.ln(10)
+
+    for png in graficos:
+        pdf.image(io.BytesIO(png), x=20, w=170)
+        pdf.ln(10)
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 10, "Resumo de Vendas:", ln=True)
+    escritos, cursor = 0, None
+    while True:
+        pedidos, cursor = Venda.listar_periodo_pagina(*periodo, apos=cursor, limite=PEDIDOS_POR_LOTE)
+        for pedido in pedidos:
+            _escrever_pedido(pdf, pedido)
+        escritos += len(pedidos)
+        if progresso:
+            progresso(escritos, resumo["pedidos"])
+        if cursor is None:
+            break
+
+    destino = os.path.join(pasta, f"relatorio_vendas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+    descritor, temporario = tempfile.mkstemp(prefix=".relatorio_", suffix=".pdf.tmp", dir=pasta)
+    os.close(descritor)
+    try:
+        pdf.output(temporario)
+        os.replace(temporario, destino)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    logger.info("PDF gerado: %s (%d pedidos).", destino, escritos)
+    return destino
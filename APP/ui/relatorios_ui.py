@@ -1,29 +1,50 @@
 import flet as ft
-import io
 import os
 import base64
+import threading
 import platform
 import subprocess
-from pathlib import Path
-import matplotlib
-matplotlib.use("Agg")  # ✅ Evita aviso de GUI fora da main thread
-import matplotlib.pyplot as plt
-plt.style.use("dark_background")
 from datetime import datetime
-from fpdf import FPDF
+from APP.core.graficos import TIPOS_GRAFICO, renderizador_graficos
+from APP.models.relatorios_models import Relatorio
 from APP.models.vendas_models import Venda
 from APP.core.logger import logger
 from APP.ui import style
+from APP.ui.atualizacoes import UpdateBatcher, em_acao
+from APP.ui.relatorio_pdf import exportar_relatorio_pdf
+
+
+# Cores dos gráficos (os processos de renderização não importam o flet)
+TEMA_GRAFICOS = {
+    "fundo": style.SURFACE,
+    "fundo_alt": style.SURFACE_ALT,
+    "destaque": style.ACCENT,
+    "texto": style.TEXT_PRIMARY,
+    "texto_secundario": style.TEXT_SECONDARY,
+    "cores": [style.ACCENT, "#6B9BFF", "#54C0EB", "#4ADE80", "#FBCB4A"],
+}
 
 
 class RelatoriosUI:
     """Tela de relatórios e estatísticas de vendas com exportação em PDF."""
 
+    # Detalhamento: pedidos por página e páginas mantidas na lista ao mesmo tempo
+    TAMANHO_PAGINA_PEDIDOS = 30
+    MAX_PAGINAS_PEDIDOS = 4
+
     def __init__(self, page: ft.Page, voltar_callback=None):
         self.page = page
+        self.ui = UpdateBatcher(page, "relatorios")
         self.voltar_callback = voltar_callback
-        self.vendas_atual = []
+        self.periodo_atual = None
+        self.rotulo_periodo = ""
+        self._exportando = False
+        self.resumo_atual = None
+        self._paginas_pedidos = []  # [(cursor_inicio, cursor_fim, cards)] exibidas, em ordem
+        self._cursores_anteriores = []  # cursor_inicio das páginas descartadas do topo
+        self._lock_paginas = threading.Lock()
         self.graficos_binarios = []
+        self._geracao_graficos = 0  # descarta gráficos de um relatório já substituído
         self.ultimo_pdf = None  # Guarda o caminho do último PDF gerado
         self.vendas_list = None
         self.build_ui()
@@ -53,8 +74,26 @@ class RelatoriosUI:
             )
         )
 
+        # Horas opcionais (0-23) para recortar o período, ex.: só o turno da manhã
+        self.hora_inicio = style.apply_textfield_style(
+            ft.TextField(
+                label="Hora início",
+                hint_text="0-23",
+                width=110,
+                keyboard_type=ft.KeyboardType.NUMBER,
+            )
+        )
+        self.hora_fim = style.apply_textfield_style(
+            ft.TextField(
+                label="Hora fim",
+                hint_text="0-23",
+                width=110,
+                keyboard_type=ft.KeyboardType.NUMBER,
+            )
+        )
+
         gerar_btn = style.primary_button("Gerar Relatório", icon=ft.Icons.SEARCH_ROUNDED, on_click=self.gerar_relatorio)
-        exportar_btn = style.primary_button("Exportar PDF", icon=ft.Icons.PICTURE_AS_PDF_OUTLINED, on_click=self.exportar_pdf)
+        self.exportar_btn = style.primary_button("Exportar PDF", icon=ft.Icons.PICTURE_AS_PDF_OUTLINED, on_click=self.exportar_pdf)
         abrir_pasta_btn = style.ghost_button("Abrir Pasta", icon=ft.Icons.FOLDER_OPEN, on_click=self.abrir_pasta)
         voltar_btn = style.ghost_button(
             "Voltar",
@@ -69,8 +108,18 @@ class RelatoriosUI:
             color=style.TEXT_DARK,
         )
 
+        self.progresso_pdf = ft.ProgressBar(width=420, value=0, visible=False, color=style.ACCENT)
+        self.progresso_pdf_text = ft.Text("", color=style.TEXT_MUTED, size=12, visible=False)
+
         self.graficos = ft.Row(spacing=20, wrap=True, alignment=ft.MainAxisAlignment.CENTER)
-        self.vendas_list = ft.ListView(spacing=10, padding=0, expand=True, auto_scroll=False)
+        self.vendas_list = ft.ListView(
+            spacing=10,
+            padding=0,
+            expand=True,
+            auto_scroll=False,
+            on_scroll=self._ao_rolar_vendas,
+            on_scroll_interval=100,
+        )
         self.vendas_list_container = ft.Container(
             content=self.vendas_list,
             height=320,
@@ -90,11 +139,22 @@ class RelatoriosUI:
             [
                 header,
                 ft.Row(
-                    [self.data_inicio, self.data_fim, gerar_btn, exportar_btn, abrir_pasta_btn, voltar_btn],
+                    [
+                        self.data_inicio,
+                        self.data_fim,
+                        self.hora_inicio,
+                        self.hora_fim,
+                        gerar_btn,
+                        self.exportar_btn,
+                        abrir_pasta_btn,
+                        voltar_btn,
+                    ],
                     alignment=ft.MainAxisAlignment.CENTER,
                     spacing=14,
                     wrap=True,
                 ),
+                self.progresso_pdf,
+                self.progresso_pdf_text,
                 ft.Divider(color=style.DIVIDER),
                 self.resumo_text,
                 ft.Divider(color=style.DIVIDER),
@@ -124,12 +184,13 @@ class RelatoriosUI:
         )
 
         logger.info("Tela de relatórios com PDF e botão de pasta carregada.")
-        self.page.update()
+        self.ui.atualizar()
         self._atualizar_detalhamento_vendas()
 
     # ======================================================
     # GERAÇÃO DE RELATÓRIOS
     # ======================================================
+    @em_acao()
     def gerar_relatorio(self, e):
         try:
             data_inicio = datetime.strptime(self.data_inicio.value, "%d/%m/%Y").strftime("%Y-%m-%d")
@@ -137,253 +198,304 @@ class RelatoriosUI:
         except ValueError:
             self.page.snack_bar = ft.SnackBar(ft.Text("⚠️ Datas inválidas. Use o formato DD/MM/YYYY."))
             self.page.snack_bar.open = True
-            self.page.update()
+            self.ui.atualizar()
+            return
+
+        try:
+            hora_inicio = self._ler_hora(self.hora_inicio)
+            hora_fim = self._ler_hora(self.hora_fim)
+        except ValueError:
+            self.page.snack_bar = ft.SnackBar(ft.Text("⚠️ Horas inválidas. Use valores de 0 a 23."))
+            self.page.snack_bar.open = True
+            self.ui.atualizar()
             return
 
-        vendas = Venda.listar_periodo(data_inicio, data_fim)
-        self.vendas_atual = vendas
+        periodo = (data_inicio, data_fim, hora_inicio, hora_fim)
+        resumo = Relatorio.resumo(*periodo)
+        self.resumo_atual = resumo
+        self.periodo_atual = periodo
+        self.rotulo_periodo = (
+            f"{self.data_inicio.value}{f' {hora_inicio:02d}h' if hora_inicio is not None else ''}"
+            f" a {self.data_fim.value}{f' {hora_fim:02d}h' if hora_fim is not None else ''}"
+        )
+        self._geracao_graficos += 1
         self.graficos.controls.clear()
         self.graficos_binarios.clear()
         self._atualizar_detalhamento_vendas()
 
-        if not vendas:
-            self.resumo_text.value = f"?? Nenhuma venda encontrada entre {self.data_inicio.value} e {self.data_fim.value}."
+        if not resumo["pedidos"]:
+            self.resumo_text.value = f"🔎 Nenhuma venda encontrada entre {self.data_inicio.value} e {self.data_fim.value}."
             self.resumo_text.color = style.TEXT_MUTED
-            self.page.update()
+            self.ui.atualizar(self.resumo_text, self.graficos)
             return
 
-        total_vendas = len(vendas)
-        total_valor = sum(pedido['total'] for pedido in vendas)
-        self.resumo_text.value = f"?? Total de pedidos: {total_vendas} | ?? Valor total: R$ {total_valor:.2f}"
-        self.resumo_text.color = style.TEXT_DARK
-
-        produtos = {}
-        for pedido in vendas:
-            for item in pedido['itens']:
-                produtos[item['produto']] = produtos.get(item['produto'], 0) + item['quantidade']
-
-        # === Gráfico de Barras ===
-        fig1, ax1 = plt.subplots(figsize=(5, 3))
-        fig1.patch.set_facecolor(style.SURFACE)
-        ax1.set_facecolor(style.SURFACE_ALT)
-        ax1.bar(produtos.keys(), produtos.values(), color=style.ACCENT)
-        ax1.set_title("Vendas por Produto", fontsize=12, weight="bold", color=style.TEXT_PRIMARY)
-        ax1.set_xlabel("Produto", color=style.TEXT_SECONDARY)
-        ax1.set_ylabel("Quantidade", color=style.TEXT_SECONDARY)
-        ax1.tick_params(colors=style.TEXT_SECONDARY, rotation=25)
-        for tick in ax1.get_xticklabels():
-            tick.set_rotation(25)
-            tick.set_ha("right")
-        ax1.grid(axis="y", linestyle="--", alpha=0.3, color=style.TEXT_SECONDARY)
-        plt.tight_layout()
-        plt.subplots_adjust(bottom=0.25)
-
-        buf1 = io.BytesIO()
-        fig1.savefig(buf1, format="png")
-        plt.close(fig1)
-        buf1.seek(0)
-        img1_bytes = buf1.getvalue()
-        self.graficos_binarios.append(img1_bytes)
-
-        # === Gráfico de Pizza ===
-        fig2, ax2 = plt.subplots(figsize=(4, 4))
-        fig2.patch.set_facecolor(style.SURFACE)
-        colors = [style.ACCENT, "#6B9BFF", "#54C0EB", "#4ADE80", "#FBCB4A"]
-        ax2.pie(
-            produtos.values(),
-            labels=produtos.keys(),
-            autopct="%1.1f%%",
-            colors=colors,
-            textprops={"color": style.TEXT_PRIMARY},
+        pagamentos = " • ".join(f"{forma}: R$ {total:.2f}" for forma, _, total in Relatorio.por_forma_pagamento(*periodo))
+        vendedores = " • ".join(f"{vendedor}: R$ {total:.2f}" for vendedor, _, total in Relatorio.por_vendedor(*periodo))
+        self.resumo_text.value = (
+            f"🧾 Total de pedidos: {resumo['pedidos']} | 💰 Valor total: R$ {resumo['total']:.2f}"
+            f" | Ticket médio: R$ {resumo['ticket_medio']:.2f}\n"
+            f"Pagamentos: {pagamentos}\nVendedores: {vendedores}"
         )
-        ax2.set_title("Participação nas Vendas", fontsize=12, weight="bold", color=style.TEXT_PRIMARY)
-        plt.tight_layout()
-
-        buf2 = io.BytesIO()
-        fig2.savefig(buf2, format="png")
-        plt.close(fig2)
-        buf2.seek(0)
-        img2_bytes = buf2.getvalue()
-        self.graficos_binarios.append(img2_bytes)
+        self.resumo_text.color = style.TEXT_DARK
 
-        # === Exibe na tela ===
-        img1 = ft.Image(src_base64=base64.b64encode(img1_bytes).decode(), width=380, height=280, border_radius=12)
-        img2 = ft.Image(src_base64=base64.b64encode(img2_bytes).decode(), width=380, height=280, border_radius=12)
-        self.graficos.controls.extend([img1, img2])
+        produtos = dict(Relatorio.top_produtos(*periodo))
 
+        self._renderizar_graficos(periodo, resumo["versao"], produtos)
         logger.info(f"Relatório gerado de {data_inicio} a {data_fim}.")
-        self.page.update()
+        self.ui.atualizar(self.resumo_text, self.graficos)
+
+    def _renderizar_graficos(self, periodo, versao, produtos):
+        """Pede os gráficos ao renderizador (processo separado) e mostra o progresso."""
+        self._geracao_graficos += 1
+        geracao = self._geracao_graficos
+        self.graficos_binarios = [None] * len(TIPOS_GRAFICO)
+        self.graficos.controls = [
+            ft.Row(
+                [
+                    ft.ProgressRing(width=22, height=22, stroke_width=3, color=style.ACCENT),
+                    ft.Text("Gerando gráficos...", color=style.TEXT_MUTED),
+                ],
+                spacing=10,
+            )
+        ]
+        rotulos, valores = list(produtos.keys()), list(produtos.values())
+        for indice, tipo in enumerate(TIPOS_GRAFICO):
+            renderizador_graficos.renderizar(
+                (periodo, tipo, versao),
+                tipo,
+                rotulos,
+                valores,
+                TEMA_GRAFICOS,
+                lambda png, erro, indice=indice: self._grafico_pronto(geracao, indice, png, erro),
+            )
+
+    def _grafico_pronto(self, geracao, indice, png, erro):
+        if geracao != self._geracao_graficos:
+            return
+        if erro is not None:
+            self.graficos.controls = [ft.Text(f"❌ Erro ao gerar gráficos: {erro}", color=style.ERROR)]
+            self._geracao_graficos += 1  # ignora o outro gráfico do mesmo relatório
+            self.ui.atualizar(self.graficos)
+            return
+        self.graficos_binarios[indice] = png
+        if any(b is None for b in self.graficos_binarios):
+            return
+        self.graficos.controls = [
+            ft.Image(src_base64=base64.b64encode(b).decode(), width=380, height=280, border_radius=12)
+            for b in self.graficos_binarios
+        ]
+        self.ui.atualizar(self.graficos)
+
+    def _ler_hora(self, campo):
+        """Lê um campo de hora opcional (0-23). Retorna None quando vazio."""
+        valor = (campo.value or "").strip()
+        if not valor:
+            return None
+        hora = int(valor)
+        if not 0 <= hora <= 23:
+            raise ValueError("Hora fora do intervalo 0-23.")
+        return hora
 
+    # ======================================================
+    # DETALHAMENTO (páginas sob demanda)
+    # ======================================================
     def _atualizar_detalhamento_vendas(self):
+        """Recomeça a lista de pedidos pela primeira página do período atual."""
         if not self.vendas_list:
             return
-        if not self.vendas_atual:
+        with self._lock_paginas:
+            self._paginas_pedidos = []
+            self._cursores_anteriores = []
+        if not self.resumo_atual or not self.resumo_atual["pedidos"]:
             self.vendas_list.controls = [
                 ft.Text(
                     "Nenhuma venda encontrada para o período informado.",
                     color=style.TEXT_MUTED,
                 )
             ]
-            self.page.update()
+            self.ui.atualizar(self.vendas_list)
             return
+        self._carregar_pagina_pedidos(None, no_fim=True)
+
+    def _carregar_pagina_pedidos(self, apos, no_fim):
+        """
+        Busca a página que começa após o cursor e a coloca no fim (rolagem para
+        baixo) ou no topo (rolagem para cima) da lista. Acima de
+        MAX_PAGINAS_PEDIDOS, a página da ponta oposta é descartada.
+        """
+        pedidos, cursor_fim = Venda.listar_periodo_pagina(*self.periodo_atual, apos=apos, limite=self.TAMANHO_PAGINA_PEDIDOS)
+        pagina = (apos, cursor_fim, [self._card_pedido(pedido) for pedido in pedidos])
+        if no_fim:
+            self._paginas_pedidos.append(pagina)
+            if len(self._paginas_pedidos) > self.MAX_PAGINAS_PEDIDOS:
+                self._cursores_anteriores.append(self._paginas_pedidos.pop(0)[0])
+        else:
+            self._paginas_pedidos.insert(0, pagina)
+            if len(self._paginas_pedidos) > self.MAX_PAGINAS_PEDIDOS:
+                self._paginas_pedidos.pop()
+        self._render_detalhamento()
+
+    def _carregar_proxima_pagina(self, e=None):
+        with self._lock_paginas:
+            if not self._paginas_pedidos or self._paginas_pedidos[-1][1] is None:
+                return
+            self._carregar_pagina_pedidos(self._paginas_pedidos[-1][1], no_fim=True)
+
+    def _carregar_pagina_anterior(self, e=None):
+        with self._lock_paginas:
+            if not self._cursores_anteriores:
+                return
+            self._carregar_pagina_pedidos(self._cursores_anteriores.pop(), no_fim=False)
+
+    def _ao_rolar_vendas(self, e):
+        if e.max_scroll_extent is not None and e.pixels >= e.max_scroll_extent - 80:
+            self._carregar_proxima_pagina()
+        elif e.pixels is not None and e.pixels <= 0:
+            self._carregar_pagina_anterior()
+
+    def _render_detalhamento(self):
+        controles = []
+        if self._cursores_anteriores:
+            controles.append(
+                style.ghost_button(
+                    "Pedidos anteriores",
+                    icon=ft.Icons.EXPAND_LESS_ROUNDED,
+                    on_click=self._carregar_pagina_anterior,
+                )
+            )
+        for _, _, cards in self._paginas_pedidos:
+            controles.extend(cards)
+        if self._paginas_pedidos and self._paginas_pedidos[-1][1] is not None:
+            controles.append(
+                style.ghost_button(
+                    "Carregar mais pedidos",
+                    icon=ft.Icons.EXPAND_MORE_ROUNDED,
+                    on_click=self._carregar_proxima_pagina,
+                )
+            )
+        self.vendas_list.controls = controles
+        self.ui.atualizar(self.vendas_list)
+
+    def _card_pedido(self, pedido):
+        venda_id = pedido["pedido_id"]
+        total = pedido["total"]
+        vendedor = pedido["vendedor"]
+        data_raw = pedido["data_hora"]
+        cliente = pedido["cliente"]
+        pagamento = pedido["forma_pagamento"]
+
+        if isinstance(data_raw, str) and data_raw.strip():
+            try:
+                data_formatada = datetime.strptime(data_raw, "%Y-%m-%d %H:%M:%S").strftime("%d/%m/%Y %H:%M")
+            except ValueError:
+                data_formatada = data_raw
+        else:
+            data_formatada = "-"
+
+        itens_column = ft.Column(
+            [
+                ft.Row(
+                    [
+                        ft.Text(item["produto"], color=style.TEXT_DARK, weight=ft.FontWeight.W_500),
+                        ft.Text(
+                            f"x{item['quantidade']} • R$ {item['total']:.2f}",
+                            color=style.TEXT_SECONDARY,
+                            size=12,
+                        ),
+                    ],
+                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                )
+                for item in pedido["itens"]
+            ],
+            spacing=2,
+        )
 
-        cards = []
-        for pedido in self.vendas_atual:
-            venda_id = pedido["pedido_id"]
-            total = pedido["total"]
-            vendedor = pedido["vendedor"]
-            data_raw = pedido["data_hora"]
-            cliente = pedido["cliente"]
-            pagamento = pedido["forma_pagamento"]
-
-            if isinstance(data_raw, str) and data_raw.strip():
-                try:
-                    data_formatada = datetime.strptime(data_raw, "%Y-%m-%d %H:%M:%S").strftime("%d/%m/%Y %H:%M")
-                except ValueError:
-                    data_formatada = data_raw
-            else:
-                data_formatada = "-"
-
-            itens_column = ft.Column(
+        return ft.Container(
+            bgcolor=style.PANEL_LIGHT,
+            border_radius=12,
+            padding=ft.Padding(10, 8, 10, 8),
+            border=ft.border.all(1, style.BORDER),
+            content=ft.Row(
                 [
-                    ft.Row(
+                    ft.Icon(ft.Icons.RECEIPT_LONG, color=style.ACCENT),
+                    ft.Column(
                         [
-                            ft.Text(item["produto"], color=style.TEXT_DARK, weight=ft.FontWeight.W_500),
                             ft.Text(
-                                f"x{item['quantidade']} • R$ {item['total']:.2f}",
-                                color=style.TEXT_SECONDARY,
+                                f"Pedido #{venda_id}",
+                                weight=ft.FontWeight.BOLD,
+                                color=style.TEXT_DARK,
+                            ),
+                            ft.Text(
+                                f"Horário: {data_formatada}",
+                                color=style.TEXT_MUTED,
                                 size=12,
                             ),
+                            itens_column,
+                            ft.Text(f"Cliente: {cliente}", color=style.TEXT_SECONDARY, size=12),
+                            ft.Text(f"Pagamento: {pagamento}", color=style.TEXT_SECONDARY, size=12),
+                            ft.Text(f"Vendedor: {vendedor}", color=style.TEXT_SECONDARY, size=12),
                         ],
-                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                    )
-                    for item in pedido["itens"]
+                        spacing=2,
+                        expand=True,
+                    ),
+                    ft.Text(
+                        f"R$ {total:.2f}",
+                        weight=ft.FontWeight.BOLD,
+                        color=style.ACCENT,
+                    ),
                 ],
-                spacing=2,
-            )
-
-            card = ft.Container(
-                bgcolor=style.PANEL_LIGHT,
-                border_radius=12,
-                padding=ft.Padding(10, 8, 10, 8),
-                border=ft.border.all(1, style.BORDER),
-                content=ft.Row(
-                    [
-                        ft.Icon(ft.Icons.RECEIPT_LONG, color=style.ACCENT),
-                        ft.Column(
-                            [
-                                ft.Text(
-                                    f"Pedido #{venda_id}",
-                                    weight=ft.FontWeight.BOLD,
-                                    color=style.TEXT_DARK,
-                                ),
-                                ft.Text(
-                                    f"Horário: {data_formatada}",
-                                    color=style.TEXT_MUTED,
-                                    size=12,
-                                ),
-                                itens_column,
-                                ft.Text(f"Cliente: {cliente}", color=style.TEXT_SECONDARY, size=12),
-                                ft.Text(f"Pagamento: {pagamento}", color=style.TEXT_SECONDARY, size=12),
-                                ft.Text(f"Vendedor: {vendedor}", color=style.TEXT_SECONDARY, size=12),
-                            ],
-                            spacing=2,
-                            expand=True,
-                        ),
-                        ft.Text(
-                            f"R$ {total:.2f}",
-                            weight=ft.FontWeight.BOLD,
-                            color=style.ACCENT,
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                    vertical_alignment=ft.CrossAxisAlignment.START,
-                ),
-            )
-            cards.append(card)
-
-        self.vendas_list.controls = cards
-        self.page.update()
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                vertical_alignment=ft.CrossAxisAlignment.START,
+            ),
+        )
 
     # ======================================================
     # EXPORTAÇÃO EM PDF
     # ======================================================
     def exportar_pdf(self, e):
-        if not self.vendas_atual:
+        if not self.resumo_atual or not self.resumo_atual["pedidos"]:
             self.page.snack_bar = ft.SnackBar(ft.Text("⚠️ Gere o relatório antes de exportar!"))
             self.page.snack_bar.open = True
-            self.page.update()
+            self.ui.atualizar()
+            return
+        if self._exportando:
             return
 
-        try:
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_font("Arial", "B", 16)
-            pdf.cell(0, 10, "Relatório de Vendas", ln=True, align="C")
-
-            pdf.set_font("Arial", "", 12)
-            pdf.cell(0, 10, f"Período: {self.data_inicio.value} a {self.data_fim.value}", ln=True)
-            pdf.ln(5)
-
-            total_valor = sum(pedido["total"] for pedido in self.vendas_atual)
-            total_vendas = len(self.vendas_atual)
-            pdf.cell(0, 10, f"Total de pedidos: {total_vendas}", ln=True)
-            pdf.cell(0, 10, f"Valor total: R$ {total_valor:.2f}", ln=True)
-            pdf.ln(10)
-
-            # Adiciona gráficos
-            for i, grafico_bytes in enumerate(self.graficos_binarios):
-                img_path = f"temp_grafico_{i}.png"
-                with open(img_path, "wb") as f:
-                    f.write(grafico_bytes)
-                pdf.image(img_path, x=20, w=170)
-                pdf.ln(10)
-
-            # Adiciona tabela resumida
-            pdf.set_font("Arial", "B", 12)
-            pdf.cell(0, 10, "Resumo de Vendas:", ln=True)
-            pdf.set_font("Arial", "", 11)
-            for pedido in self.vendas_atual:
-                data_raw = pedido["data_hora"]
-                if isinstance(data_raw, str) and data_raw.strip():
-                    try:
-                        data_formatada = datetime.strptime(data_raw, "%Y-%m-%d %H:%M:%S").strftime("%d/%m/%Y %H:%M")
-                    except ValueError:
-                        data_formatada = data_raw
-                else:
-                    data_formatada = "-"
-
-                pdf.set_font("Arial", "B", 12)
-                pdf.cell(0, 8, f"Pedido #{pedido['pedido_id']} - {data_formatada}", ln=True)
-                pdf.set_font("Arial", "", 11)
-                pdf.cell(
-                    0,
-                    7,
-                    f"Cliente: {pedido['cliente']} | Pagamento: {pedido['forma_pagamento']} | Vendedor: {pedido['vendedor']}",
-                    ln=True,
-                )
-                pdf.cell(0, 7, f"Total: R$ {pedido['total']:.2f}", ln=True)
-                for item in pedido["itens"]:
-                    pdf.cell(0, 6, f"- {item['produto']} x{item['quantidade']} = R$ {item['total']:.2f}", ln=True)
-                pdf.ln(4)
-            # Salva arquivo
-            downloads_dir = Path.home() / "Downloads" / "Relatorios_Sistema"
-            downloads_dir.mkdir(parents=True, exist_ok=True)
-            filename = f"relatorio_vendas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            filepath = downloads_dir / filename
-            pdf.output(str(filepath))
-            self.ultimo_pdf = str(filepath)
-            logger.info(f"PDF gerado: {self.ultimo_pdf}")
-
-            self.page.snack_bar = ft.SnackBar(ft.Text(f"✅ Relatório exportado em {filepath}"))
-            self.page.snack_bar.open = True
-            self.page.update()
+        self._exportando = True
+        self.exportar_btn.disabled = True
+        self.progresso_pdf.value = 0
+        self.progresso_pdf.visible = True
+        self.progresso_pdf_text.value = "Gerando PDF..."
+        self.progresso_pdf_text.visible = True
+        self.ui.atualizar(self.exportar_btn, self.progresso_pdf, self.progresso_pdf_text)
+        argumentos = (
+            self.periodo_atual,
+            self.rotulo_periodo,
+            dict(self.resumo_atual),
+            [b for b in self.graficos_binarios if b],
+        )
+        threading.Thread(target=self._executar_exportacao, args=argumentos, daemon=True).start()
+
+    def _executar_exportacao(self, periodo, rotulo, resumo, graficos):
+        def progresso(escritos, total):
+            self.progresso_pdf.value = escritos / total if total else None
+            self.progresso_pdf_text.value = f"Gerando PDF... {escritos} de {total} pedidos"
+            self.ui.atualizar(self.progresso_pdf, self.progresso_pdf_text)
 
+        try:
+            caminho = exportar_relatorio_pdf(periodo, rotulo, resumo, graficos, progresso=progresso)
+            self.ultimo_pdf = caminho
+            self.page.snack_bar = ft.SnackBar(ft.Text(f"✅ Relatório exportado em {caminho}"))
         except Exception as ex:
             logger.error(f"Erro ao exportar PDF: {ex}", exc_info=True)
             self.page.snack_bar = ft.SnackBar(ft.Text(f"❌ Erro ao gerar PDF: {ex}"))
-            self.page.snack_bar.open = True
-            self.page.update()
+        finally:
+            self._exportando = False
+        self.exportar_btn.disabled = False
+        self.progresso_pdf.visible = False
+        self.progresso_pdf_text.visible = False
+        self.page.snack_bar.open = True
+        self.ui.atualizar()
 
     # ======================================================
     # ABRIR PASTA DO RELATÓRIO
@@ -392,7 +504,7 @@ class RelatoriosUI:
         if not self.ultimo_pdf:
             self.page.snack_bar = ft.SnackBar(ft.Text("📄 Gere e exporte um PDF primeiro!"))
             self.page.snack_bar.open = True
-            self.page.update()
+            self.ui.atualizar()
             return
 
         pasta = os.path.dirname(self.ultimo_pdf)
@@ -408,4 +520,4 @@ class RelatoriosUI:
             logger.error(f"Erro ao abrir pasta: {ex}")
             self.page.snack_bar = ft.SnackBar(ft.Text(f"❌ Erro ao abrir pasta: {ex}"))
             self.page.snack_bar.open = True
-            self.page.update()
+            self.ui.atualizar()
@@ -1,11 +1,19 @@
 import flet as ft
 from typing import Optional, List, Dict
 from datetime import datetime
+import time
 import uuid
+from APP.models.carrinho_models import Cart
 from APP.models.vendas_models import Venda
-from APP.models.produtos_models import Produto
+from APP.models.produtos_models import Produto, catalogo
+from APP.core.balanca import decodificar_etiqueta
+from APP.core.leitor import ScannerBurstDetector
 from APP.core.logger import logger
+from APP.core.metricas import latencia_leitura
+from APP.core.sugestoes import SuggestionPipeline
+from APP.core.utils import converter_quantidade
 from APP.ui import style
+from APP.ui.atualizacoes import UpdateBatcher, em_acao
 
 
 class VendasUI:
@@ -13,11 +21,11 @@ class VendasUI:
 
     def __init__(self, page: ft.Page, voltar_callback=None, vendedor: Optional[str] = None):
         self.page = page
+        self.ui = UpdateBatcher(page, "pdv")
         self.voltar_callback = voltar_callback
         self.vendedor = vendedor or "N/D"
 
-        self.cart: List[Dict] = []
-        self.desconto_percent = 0.0
+        self.cart = Cart()
         self.forma_pagamento: Optional[str] = None
         self.stage_order = ["nova", "pagamento", "finalizar"]
         self.stage = "nova"
@@ -34,6 +42,7 @@ class VendasUI:
         self.focusable_controls: List[Dict] = []
         self.focus_index = -1
         self.ultima_venda_resumo = None
+        self._snackbar = None
 
         self.pagamentos_def = [
             {"label": "Dinheiro", "shortcut": "F1", "color": "#22C55E", "icon": ft.Icons.ATTACH_MONEY},
@@ -48,6 +57,13 @@ class VendasUI:
         self.payment_shortcuts = {opt["shortcut"]: opt for opt in self.pagamentos_def}
 
         self._prev_keyboard_handler = None
+        self.sugestoes_pipeline = SuggestionPipeline(
+            buscar=lambda termo: Produto.buscar_sugestoes(termo, limit=6),
+            aplicar=self._aplicar_sugestoes,
+            versao=lambda: catalogo.versao,
+        )
+        self.leitor = ScannerBurstDetector()
+        self._ultima_leitura_em = 0.0
 
         self.build_ui()
         self._install_keyboard_handler()
@@ -439,13 +455,31 @@ class VendasUI:
     # ==================================================
     # LÓGICA DE CARRINHO
     # ==================================================
+    @em_acao()
     def _processar_codigo(self, _):
         if self._skip_next_codigo_submit:
             self._skip_next_codigo_submit = False
             return
+        self.sugestoes_pipeline.cancelar()
         codigo = (self.codigo_field.value or "").strip()
         quantidade = self._obter_quantidade_digitada()
 
+        if self.leitor.leitura_concluida(codigo) and self._adicionar_leitura(codigo, quantidade):
+            return
+        if not codigo and time.perf_counter() - self._ultima_leitura_em < 0.5:
+            # Enter do leitor chega pelo teclado e pelo on_submit; o segundo já encontra o campo limpo
+            return
+
+        # Código de barras cadastrado vem antes da etiqueta: um EAN "2..." pode ser de produto comum
+        etiqueta = decodificar_etiqueta(codigo) if codigo and catalogo.por_codigo(codigo) is None else None
+        if etiqueta is not None:
+            balanca = Produto.buscar_etiqueta_balanca(codigo)
+            if balanca is None:
+                self._set_alert(f"Etiqueta de balança sem produto cadastrado (PLU {etiqueta.plu}).")
+                return
+            self._adicionar_direto(*balanca)
+            return
+
         if self.sugestoes_data:
             if self.sugestao_index < 0:
                 self.sugestao_index = 0
@@ -466,6 +500,13 @@ class VendasUI:
                 self._limpar_sugestoes()
                 self._mostrar_confirmacao_produto(produto_dict, quantidade)
                 return
+            parecidos = Produto.buscar_fuzzy(codigo, limit=1)
+            if parecidos:
+                produto_dict = self._produto_row_to_dict(parecidos[0])
+                self._limpar_sugestoes()
+                self._set_alert(f"Você quis dizer '{produto_dict['nome']}'?")
+                self._mostrar_confirmacao_produto(produto_dict, quantidade)
+                return
             self._set_alert("Produto não encontrado.")
             return
 
@@ -473,13 +514,49 @@ class VendasUI:
             "id": int(produto[0]),
             "nome": produto[1],
             "preco": float(produto[2]),
-            "estoque": int(produto[3]),
+            "estoque": produto[3] or 0,
             "codigo": produto[4],
         }
         self._limpar_sugestoes()
         self._mostrar_confirmacao_produto(produto_dict, quantidade)
 
-    def _mostrar_confirmacao_produto(self, produto_info: Dict, quantidade: int):
+    def _adicionar_leitura(self, codigo: str, quantidade: float) -> bool:
+        """
+        Caminho rápido do leitor de código de barras: código exato resolvido
+        pelo catálogo em memória e adicionado sem diálogo de confirmação.
+        Retorna False se o código não for um código de barras cadastrado.
+        """
+        row = catalogo.por_codigo(codigo)
+        if row is None:
+            # Etiqueta de balança: a quantidade (peso) vem do próprio código
+            balanca = Produto.buscar_etiqueta_balanca(codigo)
+            if balanca is None:
+                self.leitor.reset()
+                return False
+            row, quantidade = balanca
+        inicio = self.leitor.inicio
+        if not self._adicionar_direto(row, quantidade):
+            self.leitor.reset()
+            return True
+        if inicio is not None:
+            # A leitura só termina quando o carrinho chega à tela: mede após o envio da ação
+            self.ui.apos_envio(lambda: latencia_leitura.registrar((time.perf_counter() - inicio) * 1000))
+        self._ultima_leitura_em = time.perf_counter()
+        self.leitor.reset()
+        return True
+
+    def _adicionar_direto(self, row, quantidade) -> bool:
+        """Adiciona ao carrinho sem diálogo de confirmação e limpa o campo de código."""
+        self._limpar_sugestoes()
+        if not self._adicionar_ao_carrinho(self._produto_row_to_dict(row), quantidade):
+            return False
+        self.codigo_field.value = ""
+        self.quantidade_field.value = "1"
+        self._set_alert("")
+        self.ui.atualizar(self.codigo_field, self.quantidade_field)
+        return True
+
+    def _mostrar_confirmacao_produto(self, produto_info: Dict, quantidade: float):
         nome = produto_info["nome"]
         preco = produto_info["preco"]
         estoque = produto_info["estoque"]
@@ -498,25 +575,27 @@ class VendasUI:
         )
 
         def confirmar(_):
-            self._fechar_dialogo()
-            self.pending_confirm = None
-            self.pending_cancel = None
-            self._adicionar_ao_carrinho(produto_info, quantidade)
-            self.codigo_field.value = ""
-            self.quantidade_field.value = "1"
-            self._set_alert("")
-            self._set_stage("nova")
-            self._focus_codigo()
-            self._limpar_sugestoes()
-            self.page.update()
+            with self.ui.acao("confirmar_produto"):
+                self._fechar_dialogo()
+                self.pending_confirm = None
+                self.pending_cancel = None
+                if self._adicionar_ao_carrinho(produto_info, quantidade):
+                    self.codigo_field.value = ""
+                    self.quantidade_field.value = "1"
+                    self._set_alert("")
+                self._set_stage("nova")
+                self._focus_codigo()
+                self._limpar_sugestoes()
+                self.ui.atualizar(self.codigo_field, self.quantidade_field)
 
         def cancelar(_):
-            self._fechar_dialogo()
-            self.pending_confirm = None
-            self.pending_cancel = None
-            self._set_alert("Produto cancelado.")
-            self._focus_codigo()
-            self._limpar_sugestoes()
+            with self.ui.acao("cancelar_produto"):
+                self._fechar_dialogo()
+                self.pending_confirm = None
+                self.pending_cancel = None
+                self._set_alert("Produto cancelado.")
+                self._focus_codigo()
+                self._limpar_sugestoes()
 
         dialog = ft.AlertDialog(
             modal=True,
@@ -536,31 +615,21 @@ class VendasUI:
         self.pending_cancel = cancelar
         self._abrir_dialogo(dialog, "confirmar_produto")
 
-    def _adicionar_ao_carrinho(self, produto_info: Dict, quantidade: int = 1):
-        produto_id = produto_info["id"]
+    def _adicionar_ao_carrinho(self, produto_info: Dict, quantidade: float = 1) -> bool:
         nome = produto_info["nome"]
-        preco = produto_info["preco"]
-        codigo = produto_info["codigo"]
         if quantidade <= 0:
             quantidade = 1
-
-        existente = next((item for item in self.cart if item["id"] == produto_id), None)
-        if existente:
-            existente["quantidade"] += quantidade
-        else:
-            self.cart.append(
-                {
-                    "id": produto_id,
-                    "nome": nome,
-                    "valor_unitario": float(preco),
-                    "quantidade": quantidade,
-                    "codigo": codigo,
-                }
-            )
+        try:
+            self.cart.adicionar(produto_info, quantidade)
+        except Exception as err:
+            self._set_alert(str(err))
+            self._mostrar_snackbar(str(err), erro=True)
+            return False
         self._atualizar_tabela()
-        logger.info("Carrinho: %s x%d adicionado (total itens=%d)", nome, quantidade, len(self.cart))
-        self._mostrar_snackbar(f"{nome} x{quantidade} adicionado ao carrinho")
+        logger.info("Carrinho: %s x%s adicionado (total itens=%d)", nome, quantidade, len(self.cart))
+        self._mostrar_snackbar(f"{nome} x{quantidade:g} adicionado ao carrinho")
         self._focus_codigo()
+        return True
 
     def _atualizar_tabela(self):
         rows: List[ft.DataRow] = []
@@ -578,7 +647,7 @@ class VendasUI:
                                         icon_color=style.ERROR,
                                         on_click=self._make_alterar_quantidade_handler(item["id"], -1),
                                     ),
-                                    ft.Text(str(item["quantidade"]), color=style.TEXT_DARK),
+                                    ft.Text(f"{item['quantidade']:g}", color=style.TEXT_DARK),
                                     ft.IconButton(
                                         icon=ft.Icons.ADD_CIRCLE_OUTLINE,
                                         icon_color=style.SUCCESS,
@@ -603,8 +672,7 @@ class VendasUI:
             )
         self.tabela.rows = rows
         self._atualizar_resumo()
-        self.tabela.update()
-        self.page.update()
+        self.ui.atualizar(self.tabela)
 
     def _make_alterar_quantidade_handler(self, produto_id: int, delta: int):
         def handler(_):
@@ -616,34 +684,39 @@ class VendasUI:
             self._remover_item(produto_id)
         return handler
 
+    @em_acao()
     def _alterar_quantidade(self, produto_id: int, delta: int):
-        for item in self.cart:
-            if item["id"] == produto_id:
-                item["quantidade"] = max(1, item["quantidade"] + delta)
-                break
+        try:
+            self.cart.alterar_quantidade(produto_id, delta)
+        except Exception as err:
+            self._mostrar_snackbar(str(err), erro=True)
+            return
         self._atualizar_tabela()
 
+    @em_acao()
     def _remover_item(self, produto_id: int):
-        self.cart = [item for item in self.cart if item["id"] != produto_id]
+        self.cart.remover(produto_id)
         self._atualizar_tabela()
 
+    @em_acao()
     def _remover_last_item(self):
         if self.cart:
-            self.cart.pop()
+            self.cart.remover_ultima()
             self._atualizar_tabela()
 
     def _atualizar_resumo(self):
-        total_itens = sum(item["quantidade"] for item in self.cart)
-        total_bruto = sum(item["quantidade"] * item["valor_unitario"] for item in self.cart)
-        desconto_valor = total_bruto * (self.desconto_percent / 100)
-        total_liquido = total_bruto - desconto_valor
-
-        self._resumo_itens_value.value = str(total_itens)
-        self._resumo_desconto_value.value = f"R$ {desconto_valor:.2f}"
-        self._resumo_total_value.value = f"R$ {total_liquido:.2f}"
+        self._resumo_itens_value.value = f"{self.cart.total_itens:g}"
+        self._resumo_desconto_value.value = f"R$ {self.cart.desconto_valor:.2f}"
+        self._resumo_total_value.value = f"R$ {self.cart.total_liquido:.2f}"
         self._resumo_cliente_value.value = self.cliente_field.value or "Consumidor Final"
         self._resumo_pagamento_value.value = self.forma_pagamento or "Selecione (F1-F7)"
-        self.page.update()
+        self.ui.atualizar(
+            self._resumo_itens_value,
+            self._resumo_desconto_value,
+            self._resumo_total_value,
+            self._resumo_cliente_value,
+            self._resumo_pagamento_value,
+        )
 
     def _validar_venda_pronta(self):
         if not self.cart:
@@ -652,11 +725,9 @@ class VendasUI:
             return False, "Selecione uma forma de pagamento (F1-F7).", None
 
         cliente = (self.cliente_field.value or "Consumidor Final").strip() or "Consumidor Final"
-        total_bruto = sum(item["quantidade"] * item["valor_unitario"] for item in self.cart)
-        desconto_valor = total_bruto * (self.desconto_percent / 100)
-        total_liquido = total_bruto - desconto_valor
-        return True, "", (total_bruto, desconto_valor, total_liquido, cliente)
+        return True, "", (self.cart.total_bruto, self.cart.desconto_valor, self.cart.total_liquido, cliente)
 
+    @em_acao()
     def _on_pagamento_select(self, shortcut: str):
         option = self.payment_shortcuts.get(shortcut)
         if not option:
@@ -665,7 +736,6 @@ class VendasUI:
         self._set_stage("finalizar")
         self._render_pagamentos()
         self._atualizar_resumo()
-        self.page.update()
 
     def _render_pagamentos(self):
         tiles = []
@@ -689,7 +759,7 @@ class VendasUI:
                 highlight_target=getattr(tile, "content", tile),
             )
         self.payment_grid.controls = tiles
-        self.page.update()
+        self.ui.atualizar(self.payment_grid)
         if self.forma_pagamento:
             self._focus_finalizar()
 
@@ -701,16 +771,13 @@ class VendasUI:
                 self.forma_pagamento or "N/D",
                 cliente,
             )
-            for item in itens_snapshot:
-                Venda.registrar(
-                    item["nome"],
-                    item["quantidade"],
-                    item["quantidade"] * item["valor_unitario"],
-                    vendedor=self.vendedor,
-                    cliente=cliente,
-                    forma_pagamento=self.forma_pagamento,
-                    pedido_id=self.pedido_id,
-                )
+            Venda.registrar_pedido(
+                self.pedido_id,
+                itens_snapshot,
+                vendedor=self.vendedor,
+                cliente=cliente,
+                forma_pagamento=self.forma_pagamento,
+            )
             logger.info(
                 "Venda finalizada por %s | itens=%d | pagamento=%s | cliente=%s | total=%.2f",
                 self.vendedor,
@@ -721,8 +788,7 @@ class VendasUI:
             )
             self._fechar_dialogo()
             self._mostrar_snackbar(f"Venda registrada: R$ {total_liquido:.2f}")
-            self.cart.clear()
-            self.desconto_percent = 0.0
+            self.cart.limpar()
             self.forma_pagamento = None
             self._set_stage("nova")
             self._render_pagamentos()
@@ -734,25 +800,28 @@ class VendasUI:
 
     def _atualizar_cliente_resumo(self):
         self._resumo_cliente_value.value = self.cliente_field.value or "Consumidor Final"
-        self.page.update()
+        self.ui.atualizar(self._resumo_cliente_value)
 
     # ==================================================
     # MODAIS
     # ==================================================
     def _abrir_modal_desconto(self, _):
         campo = style.apply_textfield_style(
-            ft.TextField(label="Percentual de desconto", value=str(self.desconto_percent), keyboard_type=ft.KeyboardType.NUMBER),
+            ft.TextField(label="Percentual de desconto", value=str(self.cart.desconto_percent), keyboard_type=ft.KeyboardType.NUMBER),
             variant="light",
         )
 
         def salvar(_):
             try:
-                self.desconto_percent = max(0.0, float(campo.value or 0))
+                self.cart.desconto_percent = max(0.0, float(campo.value or 0))
                 self._atualizar_resumo()
                 self._fechar_dialogo()
             except ValueError:
                 campo.error_text = "Valor inválido"
-                self.page.update()
+                self.ui.atualizar(campo)
+            except Exception as err:
+                campo.error_text = str(err)
+                self.ui.atualizar(campo)
 
         dialog = ft.AlertDialog(
             modal=True,
@@ -770,7 +839,7 @@ class VendasUI:
         if not self.cart:
             self._mostrar_snackbar("Nenhum item para alterar valor.", erro=True)
             return
-        item = self.cart[-1]
+        item = self.cart.ultima()
         campo = style.apply_textfield_style(
             ft.TextField(label=f"Valor unitário de {item['nome']}", value=str(item["valor_unitario"]), keyboard_type=ft.KeyboardType.NUMBER),
             variant="light",
@@ -778,12 +847,15 @@ class VendasUI:
 
         def salvar(_):
             try:
-                item["valor_unitario"] = float(campo.value)
+                self.cart.alterar_valor(item["id"], float(campo.value))
                 self._atualizar_tabela()
                 self._fechar_dialogo()
             except ValueError:
                 campo.error_text = "Valor inválido"
-                self.page.update()
+                self.ui.atualizar(campo)
+            except Exception as err:
+                campo.error_text = str(err)
+                self.ui.atualizar(campo)
 
         dialog = ft.AlertDialog(
             modal=True,
@@ -804,14 +876,14 @@ class VendasUI:
             current_dialog = None
         if current_dialog:
             current_dialog.open = False
-            self.page.update()
+            self.ui.atualizar(imediato=True)
         try:
             self.page.dialog = dialog
         except AttributeError:
             logger.error("Não foi possível atribuir dialog à página.")
             return
         dialog.open = True
-        self.page.update()
+        self.ui.atualizar(imediato=True)
         self._dialog_id = dialog_id
         logger.debug("Diálogo aberto: %s", dialog_id)
 
@@ -822,7 +894,7 @@ class VendasUI:
             current_dialog = None
         if current_dialog:
             current_dialog.open = False
-            self.page.update()
+            self.ui.atualizar(imediato=True)
             try:
                 self.page.dialog = None
             except AttributeError:
@@ -833,6 +905,7 @@ class VendasUI:
     # ==================================================
     # FINALIZAÇÃO
     # ==================================================
+    @em_acao()
     def _finalizar_venda(self, _):
         logger.debug(
             "Finalizar solicitado: itens=%d | pagamento=%s",
@@ -868,7 +941,7 @@ class VendasUI:
             total_liquido,
             cliente,
         )
-        itens_snapshot = [item.copy() for item in self.cart]
+        itens_snapshot = self.cart.snapshot()
         forma_pagamento = self.forma_pagamento
         pedido_atual = self.pedido_id
         data_venda = datetime.now().strftime("%d/%m/%Y %H:%M")
@@ -894,6 +967,7 @@ class VendasUI:
         self._prev_keyboard_handler = self.page.on_keyboard_event
         self.page.on_keyboard_event = self._handle_keyboard
 
+    @em_acao()
     def _handle_keyboard(self, e: ft.KeyboardEvent):
         key_raw = (e.key or "").upper()
         if not key_raw:
@@ -978,7 +1052,7 @@ class VendasUI:
             return
         self.stage = stage
         self._update_stepper()
-        self.page.update()
+        self.ui.atualizar(self.stepper_row)
 
     def _update_stepper(self):
         labels = [("nova", "Nova venda"), ("pagamento", "Forma de pagamento"), ("finalizar", "Finalizar")]
@@ -1016,7 +1090,7 @@ class VendasUI:
     # ==================================================
     def _focus_codigo(self):
         self.codigo_field.focus()
-        self.page.update()
+        self.ui.atualizar(self.codigo_field)
 
     def _focus_finalizar(self):
         for idx, entry in enumerate(self.focusable_controls):
@@ -1035,7 +1109,7 @@ class VendasUI:
         if self.cliente_field:
             self.cliente_field.value = "Consumidor Final"
             self._atualizar_cliente_resumo()
-        self.cart.clear()
+        self.cart.limpar()
         self._atualizar_tabela()
         self.forma_pagamento = None
         self._render_pagamentos()
@@ -1046,12 +1120,12 @@ class VendasUI:
 
     def _set_alert(self, texto: str):
         self.alert_text.value = texto
-        self.page.update()
+        self.ui.atualizar(self.alert_text)
 
-    def _obter_quantidade_digitada(self) -> int:
+    def _obter_quantidade_digitada(self):
         try:
-            qtd = int(self.quantidade_field.value or "1")
-            return max(1, qtd)
+            qtd = converter_quantidade(self.quantidade_field.value or "1")
+            return qtd if qtd > 0 else 1
         except ValueError:
             return 1
 
@@ -1060,7 +1134,7 @@ class VendasUI:
             "id": int(row[0]),
             "nome": row[1],
             "preco": float(row[2]),
-            "estoque": int(row[3]),
+            "estoque": row[3] or 0,
             "codigo": row[4],
         }
 
@@ -1077,7 +1151,7 @@ class VendasUI:
         if self.pedido_label:
             self.pedido_label.value = self._pedido_label_text()
         if self.page:
-            self.page.update()
+            self.ui.atualizar(self.pedido_label)
 
     def _reset_focusable_controls(self):
         for entry in getattr(self, "focusable_controls", []):
@@ -1122,7 +1196,7 @@ class VendasUI:
         for idx, entry in enumerate(self.focusable_controls):
             self._apply_focus_highlight(entry, idx == self.focus_index and self.focus_index >= 0)
         if self.page:
-            self.page.update()
+            self.ui.atualizar()
 
     def _scroll_target_into_view(self, target):
         scroll_fn = getattr(target, "scroll_into_view", None)
@@ -1165,16 +1239,27 @@ class VendasUI:
             termo = (e.control.value or "").strip()
         else:
             termo = (self.codigo_field.value or "").strip()
+        if self.leitor.registrar(termo):
+            # Leitura do leitor em andamento: nada de sugestões para prefixos parciais
+            if self.sugestoes_data:
+                self._limpar_sugestoes()
+            else:
+                self.sugestoes_pipeline.cancelar()
+            return
         if not termo:
             self._limpar_sugestoes()
             return
+        # Busca com debounce em segundo plano; só a última digitação é exibida
+        self.sugestoes_pipeline.solicitar(termo)
 
-        sugestoes = Produto.buscar_sugestoes(termo, limit=6)
+    @em_acao()
+    def _aplicar_sugestoes(self, termo: str, sugestoes):
+        if termo != (self.codigo_field.value or "").strip():
+            return
         if not sugestoes:
             self._limpar_sugestoes()
             return
 
-        qtd = self._obter_quantidade_digitada()
         items = []
         self.sugestoes_data = []
         for row in sugestoes:
@@ -1206,9 +1291,10 @@ class VendasUI:
         self.sugestao_index = 0 if items else -1
         self._atualizar_destaque_sugestoes()
         self.sugestoes_container.visible = True
-        self.page.update()
+        self.ui.atualizar(self.sugestoes_container)
 
     def _limpar_sugestoes(self):
+        self.sugestoes_pipeline.cancelar()
         self.sugestoes_data = []
         self.sugestao_index = -1
         if self.sugestoes_list:
@@ -1216,7 +1302,7 @@ class VendasUI:
         if self.sugestoes_container:
             self.sugestoes_container.visible = False
         if self.page:
-            self.page.update()
+            self.ui.atualizar(self.sugestoes_container)
 
     def _atualizar_destaque_sugestoes(self):
         for idx, data in enumerate(self.sugestoes_data):
@@ -1228,7 +1314,7 @@ class VendasUI:
             coluna.controls[0].color = style.TEXT_PRIMARY if selecionado else style.TEXT_DARK
             coluna.controls[1].color = style.TEXT_SECONDARY if selecionado else style.TEXT_MUTED
             preco_text.color = style.TEXT_PRIMARY if selecionado else style.ACCENT
-        self.page.update()
+        self.ui.atualizar(self.sugestoes_container)
 
     def _mover_sugestao(self, delta: int):
         if not self.sugestoes_data:
@@ -1236,6 +1322,7 @@ class VendasUI:
         self.sugestao_index = (self.sugestao_index + delta) % len(self.sugestoes_data)
         self._atualizar_destaque_sugestoes()
 
+    @em_acao()
     def _selecionar_sugestao(self, produto=None):
         if produto is None:
             if not self.sugestoes_data:
@@ -1247,12 +1334,18 @@ class VendasUI:
         self._mostrar_confirmacao_produto(produto, self._obter_quantidade_digitada())
 
     def _mostrar_snackbar(self, texto, erro=False):
-        self.page.snack_bar = ft.SnackBar(
-            content=ft.Text(texto),
-            bgcolor=style.ERROR if erro else style.SURFACE,
-        )
-        self.page.snack_bar.open = True
-        self.page.update()
+        bgcolor = style.ERROR if erro else style.SURFACE
+        if self._snackbar is not None and getattr(self.page, "snack_bar", None) is self._snackbar:
+            # Reaproveita o SnackBar já montado: atualiza só ele, não a página
+            self._snackbar.content = ft.Text(texto)
+            self._snackbar.bgcolor = bgcolor
+            self._snackbar.open = True
+            self.ui.atualizar(self._snackbar)
+            return
+        self._snackbar = ft.SnackBar(content=ft.Text(texto), bgcolor=bgcolor)
+        self.page.snack_bar = self._snackbar
+        self._snackbar.open = True
+        self.ui.atualizar()
 
     def _mostrar_resumo_final(self, resumo: Dict):
         self.ultima_venda_resumo = resumo
@@ -1317,9 +1410,11 @@ class VendasUI:
         )
         self.resumo_venda_container.content = content
         self.resumo_venda_container.visible = True
-        self.page.update()
+        self.ui.atualizar(self.resumo_venda_container)
 
     def _voltar(self, _=None):
+        self.sugestoes_pipeline.encerrar()
+        latencia_leitura.log()
         self._restore_keyboard_handler()
         if callable(self.voltar_callback):
             self.page.clean()
@@ -0,0 +1,36 @@
+# importar_produtos.py
+"""
+Importa produtos em massa a partir de um arquivo CSV (separado por ; ou ,).
+
+Colunas: nome e preco (obrigatórias), estoque, fornecedor, validade,
+categoria, unidade, codigo_barras, estoque_minimo, localizacao.
+Produtos com o mesmo nome são atualizados.
+
+Uso:
+    python importar_produtos.py produtos.csv
+    python importar_produtos.py produtos.csv 10000    # tamanho do lote
+"""
+import sys
+from APP.core.database import inicializar_banco
+from APP.core.migrations import run_migrations
+from APP.models.importacao_models import ImportadorProdutos
+
+inicializar_banco()
+run_migrations()
+
+args = sys.argv[1:]
+if len(args) not in (1, 2) or (len(args) == 2 and not args[1].isdigit()):
+    print(__doc__)
+    sys.exit(1)
+
+importador = ImportadorProdutos(tamanho_lote=int(args[1])) if len(args) == 2 else ImportadorProdutos()
+resultado = importador.importar_arquivo(
+    args[0], progresso=lambda lidas: print(f"   {lidas} linha(s) lidas...", end="\r")
+)
+print(f"📦 {resultado.resumo()}")
+if resultado.categorias_criadas:
+    print(f"🏷️ {resultado.categorias_criadas} categoria(s) criada(s).")
+for linha, mensagem in resultado.erros[:50]:
+    print(f"   linha {linha}: {mensagem}")
+if len(resultado.erros) > 50:
+    print(f"   ... e mais {len(resultado.erros) - 50} erro(s).")
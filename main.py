@@ -1,10 +1,12 @@
 import sys
 import flet as ft
 from APP.core.logger import logger
-from APP.core.database import inicializar_banco
+from APP.core.database import inicializar_banco, pool
 from APP.core.config import config
+from APP.core.graficos import renderizador_graficos
 from APP.ui.login_ui import LoginUI
 from APP.core.migrations import run_migrations
+from APP.core.planos_consulta import verificar_planos
 from APP.ui import style
 
 def run_app(page: ft.Page) -> None:
@@ -39,6 +41,9 @@ def run_app(page: ft.Page) -> None:
         # Inicializa banco e aplica migrações
         inicializar_banco()
         run_migrations()
+        if config.debug:
+            # Registra no log qualquer consulta crítica que deixou de usar índice
+            verificar_planos()
 
         # Carrega tela de login
         LoginUI(page)
@@ -57,6 +62,9 @@ def main() -> None:
     except Exception as e:
         logger.critical(f"Erro fatal na aplicação: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        renderizador_graficos.encerrar()
+        pool.close_all()
 
 if __name__ == "__main__":
     main()
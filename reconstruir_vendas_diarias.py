@@ -0,0 +1,23 @@
+# reconstruir_vendas_diarias.py
+"""
+Reconstrói o resumo diário de vendas (tabela vendas_diarias).
+
+Uso:
+    python reconstruir_vendas_diarias.py                          # todo o histórico
+    python reconstruir_vendas_diarias.py 2025-01-01 2025-01-31    # apenas o período
+"""
+import sys
+from APP.core.database import inicializar_banco
+from APP.core.migrations import run_migrations
+from APP.models.vendas_models import Venda
+
+inicializar_banco()
+run_migrations()
+
+args = sys.argv[1:]
+if len(args) not in (0, 2):
+    print(__doc__)
+    sys.exit(1)
+
+linhas = Venda.reconstruir_resumo_diario(*args)
+print(f"📊 Resumo diário reconstruído: {linhas} linhas.")
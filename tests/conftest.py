@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from APP.core.config import config  # noqa: E402
+
+# Os testes não escrevem no log do sistema (DATA/system.log)
+config.data["log_path"] = os.path.join(tempfile.mkdtemp(prefix="sistema_testes_"), "testes.log")
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    """Banco novo e migrado em tmp_path, com o catálogo em memória zerado."""
+    from APP.core.database import inicializar_banco, pool
+    from APP.core.migrations import run_migrations
+    from APP.models.produtos_models import catalogo
+
+    monkeypatch.setitem(config.data, "database_path", str(tmp_path / "sistema.db"))
+    inicializar_banco()
+    run_migrations()
+    catalogo.invalidar()
+    yield
+    catalogo.invalidar()
+    pool.close_all()
@@ -0,0 +1,87 @@
+"""
+UpdateBatcher: um envio por ação, callbacks depois do envio e agrupamento
+separado por thread (workers não entram na ação da thread da interface).
+"""
+
+import threading
+
+from APP.ui.atualizacoes import UpdateBatcher
+
+
+class PaginaFalsa:
+    def __init__(self):
+        self.envios = []
+
+    def update(self, *controles):
+        self.envios.append(controles)
+
+
+def _em_outra_thread(funcao):
+    thread = threading.Thread(target=funcao)
+    thread.start()
+    thread.join()
+
+
+def test_acao_aninhada_envia_uma_vez_no_fim():
+    pagina = PaginaFalsa()
+    ui = UpdateBatcher(pagina)
+    a, b = object(), object()
+    with ui.acao("externa"):
+        ui.atualizar(a)
+        with ui.acao("interna"):
+            ui.atualizar(b, a)
+        assert pagina.envios == []
+    assert pagina.envios == [(a, b)]
+    assert ui.flushes == 1
+
+
+def test_apos_envio_roda_depois_do_envio():
+    pagina = PaginaFalsa()
+    ui = UpdateBatcher(pagina)
+    ordem = []
+    with ui.acao("leitura"):
+        ui.atualizar(object())
+        ui.apos_envio(lambda: ordem.append(len(pagina.envios)))
+        assert ordem == []
+    assert ordem == [1]
+
+
+def test_worker_nao_entra_na_acao_da_interface():
+    pagina = PaginaFalsa()
+    ui = UpdateBatcher(pagina)
+    da_interface, do_worker = object(), object()
+    callbacks = []
+    with ui.acao("interface"):
+        ui.atualizar(da_interface)
+
+        def worker():
+            ui.atualizar(do_worker)
+            ui.apos_envio(lambda: callbacks.append("worker"))
+
+        _em_outra_thread(worker)
+        # O worker enviou o próprio controle na hora e o callback já rodou
+        assert pagina.envios == [(do_worker,)]
+        assert callbacks == ["worker"]
+    assert pagina.envios == [(do_worker,), (da_interface,)]
+
+
+def test_acao_do_worker_nao_adia_a_interface():
+    pagina = PaginaFalsa()
+    ui = UpdateBatcher(pagina)
+    dentro, liberar = threading.Event(), threading.Event()
+    do_worker, da_interface = object(), object()
+
+    def worker():
+        with ui.acao("worker"):
+            ui.atualizar(do_worker)
+            dentro.set()
+            liberar.wait(5)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    dentro.wait(5)
+    ui.atualizar(da_interface)
+    assert pagina.envios == [(da_interface,)]
+    liberar.set()
+    thread.join()
+    assert pagina.envios == [(da_interface,), (do_worker,)]
@@ -0,0 +1,49 @@
+"""
+Etiquetas de balança (EAN-13 "2..." com PLU e preço/peso embutidos) e a
+precedência do código de barras cadastrado sobre a etiqueta.
+"""
+
+import pytest
+
+from APP.core.balanca import decodificar_etiqueta, digito_ean13
+from APP.core.config import config
+from APP.models.produtos_models import Produto
+
+
+def _ean13(codigo12: str) -> str:
+    return codigo12 + str(digito_ean13(codigo12))
+
+
+@pytest.fixture(autouse=True)
+def balanca_por_preco(monkeypatch):
+    monkeypatch.setitem(config.data, "balanca", {"formato": "2PPPPPXVVVVVD", "tipo_valor": "preco"})
+
+
+def test_decodifica_plu_e_preco():
+    etiqueta = decodificar_etiqueta(_ean13("200123001550"))
+    assert etiqueta.plu == "00123"
+    assert etiqueta.valor == 15.5
+    assert etiqueta.tipo_valor == "preco"
+
+
+def test_digito_verificador_invalido_nao_e_etiqueta():
+    codigo = _ean13("200123001550")
+    errado = codigo[:-1] + str((int(codigo[-1]) + 1) % 10)
+    assert decodificar_etiqueta(errado) is None
+
+
+def test_etiqueta_de_preco_vira_quantidade(banco):
+    Produto.adicionar("Pão Francês KG", 31.0, 10, codigo_barras="123")
+    row, quantidade = Produto.buscar_etiqueta_balanca(_ean13("200123001550"))
+    assert row[1] == "Pão Francês KG"
+    assert quantidade == 0.5
+
+
+def test_ean_com_prefixo_2_cadastrado_e_produto_comum(banco):
+    codigo = _ean13("200123001550")
+    assert decodificar_etiqueta(codigo) is not None
+    Produto.adicionar("Pão Francês KG", 31.0, 10, codigo_barras="123")
+    Produto.adicionar("Biscoito Importado", 7.9, 5, codigo_barras=codigo)
+
+    assert Produto.buscar_etiqueta_balanca(codigo) is None
+    assert Produto.buscar_por_codigo_ou_nome(codigo)[1] == "Biscoito Importado"
@@ -0,0 +1,79 @@
+"""
+MultiFieldIndex da tela de produtos: qualificadores por campo, prefixo nos
+demais campos e trecho no nome (comportamento da antiga busca `termo in nome`).
+"""
+
+import threading
+
+from APP.core.busca import MultiFieldIndex
+from APP.models.produtos_models import APELIDOS_BUSCA_PRODUTOS, CAMPOS_BUSCA_PRODUTOS, TRECHO_BUSCA_PRODUTOS
+
+
+def _produto(id_, nome, codigo=None, fornecedor=None, categoria=None, local=None):
+    # Mesmo layout de Produto.listar: nome=1, fornecedor=4, categoria=6, codigo=8, local=10
+    return (id_, nome, 1.0, 1, fornecedor, None, categoria, "UN", codigo, 0, local, None, None)
+
+
+PRODUTOS = [
+    _produto(1, "Água Mineral 500ml", "7891000000011", "Crystal", "Bebidas", "Corredor 1"),
+    _produto(2, "Leite Integral", "7891000000028", "Nestlé", "Laticínios", "Geladeira"),
+    _produto(3, "Refrigerante Cola 2L", "7891000000035", "Coca", "Bebidas", "Corredor 1"),
+    _produto(4, "Suco de Laranja", "7891000000042", "Nestlé", "Bebidas", "Corredor 2"),
+]
+
+
+def _indice():
+    indice = MultiFieldIndex(CAMPOS_BUSCA_PRODUTOS, APELIDOS_BUSCA_PRODUTOS, TRECHO_BUSCA_PRODUTOS)
+    indice.construir(PRODUTOS)
+    return indice
+
+
+def _ids(linhas):
+    return [linha[0] for linha in linhas]
+
+
+def test_nome_casa_por_trecho_como_a_busca_antiga():
+    indice = _indice()
+    assert _ids(indice.buscar("gerante")) == [3]
+    assert _ids(indice.buscar("agua")) == [1]
+    assert _ids(indice.buscar("nome:ranja")) == [4]
+
+
+def test_demais_campos_casam_por_prefixo():
+    indice = _indice()
+    assert _ids(indice.buscar("forn:nest")) == [2, 4]
+    assert _ids(indice.buscar("forn:estle")) == []
+    assert _ids(indice.buscar("cod:789100000003")) == [3]
+
+
+def test_qualificadores_combinados_e_ordem_original():
+    indice = _indice()
+    assert _ids(indice.buscar("forn:nestle cat:bebidas")) == [4]
+    assert _ids(indice.buscar('loc:"corredor 1"')) == [1, 3]
+    assert _ids(indice.buscar("")) == [1, 2, 3, 4]
+
+
+def test_construir_troca_o_indice_inteiro():
+    indice = _indice()
+    outros = [_produto(10 + i, f"Biscoito {i}", fornecedor="Marilan") for i in range(2000)]
+    erros = []
+    parar = threading.Event()
+
+    def ler():
+        while not parar.is_set():
+            # Sempre o índice antigo inteiro (4 linhas) ou o novo inteiro
+            tamanho = len(indice.buscar(""))
+            if tamanho not in (len(PRODUTOS), len(outros)):
+                erros.append(tamanho)
+            resultado = indice.buscar("forn:marilan")
+            if resultado and len(resultado) != len(outros):
+                erros.append(len(resultado))
+
+    leitor = threading.Thread(target=ler)
+    leitor.start()
+    for _ in range(20):
+        indice.construir(outros)
+        indice.construir(PRODUTOS)
+    parar.set()
+    leitor.join()
+    assert erros == []
@@ -0,0 +1,98 @@
+"""
+Cart do PDV sem interface: linhas por produto, totais mantidos a cada
+operação e limite de estoque pelo catálogo.
+"""
+
+import random
+
+import pytest
+
+from APP.models.carrinho_models import Cart
+from APP.models.produtos_models import Produto
+
+ARROZ = {"id": 1, "nome": "Arroz 5kg", "preco": 27.9, "codigo": "789001"}
+FEIJAO = {"id": 2, "nome": "Feijão 1kg", "preco": 8.49, "codigo": "789002"}
+QUEIJO = {"id": 3, "nome": "Queijo Prato KG", "preco": 42.0, "codigo": "3"}
+
+
+def _soma(carrinho):
+    return sum(linha["quantidade"] * linha["valor_unitario"] for linha in carrinho)
+
+
+def test_mesmo_produto_soma_na_mesma_linha():
+    carrinho = Cart(verificar_estoque=False)
+    carrinho.adicionar(ARROZ)
+    carrinho.adicionar(FEIJAO, 2)
+    linha = carrinho.adicionar(ARROZ, 3)
+
+    assert len(carrinho) == 2
+    assert linha["quantidade"] == 4
+    assert [l["id"] for l in carrinho] == [1, 2]
+    assert carrinho.total_itens == 6
+    assert carrinho.total_bruto == round(4 * 27.9 + 2 * 8.49, 2)
+
+
+def test_decrementar_e_remover_linhas():
+    carrinho = Cart(verificar_estoque=False)
+    carrinho.adicionar(ARROZ, 3)
+    carrinho.adicionar(FEIJAO)
+
+    assert carrinho.alterar_quantidade(1, -1)["quantidade"] == 2
+    assert carrinho.alterar_quantidade(1, -5)["quantidade"] == 1  # unidade: mínimo 1
+    assert carrinho.alterar_quantidade(99, -1) is None
+
+    assert carrinho.remover_ultima()["id"] == 2
+    assert carrinho.remover(1)["id"] == 1
+    assert not carrinho
+    assert carrinho.total_itens == 0
+    assert carrinho.total_bruto == 0.0
+
+
+@pytest.mark.parametrize("quantidade", [0.345, 1.25, 0.999])
+def test_decremento_fracionado_nunca_aumenta(quantidade):
+    carrinho = Cart(verificar_estoque=False)
+    carrinho.adicionar(QUEIJO, quantidade)
+
+    linha = carrinho.alterar_quantidade(3, -1)
+    assert linha["quantidade"] <= quantidade
+    assert linha["quantidade"] > 0
+    assert carrinho.total_bruto == round(linha["quantidade"] * 42.0, 2)
+
+
+def test_total_acompanha_a_soma_recalculada():
+    carrinho = Cart(verificar_estoque=False)
+    produtos = [ARROZ, FEIJAO, QUEIJO]
+    sorteio = random.Random(7)
+    for _ in range(300):
+        produto = sorteio.choice(produtos)
+        operacao = sorteio.random()
+        if operacao < 0.4:
+            carrinho.adicionar(produto, sorteio.choice([1, 2, 0.35]))
+        elif operacao < 0.7:
+            carrinho.alterar_quantidade(produto["id"], sorteio.choice([-1, 1]))
+        elif operacao < 0.85:
+            carrinho.alterar_valor(produto["id"], round(sorteio.uniform(1, 50), 2))
+        else:
+            carrinho.remover(produto["id"])
+        # total_bruto é arredondado a centavos: fica a meio centavo da soma exata
+        assert carrinho.total_bruto == pytest.approx(_soma(carrinho), abs=0.0051)
+        assert carrinho.total_itens == pytest.approx(sum(l["quantidade"] for l in carrinho), abs=1e-6)
+
+    carrinho.desconto_percent = 10
+    assert carrinho.total_liquido == pytest.approx(carrinho.total_bruto * 0.9, abs=0.01)
+
+
+def test_recusa_quantidade_acima_do_estoque(banco):
+    Produto.adicionar("Leite Integral", 5.5, 3)
+    produto_id = Produto.buscar_por_codigo_ou_nome("Leite Integral")[0]
+    leite = {"id": produto_id, "nome": "Leite Integral", "preco": 5.5, "codigo": None}
+    carrinho = Cart()
+
+    carrinho.adicionar(leite, 2)
+    with pytest.raises(Exception, match="Estoque insuficiente"):
+        carrinho.adicionar(leite, 2)
+    carrinho.alterar_quantidade(produto_id, 1)
+    with pytest.raises(Exception, match="Estoque insuficiente"):
+        carrinho.alterar_quantidade(produto_id, 1)
+    assert carrinho.linha(produto_id)["quantidade"] == 3
+    assert carrinho.total_bruto == 16.5
@@ -0,0 +1,84 @@
+"""
+Empréstimos aninhados do pool (a thread já tem a conexão): escritas de um
+helper não se perdem nem desfazem o trabalho de quem abriu a transação.
+"""
+
+import pytest
+
+from APP.core.database import conectar, transacao
+
+
+def _acoes():
+    with conectar() as conn:
+        return [row[0] for row in conn.execute("SELECT acao FROM logs ORDER BY id")]
+
+
+def _registrar(acao):
+    # Mesmo padrão dos helpers de log das telas: commit e close explícitos
+    conn = conectar()
+    conn.execute("INSERT INTO logs (usuario, acao) VALUES ('teste', ?)", (acao,))
+    conn.commit()
+    conn.close()
+
+
+def test_escrita_aninhada_em_emprestimo_de_leitura_fechado_com_close(banco):
+    externo = conectar()
+    externo.execute("SELECT COUNT(*) FROM produtos").fetchone()
+    _registrar("helper")
+    externo.close()
+    assert _acoes() == ["helper"]
+
+
+def test_escrita_aninhada_em_with_de_leitura(banco):
+    with conectar() as externo:
+        externo.execute("SELECT COUNT(*) FROM produtos").fetchone()
+        with conectar() as interno:
+            interno.execute("INSERT INTO logs (usuario, acao) VALUES ('teste', 'with')")
+        # Já gravada: o empréstimo externo nem abriu transação
+        assert not externo.in_transaction
+    assert _acoes() == ["with"]
+
+
+def test_rollback_aninhado_nao_desfaz_o_externo(banco):
+    with transacao() as externo:
+        externo.execute("INSERT INTO logs (usuario, acao) VALUES ('teste', 'externo')")
+        interno = conectar()
+        interno.execute("INSERT INTO logs (usuario, acao) VALUES ('teste', 'interno')")
+        interno.rollback()
+        interno.close()
+        assert externo.in_transaction
+        externo.execute("INSERT INTO logs (usuario, acao) VALUES ('teste', 'depois')")
+    assert _acoes() == ["externo", "depois"]
+
+
+def test_erro_no_with_aninhado_desfaz_so_o_trecho(banco):
+    with transacao() as externo:
+        externo.execute("INSERT INTO logs (usuario, acao) VALUES ('teste', 'externo')")
+        with pytest.raises(ValueError):
+            with conectar() as interno:
+                interno.execute("INSERT INTO logs (usuario, acao) VALUES ('teste', 'falhou')")
+                raise ValueError("erro no helper")
+    assert _acoes() == ["externo"]
+
+
+def test_commit_aninhado_segue_a_transacao_externa(banco):
+    with pytest.raises(RuntimeError):
+        with transacao():
+            _registrar("aninhado")
+            with transacao() as conn:
+                conn.execute("INSERT INTO logs (usuario, acao) VALUES ('teste', 'bloco')")
+            raise RuntimeError("falha depois do commit aninhado")
+    assert _acoes() == []
+
+    with transacao():
+        _registrar("aninhado")
+    assert _acoes() == ["aninhado"]
+
+
+def test_close_aninhado_sem_commit_descarta_o_trecho(banco):
+    with transacao() as externo:
+        externo.execute("INSERT INTO logs (usuario, acao) VALUES ('teste', 'externo')")
+        interno = conectar()
+        interno.execute("INSERT INTO logs (usuario, acao) VALUES ('teste', 'sem commit')")
+        interno.close()
+    assert _acoes() == ["externo"]
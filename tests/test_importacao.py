@@ -0,0 +1,64 @@
+"""
+ImportadorProdutos: cada lote numa transação própria (o lock de escrita é
+liberado entre lotes) e, se um lote falhar, os anteriores continuam gravados
+e a importação pode ser retomada pela linha informada.
+"""
+
+import io
+import sqlite3
+
+from APP.core.database import conectar
+from APP.core.config import config
+from APP.models.importacao_models import ImportadorProdutos
+
+
+def _csv(nomes):
+    return io.StringIO("nome;preco;estoque\n" + "".join(f"{nome};1,50;3\n" for nome in nomes))
+
+
+def _nomes():
+    with conectar() as conn:
+        return [row[0] for row in conn.execute("SELECT nome FROM produtos ORDER BY id")]
+
+
+def test_lock_de_escrita_liberado_entre_lotes(banco):
+    gravacoes = []
+
+    def progresso(lidas):
+        # Outro terminal, sem espera: falharia com "database is locked" se o
+        # importador ainda segurasse a transação
+        outro = sqlite3.connect(config.data["database_path"], timeout=0)
+        try:
+            outro.execute("INSERT INTO logs (usuario, acao) VALUES ('caixa', ?)", (f"venda {lidas}",))
+            outro.commit()
+            gravacoes.append(lidas)
+        finally:
+            outro.close()
+
+    resultado = ImportadorProdutos(tamanho_lote=2).importar(_csv(f"Produto {i}" for i in range(5)), progresso)
+    assert resultado.importadas == 5
+    assert resultado.falha is None
+    assert gravacoes == [2, 4, 5]
+
+
+def test_falha_num_lote_mantem_os_anteriores_e_informa_a_retomada(banco):
+    with conectar() as conn:
+        conn.execute(
+            "CREATE TRIGGER quebra BEFORE INSERT ON produtos WHEN NEW.nome = 'Quebra'"
+            " BEGIN SELECT RAISE(ABORT, 'disco cheio'); END"
+        )
+    nomes = ["A", "B", "C", "Quebra", "E"]
+    resultado = ImportadorProdutos(tamanho_lote=2).importar(_csv(nomes))
+
+    assert _nomes() == ["A", "B"]
+    assert resultado.importadas == 2
+    assert resultado.falha == "disco cheio"
+    assert resultado.linha_gravada == 3
+    assert "reimporte a partir da linha 4" in resultado.resumo()
+
+    with conectar() as conn:
+        conn.execute("DROP TRIGGER quebra")
+    retomada = ImportadorProdutos(tamanho_lote=2).importar(_csv(nomes), a_partir_da_linha=4)
+    assert retomada.lidas == 3
+    assert retomada.falha is None
+    assert _nomes() == ["A", "B", "C", "Quebra", "E"]
@@ -0,0 +1,62 @@
+"""
+Migrações do schema de vendas: pedido_itens.quantidade declarada REAL e
+itens fracionados (produtos vendidos por peso) do registro até os relatórios.
+"""
+
+from APP.core import migrations
+from APP.core.database import conectar
+from APP.models.produtos_models import Produto, catalogo
+from APP.models.vendas_models import Venda
+
+
+def _tipo_quantidade(conn):
+    return {row[1]: row[2] for row in conn.execute("PRAGMA table_info(pedido_itens)")}["quantidade"]
+
+
+def test_quantidade_declarada_real(banco):
+    with conectar() as conn:
+        assert _tipo_quantidade(conn) == "REAL"
+
+
+def test_migracao_013_recria_pedido_itens_inteiro(banco):
+    with conectar() as conn:
+        conn.executescript("""
+            DROP VIEW vendas;
+            DROP TRIGGER pedido_itens_vendas_diarias_insert;
+            DROP TRIGGER pedido_itens_vendas_diarias_delete;
+            DROP TABLE pedido_itens;
+            CREATE TABLE pedido_itens (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                pedido_fk INTEGER NOT NULL REFERENCES pedidos(id),
+                produto_id INTEGER REFERENCES produtos(id),
+                produto TEXT NOT NULL,
+                quantidade INTEGER NOT NULL,
+                preco_unitario REAL NOT NULL,
+                total REAL NOT NULL
+            );
+            INSERT INTO pedidos (id, pedido_id, data_hora, total) VALUES (1, 'P1', '2026-01-02 10:00:00', 10);
+            INSERT INTO pedido_itens (id, pedido_fk, produto, quantidade, preco_unitario, total)
+            VALUES (7, 1, 'Antigo', 2, 5, 10);
+        """)
+        migrations._migration_013_pedido_itens_quantidade_real(conn)
+
+        assert _tipo_quantidade(conn) == "REAL"
+        assert [tuple(row) for row in conn.execute("SELECT id, produto, quantidade FROM vendas")] == [(7, "Antigo", 2)]
+        indices = {row[1] for row in conn.execute("PRAGMA index_list(pedido_itens)")}
+        assert {"idx_pedido_itens_pedido_fk", "idx_pedido_itens_produto_id"} <= indices
+        gatilhos = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        assert {"pedido_itens_vendas_diarias_insert", "vendas_instead_of_insert"} <= gatilhos
+
+
+def test_venda_fracionada_preserva_decimais(banco):
+    Produto.adicionar("Queijo Prato KG", 40.0, 2.75)
+    Venda.registrar("Queijo Prato KG", 0.345, None, vendedor="caixa")
+
+    with conectar() as conn:
+        estoque = conn.execute("SELECT estoque FROM produtos WHERE nome = 'Queijo Prato KG'").fetchone()[0]
+        item = conn.execute("SELECT quantidade, total FROM pedido_itens").fetchone()
+        diario = conn.execute("SELECT quantidade FROM vendas_diarias").fetchone()[0]
+    assert estoque == 2.405
+    assert tuple(item) == (0.345, 13.8)
+    assert diario == 0.345
+    assert catalogo.por_id(1)[3] == 2.405
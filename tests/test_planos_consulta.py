@@ -0,0 +1,37 @@
+"""
+Planos de execução das consultas críticas: cada consulta de
+CONSULTAS_CRITICAS precisa continuar usando o seu índice depois das migrações.
+"""
+
+import pytest
+
+from APP.core.database import conectar
+from APP.core.planos_consulta import CONSULTAS_CRITICAS, plano, verificar_planos
+
+
+@pytest.mark.parametrize("consulta", CONSULTAS_CRITICAS, ids=[c["nome"] for c in CONSULTAS_CRITICAS])
+def test_consulta_critica_usa_indice(banco, consulta):
+    with conectar() as conn:
+        detalhes = plano(conn, consulta["sql"], consulta.get("params", ()))
+    assert any(consulta["indice"] in linha for linha in detalhes), detalhes
+
+
+def test_paginacao_por_cursor_esta_coberta():
+    # Consulta de Venda.listar_periodo_pagina (cursor (data_hora, id))
+    assert any("(data_hora, id) > (?, ?)" in c["sql"] for c in CONSULTAS_CRITICAS)
+
+
+def test_verificar_planos_sem_falhas(banco):
+    assert verificar_planos() == []
+
+
+def test_verificar_planos_detecta_regressao(banco):
+    # Função sobre a coluna impede o uso do índice
+    regressao = {
+        "nome": "pedidos do dia com date()",
+        "sql": "SELECT * FROM pedidos WHERE date(data_hora) = ?",
+        "params": ("2025-01-01",),
+        "indice": "idx_pedidos_data_hora",
+    }
+    falhas = verificar_planos([regressao])
+    assert [f["nome"] for f in falhas] == ["pedidos do dia com date()"]
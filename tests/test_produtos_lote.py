@@ -0,0 +1,86 @@
+"""
+Produto.atualizar_em_lote: conversão dos valores antes da transação, estoque
+fracionado só para produtos vendidos por peso e itens fora do filtro em
+"ignorados" (não em "nao_encontrados").
+"""
+
+import pytest
+
+from APP.core.database import conectar
+from APP.models.produtos_models import Produto
+
+
+def _unidade(sigla):
+    with conectar() as conn:
+        return conn.execute("SELECT id FROM unidades_medida WHERE sigla = ?", (sigla,)).fetchone()[0]
+
+
+def _categoria(nome):
+    with conectar() as conn:
+        return conn.execute("SELECT id FROM categorias WHERE nome = ?", (nome,)).fetchone()[0]
+
+
+def _atual(codigo):
+    with conectar() as conn:
+        return tuple(conn.execute("SELECT preco, estoque FROM produtos WHERE codigo_barras = ?", (codigo,)).fetchone())
+
+
+@pytest.fixture
+def produtos(banco):
+    with conectar() as conn:
+        categorias = [row[0] for row in conn.execute("SELECT id FROM categorias ORDER BY id LIMIT 2")]
+    Produto.adicionar("Arroz 5kg", 27.9, 10, "Camil", None, categorias[0], _unidade("UN"), "789001")
+    Produto.adicionar("Feijão 1kg", 8.5, 20, "Camil", None, categorias[1], _unidade("UN"), "789002")
+    Produto.adicionar("Queijo Prato", 42.0, 3, "Tirolez", None, categorias[0], _unidade("KG"), "789003")
+    return categorias
+
+
+def test_valores_em_texto_sao_convertidos(produtos):
+    resultado = Produto.atualizar_em_lote([{"codigo_barras": "789001", "preco": "29.9", "estoque": "7"}])
+    assert _atual("789001") == (29.9, 7)
+    assert resultado["alterados"][0]["estoque"] == (10, 7)
+
+
+@pytest.mark.parametrize("valor", [None, "x", ""])
+def test_valor_invalido_levanta_antes_de_gravar(produtos, valor):
+    with pytest.raises(Exception, match="Valor inválido para 'estoque' no item '789002'"):
+        Produto.atualizar_em_lote([{"codigo_barras": "789001", "preco": 30}, {"codigo_barras": "789002", "estoque": valor}])
+    assert _atual("789001") == (27.9, 10)
+    with pytest.raises(Exception, match="Valor inválido para 'ajuste_percentual' no item 1:"):
+        Produto.atualizar_em_lote([{"id": 1, "ajuste_percentual": valor}])
+
+
+def test_estoque_fracionado_so_para_produto_por_peso(produtos):
+    Produto.atualizar_em_lote([{"codigo_barras": "789003", "estoque": "2,75"}])
+    assert _atual("789003") == (42.0, 2.75)
+
+    with pytest.raises(Exception, match="Arroz 5kg.*inteiro"):
+        Produto.atualizar_em_lote([{"codigo_barras": "789001", "estoque": 2.5}])
+    assert _atual("789001") == (27.9, 10)
+
+
+def test_fora_do_filtro_vai_para_ignorados(produtos):
+    resultado = Produto.atualizar_em_lote(
+        [
+            {"codigo_barras": "789001", "ajuste_percentual": 10},
+            {"codigo_barras": "789002", "ajuste_percentual": 10},
+            {"codigo_barras": "000000", "ajuste_percentual": 10},
+        ],
+        categoria_id=produtos[0],
+    )
+    assert [a["nome"] for a in resultado["alterados"]] == ["Arroz 5kg"]
+    assert resultado["ignorados"] == ["789002"]
+    assert resultado["nao_encontrados"] == ["000000"]
+    assert _atual("789001") == (30.69, 10)
+    assert _atual("789002") == (8.5, 20)
+
+
+def test_reajuste_global_pelo_fornecedor(produtos):
+    resultado = Produto.atualizar_em_lote(ajuste_valor=-0.5, fornecedor="Camil")
+    assert sorted(a["nome"] for a in resultado["alterados"]) == ["Arroz 5kg", "Feijão 1kg"]
+    assert _atual("789002") == (8.0, 20)
+    assert _atual("789003") == (42.0, 3)
+
+    with pytest.raises(Exception, match="ficaria negativo"):
+        Produto.atualizar_em_lote(ajuste_valor=-50, fornecedor="Camil")
+    assert _atual("789001") == (27.4, 10)
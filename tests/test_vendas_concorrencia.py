@@ -0,0 +1,90 @@
+"""
+Vários terminais vendendo o mesmo produto ao mesmo tempo: a baixa de estoque
+condicional não pode vender mais do que o estoque (sem estoque negativo).
+"""
+
+import threading
+import uuid
+
+import pytest
+
+from APP.core.database import conectar
+from APP.models import vendas_models
+from APP.models.produtos_models import Produto
+from APP.models.vendas_models import Venda
+
+ESTOQUE_INICIAL = 50
+THREADS = 8
+VENDAS_POR_THREAD = 20
+
+
+@pytest.fixture
+def banco_temporario(banco):
+    Produto.adicionar("Produto Concorrido", 2.5, ESTOQUE_INICIAL)
+
+
+def _vender_em_paralelo(vender):
+    sucessos, falhas = [], []
+    trava = threading.Lock()
+    largada = threading.Barrier(THREADS)
+
+    def terminal():
+        largada.wait()
+        for _ in range(VENDAS_POR_THREAD):
+            try:
+                vender()
+            except Exception as e:
+                with trava:
+                    falhas.append(str(e))
+            else:
+                with trava:
+                    sucessos.append(1)
+
+    threads = [threading.Thread(target=terminal) for _ in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return len(sucessos), falhas
+
+
+def _estoque_final():
+    with conectar() as conn:
+        return conn.execute("SELECT estoque FROM produtos WHERE nome = ?", ("Produto Concorrido",)).fetchone()[0]
+
+
+def _itens_vendidos():
+    with conectar() as conn:
+        return conn.execute("SELECT COALESCE(SUM(quantidade), 0) FROM pedido_itens WHERE produto = ?", ("Produto Concorrido",)).fetchone()[0]
+
+
+@pytest.mark.parametrize("suporta_returning", [True, False], ids=["returning", "fallback"])
+def test_registrar_nao_vende_alem_do_estoque(banco_temporario, monkeypatch, suporta_returning):
+    monkeypatch.setattr(vendas_models, "SUPORTA_RETURNING", suporta_returning)
+
+    sucessos, falhas = _vender_em_paralelo(lambda: Venda.registrar("Produto Concorrido", 1, 2.5, vendedor="teste"))
+
+    assert sucessos == ESTOQUE_INICIAL
+    assert len(falhas) == THREADS * VENDAS_POR_THREAD - ESTOQUE_INICIAL
+    assert all("Estoque insuficiente" in f for f in falhas)
+    assert _estoque_final() == 0
+    assert _itens_vendidos() == ESTOQUE_INICIAL
+
+
+@pytest.mark.parametrize("suporta_returning", [True, False], ids=["returning", "fallback"])
+def test_registrar_pedido_nao_vende_alem_do_estoque(banco_temporario, monkeypatch, suporta_returning):
+    monkeypatch.setattr(vendas_models, "SUPORTA_RETURNING", suporta_returning)
+
+    def vender():
+        Venda.registrar_pedido(
+            f"TESTE-{uuid.uuid4().hex[:12]}",
+            [{"nome": "Produto Concorrido", "quantidade": 1}],
+            vendedor="teste",
+        )
+
+    sucessos, falhas = _vender_em_paralelo(vender)
+
+    assert sucessos == ESTOQUE_INICIAL
+    assert len(falhas) == THREADS * VENDAS_POR_THREAD - ESTOQUE_INICIAL
+    assert _estoque_final() == 0
+    assert _itens_vendidos() == ESTOQUE_INICIAL
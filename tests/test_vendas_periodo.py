@@ -0,0 +1,31 @@
+"""
+Venda.listar_periodo_pagina: páginas pelo cursor (data_hora, id) cobrem o
+período inteiro sem repetir pedidos; erro vira página vazia sem cursor.
+"""
+
+from datetime import date
+
+from APP.models.produtos_models import Produto
+from APP.models.vendas_models import Venda
+
+
+def test_paginas_cobrem_o_periodo_sem_repetir(banco):
+    Produto.adicionar("Pão Francês", 0.5, 100)
+    for i in range(7):
+        Venda.registrar("Pão Francês", 1, None, vendedor="caixa", pedido_id=f"P{i}")
+    hoje = date.today().isoformat()
+
+    vistos, cursor, paginas = [], None, 0
+    while True:
+        pedidos, cursor = Venda.listar_periodo_pagina(hoje, hoje, apos=cursor, limite=3)
+        vistos.extend(pedido["pedido_id"] for pedido in pedidos)
+        paginas += 1
+        if cursor is None:
+            break
+    assert sorted(vistos) == [f"P{i}" for i in range(7)]
+    assert paginas == 3
+    assert [p["pedido_id"] for p in Venda.listar_periodo(hoje, hoje)] == vistos
+
+
+def test_erro_devolve_pagina_vazia_sem_cursor(banco):
+    assert Venda.listar_periodo_pagina("31/12/2025", "2026-01-01") == ([], None)